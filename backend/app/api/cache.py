@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException, status, Header
 from typing import Dict, Any, Optional
 
 from app.core.redis_client import cache_manager
+from app.core.memory_cache import solar_position_cache
 from app.core.config import settings
 
 router = APIRouter()
@@ -19,12 +20,14 @@ async def get_cache_stats() -> Dict[str, Any]:
     - 캐시 히트/미스 통계
     - 히트율
     - Redis 서버 통계
+    - 프로세스 내 태양 위치 캐시 (바이트 한도 LRU)
     """
     try:
         stats = cache_manager.get_stats()
         return {
             'cache_status': 'active' if stats['available'] else 'unavailable',
-            'statistics': stats
+            'statistics': stats,
+            'solar_position_memory': solar_position_cache.get_stats(),
         }
     except Exception as e:
         raise HTTPException(
@@ -44,7 +47,7 @@ async def clear_cache(
     If ``CACHE_ADMIN_TOKEN`` is unset, this endpoint returns 403.
 
     **패턴 예시:**
-    - `*`: 모든 캐시 삭제
+    - `*`: 모든 캐시 삭제 (프로세스 내 태양 위치 캐시 포함)
     - `solar:*`: Solar 관련 캐시만 삭제
     - `integrated:*`: 통합 계산 캐시만 삭제
     """
@@ -63,10 +66,13 @@ async def clear_cache(
             )
 
         deleted_count = cache_manager.clear_pattern(pattern)
+        # 프로세스 내 태양 위치 캐시는 키 패턴이 없으므로 전체 삭제 시에만 비움
+        memory_cleared = solar_position_cache.clear() if pattern == "*" else 0
         return {
             'message': f'Cleared {deleted_count} cache entries',
             'pattern': pattern,
-            'deleted_count': deleted_count
+            'deleted_count': deleted_count,
+            'memory_cleared': memory_cleared,
         }
     except HTTPException:
         raise
@@ -5,6 +5,10 @@ from fastapi import APIRouter, HTTPException, status
 from typing import Dict, Any
 import asyncio
 import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
 
 from app.models.schemas import (
     SolarCalculationRequest,
@@ -12,12 +16,15 @@ from app.models.schemas import (
     BatchCalculationRequest,
     BatchCalculationResponse,
     BatchCalculationResponseItem,
+    OrientationRequest,
 )
 from app.services.optimizer import OptimizationService
+from app.services.irradiance_calculator import IrradianceCalculator
 from app.services.integrated_calculation_service import run_integrated_calculation
 
 router = APIRouter()
 optimizer = OptimizationService()
+irradiance_calculator = IrradianceCalculator()
 
 
 @router.post("/calculate", response_model=SolarCalculationResponse)
@@ -142,3 +149,70 @@ async def optimize_periods(response: SolarCalculationResponse) -> Dict[str, Any]
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Optimization error: {type(e).__name__}",
         ) from e
+
+
+def _optimize_orientation_sync(request: OrientationRequest) -> Dict[str, Any]:
+    """Clear-sky (or weather-file) series for the period, then the orientation sweep."""
+    end_date = request.end_date or (
+        pd.Timestamp(request.start_date) + pd.DateOffset(years=1) - pd.Timedelta(days=1)
+    ).strftime("%Y-%m-%d")
+    if request.weather_file:
+        # The file's own timestamps set the step; interval applies to clear sky only
+        irradiance_data = irradiance_calculator.calculate_weather_irradiance(
+            latitude=request.location.lat,
+            longitude=request.location.lon,
+            weather_file=request.weather_file,
+            date=request.start_date,
+            end_date=end_date,
+            altitude=request.location.altitude or 0,
+            decomposition=request.decomposition,
+            timezone_name=request.location.timezone,
+        )
+    else:
+        irradiance_data = irradiance_calculator.calculate_clear_sky_irradiance(
+            latitude=request.location.lat,
+            longitude=request.location.lon,
+            date=request.start_date,
+            end_date=end_date,
+            interval_minutes=request.interval,
+            altitude=request.location.altitude or 0,
+            timezone_name=request.location.timezone,
+        )
+    result = optimizer.optimize_orientation(
+        irradiance_data,
+        sky_model=request.sky_model,
+        albedo=request.albedo,
+        coarse_step=request.coarse_step,
+        fine_step=request.fine_step,
+    )
+    result["period"] = {"start_date": request.start_date, "end_date": end_date}
+    result["weather_file"] = request.weather_file
+    return result
+
+
+@router.post("/optimize-orientation")
+async def optimize_orientation(request: OrientationRequest) -> Dict[str, Any]:
+    """
+    고정형 패널 최적 경사각·방위각 탐색 (청천 일사 또는 weather_file, 기간 적산 POA 최대)
+    
+    coarse_step 격자 전체를 한 번에 브로드캐스트 계산한 뒤, 최대값 주변을
+    fine_step 격자로 재탐색합니다.
+    """
+    try:
+        result = await asyncio.to_thread(_optimize_orientation_sync, request)
+        return {
+            "request_id": str(uuid.uuid4()),
+            "timestamp": datetime.utcnow().isoformat(),
+            **result,
+        }
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid input: {str(e)}",
+        ) from e
+    except Exception as e:
+        print(f"❌ Error in optimize_orientation: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Optimization error: {type(e).__name__}",
+        ) from e
@@ -2,11 +2,16 @@
 Irradiance Calculation API endpoints
 """
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import uuid
 from datetime import datetime
 
+import numpy as np
+
 from app.services.irradiance_calculator import IrradianceCalculator
+from app.services.row_shading import evaluate_row_shading
+from app.services.annual_energy import calculate_energy_totals
 
 router = APIRouter()
 irradiance_calculator = IrradianceCalculator()
@@ -24,7 +29,9 @@ async def calculate_irradiance(
     include_par: bool = Query(False, description="Include PAR calculation"),
     surface_tilt: Optional[float] = Query(None, ge=0, le=90, description="Surface tilt angle (degrees)"),
     surface_azimuth: Optional[float] = Query(None, ge=0, lt=360, description="Surface azimuth (degrees)"),
-    sky_model: str = Query("perez", description="Sky diffuse model for POA (isotropic, perez, klucher)")
+    sky_model: str = Query("perez", description="Sky diffuse model for POA (isotropic, klucher, haydavies, reindl, perez)"),
+    weather_file: Optional[str] = Query(None, description="All-sky irradiance from a TMY3/EPW/CSV file in WEATHER_DIR (replaces the clear sky model)"),
+    decomposition: str = Query("erbs", description="GHI split for weather rows without DNI/DHI (erbs, dirint)")
 ) -> Dict[str, Any]:
     """
     Calculate solar irradiance for a given location and time range
@@ -44,22 +51,40 @@ async def calculate_irradiance(
     - **perez**: Perez Sky Model ✅ (고정밀 산란 복사 계산, 기본값)
     - **isotropic**: 등방성 하늘 모델
     - **klucher**: Klucher 모델
+    - **haydavies**: Hay-Davies 모델 (circumsolar)
+    - **reindl**: Reindl 모델 (circumsolar + horizon brightening)
+    
+    **Weather files** (weather_file): 실측/TMY 일사량 (all-sky). 파일의 시간 간격을
+    그대로 사용하며 interval 과 model 은 무시됩니다.
     
     **예시:**
     `/api/irradiance/calculate?lat=37.5665&lon=126.9780&date=2025-06-21&interval=60&model=ineichen&sky_model=perez`
     """
     try:
         # Calculate irradiance
-        irradiance_data = irradiance_calculator.calculate_clear_sky_irradiance(
-            latitude=lat,
-            longitude=lon,
-            date=date,
-            start_time=start_time,
-            end_time=end_time,
-            interval_minutes=interval,
-            altitude=altitude,
-            model=model
-        )
+        if weather_file:
+            irradiance_data = irradiance_calculator.calculate_weather_irradiance(
+                latitude=lat,
+                longitude=lon,
+                weather_file=weather_file,
+                date=date,
+                start_time=start_time,
+                end_time=end_time,
+                altitude=altitude,
+                decomposition=decomposition
+            )
+            model = "weather"
+        else:
+            irradiance_data = irradiance_calculator.calculate_clear_sky_irradiance(
+                latitude=lat,
+                longitude=lon,
+                date=date,
+                start_time=start_time,
+                end_time=end_time,
+                interval_minutes=interval,
+                altitude=altitude,
+                model=model
+            )
         
         # Calculate daily totals
         daily_totals = irradiance_calculator.calculate_daily_total_irradiance(
@@ -94,6 +119,7 @@ async def calculate_irradiance(
                 'interval': interval
             },
             'model': model,
+            'weather_file': weather_file,
             'sky_model': sky_model if surface_tilt is not None else None,
             'daily_totals': daily_totals,
             'statistics': statistics,
@@ -112,6 +138,149 @@ async def calculate_irradiance(
             detail=f"Error calculating irradiance: {str(e)}"
         )
 
+@router.get("/row-shading", response_model=Dict[str, Any])
+async def calculate_row_shading(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    date: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: Optional[str] = Query(None, description="Last date, inclusive (default: date)"),
+    surface_tilt: float = Query(..., ge=0, le=90, description="Module tilt angle (degrees)"),
+    surface_azimuth: float = Query(180, ge=0, lt=360, description="Module azimuth (degrees)"),
+    module_length: float = Query(..., gt=0, le=20, description="Collector slant length across the row (m)"),
+    pitch: List[float] = Query(..., description="Row pitch in meters; repeat to sweep several values"),
+    ground_slope: float = Query(0, gt=-45, lt=45, description="Ground slope across rows (degrees, + falling toward the facing side)"),
+    interval: int = Query(60, ge=1, le=1440, description="Time interval in minutes"),
+    altitude: float = Query(0, ge=-500, le=9000, description="Elevation in meters"),
+    timezone: Optional[str] = Query(None, description="IANA timezone"),
+    sky_model: str = Query("isotropic", description="Sky diffuse model for POA (isotropic, klucher, haydavies, reindl, perez)"),
+    include_series: bool = Query(False, description="Include per-timestep shaded fraction (single pitch only)")
+) -> Dict[str, Any]:
+    """
+    Inter-row shading of a fixed-tilt array: shaded fraction and POA beam loss
+    
+    앞줄 모듈이 뒷줄에 드리우는 그림자 비율(fs)과 직달 성분 손실을 계산합니다.
+    pitch 를 여러 번 지정하면 한 번의 계산으로 배치 간격을 비교합니다.
+    
+    **예시:**
+    `/api/irradiance/row-shading?lat=37.5&lon=127&date=2025-01-01&end_date=2025-12-31&surface_tilt=25&module_length=2.2&pitch=4&pitch=5&pitch=6`
+    """
+    try:
+        if include_series and len(pitch) != 1:
+            raise ValueError("include_series requires a single pitch value")
+        result = await asyncio.to_thread(
+            evaluate_row_shading,
+            latitude=lat,
+            longitude=lon,
+            start_date=date,
+            end_date=end_date,
+            surface_tilt=surface_tilt,
+            surface_azimuth=surface_azimuth,
+            module_length=module_length,
+            pitches=pitch,
+            ground_slope=ground_slope,
+            interval_minutes=interval,
+            altitude=altitude,
+            timezone_name=timezone,
+            sky_model=sky_model,
+        )
+        
+        response = {
+            'request_id': str(uuid.uuid4()),
+            'timestamp': datetime.utcnow().isoformat(),
+            'timezone': result['timezone'],
+            'data_points': len(result['times']),
+            'pitches': result['pitches'],
+        }
+        if include_series:
+            response['series'] = [
+                {
+                    'timestamp': ts.isoformat(),
+                    'shaded_fraction': round(fraction, 4),
+                    'poa_direct': round(direct, 2),
+                    'beam_loss': round(loss, 2),
+                }
+                for ts, fraction, direct, loss in zip(
+                    result['times'],
+                    result['shaded_fraction'][0].tolist(),
+                    result['poa_direct'].tolist(),
+                    np.asarray(result['beam_loss'][0]).tolist(),
+                )
+            ]
+        return response
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating row shading: {str(e)}"
+        )
+
+@router.get("/energy", response_model=Dict[str, Any])
+async def calculate_energy(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    start_date: str = Query(..., description="First date in YYYY-MM-DD format"),
+    end_date: str = Query(..., description="Last date, inclusive (YYYY-MM-DD)"),
+    interval: int = Query(60, ge=1, le=1440, description="Time interval in minutes"),
+    altitude: float = Query(0, ge=-500, le=9000, description="Elevation in meters"),
+    timezone: Optional[str] = Query(None, description="IANA timezone"),
+    model: str = Query("ineichen", description="Clear sky model (ineichen, haurwitz, simplified_solis)"),
+    surface_tilt: Optional[float] = Query(None, ge=0, le=90, description="Surface tilt angle for POA totals (degrees)"),
+    surface_azimuth: Optional[float] = Query(None, ge=0, lt=360, description="Surface azimuth (degrees)"),
+    sky_model: str = Query("isotropic", description="Sky diffuse model for POA (isotropic, klucher, haydavies, reindl, perez)")
+) -> Dict[str, Any]:
+    """
+    Clear-sky energy totals by month and year (kWh/m²), peaks and sunshine hours
+    
+    한 달 단위로 계산해 누적하므로 여러 해·1분 간격도 메모리가 일정합니다.
+    일조시간은 WMO 기준 (DNI > 120 W/m²).
+    
+    **예시:**
+    `/api/irradiance/energy?lat=37.5665&lon=126.9780&start_date=2025-01-01&end_date=2025-12-31&interval=10&surface_tilt=30`
+    """
+    try:
+        totals = await asyncio.to_thread(
+            calculate_energy_totals,
+            latitude=lat,
+            longitude=lon,
+            start_date=start_date,
+            end_date=end_date,
+            interval_minutes=interval,
+            altitude=altitude,
+            timezone_name=timezone,
+            model=model,
+            surface_tilt=surface_tilt,
+            surface_azimuth=surface_azimuth,
+            sky_model=sky_model,
+        )
+        
+        return {
+            'request_id': str(uuid.uuid4()),
+            'timestamp': datetime.utcnow().isoformat(),
+            'location': {
+                'lat': lat,
+                'lon': lon,
+                'altitude': altitude
+            },
+            'interval': interval,
+            **totals,
+        }
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating energy totals: {str(e)}"
+        )
+
 @router.get("/test")
 async def test_irradiance_calculation() -> Dict[str, Any]:
     """
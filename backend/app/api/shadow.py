@@ -3,11 +3,17 @@ Shadow Calculation API endpoints
 """
 from fastapi import APIRouter, HTTPException, status, Query
 from typing import Dict, Any, Optional
+import asyncio
 import uuid
+import numpy as np
+import pandas as pd
 from datetime import datetime
 
-from app.models.schemas import Shadow
-from app.services.shadow_calculator import ShadowCalculator
+from app.models.schemas import Shadow, OcclusionRequest, SunlightRasterRequest, FacadeSunRequest
+from app.services.shadow_calculator import ShadowCalculator, STATUS_NORMAL
+from app.services.building_scene import get_scene
+from app.services.sunlight_raster import calculate_sunlight_hours
+from app.services.facade_sun import evaluate_facade_sun
 from app.services.solar_calculator import SolarCalculator
 
 router = APIRouter()
@@ -23,7 +29,7 @@ async def calculate_shadow(
     object_height: float = Query(..., gt=0, le=1000, description="Object height in meters"),
     object_width: Optional[float] = Query(None, gt=0, description="Object width in meters (for polygon)"),
     terrain_slope: Optional[float] = Query(0, ge=0, le=90, description="Terrain slope in degrees"),
-    terrain_aspect: Optional[float] = Query(0, ge=0, lt=360, description="Terrain aspect in degrees")
+    terrain_aspect: Optional[float] = Query(0, ge=0, lt=360, description="Downslope direction in degrees")
 ) -> Dict[str, Any]:
     """
     Calculate shadow properties for a given location, time, and object
@@ -148,6 +154,419 @@ async def calculate_shadow(
             detail=f"Error calculating shadow: {str(e)}"
         )
 
+def _shadow_series_sync(
+    lat: float,
+    lon: float,
+    date: str,
+    object_height: float,
+    object_width: float,
+    start_time: str,
+    end_time: str,
+    interval: int,
+    timezone: Optional[str],
+    tangent_tolerance: Optional[float],
+    terrain_slope: float,
+    terrain_aspect: float,
+) -> Dict[str, Any]:
+    """Solar positions, shadow series and polygons (CPU-bound; run off the event loop)."""
+    solar_positions = solar_calculator.calculate_solar_positions(
+        latitude=lat,
+        longitude=lon,
+        date=date,
+        start_time=start_time,
+        end_time=end_time,
+        interval_minutes=interval,
+        timezone_name=timezone,
+    )
+
+    sun_altitude = solar_positions['apparent_elevation'].to_numpy(dtype=float)
+    series = shadow_calculator.calculate_shadow_series(
+        object_height,
+        sun_altitude,
+        solar_positions['azimuth'].to_numpy(dtype=float),
+        terrain_slope,
+        terrain_aspect,
+    )
+    normal = series['status'] == STATUS_NORMAL
+    polygons = shadow_calculator.calculate_shadow_polygons(
+        lat, lon, object_width, series['length'][normal], series['direction'][normal],
+        tangent_tolerance=tangent_tolerance,
+    ).tolist()
+    polygon_iter = iter(polygons)
+
+    frames = [
+        {
+            'timestamp': ts.isoformat(),
+            'length': length if is_normal else None,
+            'direction': None if status_name == 'no_sun' else direction,
+            'status': status_name,
+            'polygon': next(polygon_iter) if is_normal else None,
+        }
+        for ts, length, direction, status_name, is_normal in zip(
+            solar_positions.index,
+            series['length'].tolist(),
+            series['direction'].tolist(),
+            shadow_calculator.shadow_status_names(series['status']),
+            normal.tolist(),
+        )
+    ]
+
+    return {
+        'request_id': str(uuid.uuid4()),
+        'timestamp': datetime.utcnow().isoformat(),
+        'location': {'lat': lat, 'lon': lon},
+        'object': {'height': object_height, 'width': object_width},
+        'timezone': solar_positions.attrs.get('used_timezone'),
+        'frames': frames,
+    }
+
+@router.get("/series", response_model=Dict[str, Any])
+async def calculate_shadow_series(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    object_height: float = Query(..., gt=0, le=1000, description="Object height in meters"),
+    object_width: float = Query(1.0, gt=0, description="Object width in meters (for polygons)"),
+    start_time: str = Query("00:00", description="Start time in HH:MM format"),
+    end_time: str = Query("23:59", description="End time in HH:MM format"),
+    interval: int = Query(10, ge=1, le=1440, description="Time interval in minutes"),
+    timezone: Optional[str] = Query(None, description="IANA timezone"),
+    tangent_tolerance: Optional[float] = Query(
+        None, gt=0, le=10, description="Allowed polygon error in meters for the flat-earth fast path"
+    ),
+    terrain_slope: float = Query(0, ge=0, lt=90, description="Terrain slope in degrees"),
+    terrain_aspect: float = Query(0, ge=0, lt=360, description="Downslope direction in degrees"),
+) -> Dict[str, Any]:
+    """
+    Shadow frames for a whole time window (animated shadow sweeps)
+    
+    **반환:** 프레임별 timestamp, length, direction, status, polygon([lon, lat] × 4).
+    그림자가 없거나 무한대인 프레임은 length/polygon 이 null.
+    
+    **예시:**
+    `/api/shadow/series?lat=37.5665&lon=126.9780&date=2025-06-21&object_height=10&interval=5`
+    """
+    try:
+        return await asyncio.to_thread(
+            _shadow_series_sync,
+            lat, lon, date, object_height, object_width, start_time, end_time,
+            interval, timezone, tangent_tolerance, terrain_slope, terrain_aspect,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating shadow series: {str(e)}"
+        )
+
+def _shadow_envelope_sync(
+    lat: float,
+    lon: float,
+    date: str,
+    object_height: float,
+    object_width: float,
+    start_time: str,
+    end_time: str,
+    interval: int,
+    timezone: Optional[str],
+    simplify_tolerance: float,
+    terrain_slope: float,
+    terrain_aspect: float,
+) -> Dict[str, Any]:
+    """Shadow frames and their swept union (CPU-bound; run off the event loop)."""
+    solar_positions = solar_calculator.calculate_solar_positions(
+        latitude=lat,
+        longitude=lon,
+        date=date,
+        start_time=start_time,
+        end_time=end_time,
+        interval_minutes=interval,
+        timezone_name=timezone,
+    )
+    series = shadow_calculator.calculate_shadow_series(
+        object_height,
+        solar_positions['apparent_elevation'].to_numpy(dtype=float),
+        solar_positions['azimuth'].to_numpy(dtype=float),
+        terrain_slope,
+        terrain_aspect,
+    )
+    polygons = shadow_calculator.calculate_shadow_polygons(
+        lat, lon, object_width, series['length'], series['direction'],
+    )
+    polygons[series['status'] != STATUS_NORMAL] = np.nan
+    envelope = shadow_calculator.calculate_shadow_envelope(
+        lat, lon, polygons,
+        times=solar_positions.index.asi8.astype(float),
+        simplify_tolerance=simplify_tolerance,
+    )
+
+    result = {
+        'request_id': str(uuid.uuid4()),
+        'timestamp': datetime.utcnow().isoformat(),
+        'location': {'lat': lat, 'lon': lon},
+        'object': {'height': object_height, 'width': object_width},
+        'timezone': solar_positions.attrs.get('used_timezone'),
+        'frames': int(len(solar_positions)),
+        'polygon': None,
+        'vertices': [],
+        'area_m2': 0.0,
+    }
+    if envelope is None:
+        return result
+
+    tz = solar_positions.index.tz
+
+    def to_iso(ns: float) -> str:
+        return pd.Timestamp(int(round(ns)), tz='UTC').tz_convert(tz).isoformat()
+
+    result['polygon'] = envelope['polygon'].tolist()
+    result['vertices'] = [
+        {'lon': vertex[0], 'lat': vertex[1], 'earliest': to_iso(first), 'latest': to_iso(last)}
+        for vertex, first, last in zip(
+            envelope['polygon'].tolist(), envelope['earliest'], envelope['latest']
+        )
+    ]
+    result['area_m2'] = envelope['area_m2']
+    return result
+
+@router.get("/envelope", response_model=Dict[str, Any])
+async def calculate_shadow_envelope(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    object_height: float = Query(..., gt=0, le=1000, description="Object height in meters"),
+    object_width: float = Query(1.0, gt=0, description="Object width in meters"),
+    start_time: str = Query("00:00", description="Start time in HH:MM format"),
+    end_time: str = Query("23:59", description="End time in HH:MM format"),
+    interval: int = Query(10, ge=1, le=1440, description="Time interval in minutes"),
+    timezone: Optional[str] = Query(None, description="IANA timezone"),
+    simplify_tolerance: float = Query(0.1, ge=0, le=100, description="Outline simplification tolerance in meters"),
+    terrain_slope: float = Query(0, ge=0, lt=90, description="Terrain slope in degrees"),
+    terrain_aspect: float = Query(0, ge=0, lt=360, description="Downslope direction in degrees"),
+) -> Dict[str, Any]:
+    """
+    Swept shadow envelope: total area shaded during the time window
+    
+    프레임별 그림자 polygon 의 합집합(연속 프레임 쌍의 convex hull 합집합)을
+    하나의 단순화된 polygon 으로 반환. 각 꼭짓점에 처음/마지막으로 그늘이 드는 시각 포함.
+    
+    **예시:**
+    `/api/shadow/envelope?lat=37.5665&lon=126.9780&date=2025-12-21&object_height=10&object_width=4`
+    """
+    try:
+        return await asyncio.to_thread(
+            _shadow_envelope_sync,
+            lat, lon, date, object_height, object_width, start_time, end_time,
+            interval, timezone, simplify_tolerance, terrain_slope, terrain_aspect,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating shadow envelope: {str(e)}"
+        )
+
+# (time, point) rays per occlusion request
+MAX_OCCLUSION_RAYS = 2_000_000
+
+def _occlusion_sync(request: OcclusionRequest) -> Dict[str, Any]:
+    """Scene build and ray trace (CPU-bound; run off the event loop)."""
+    lat = request.location.lat
+    lon = request.location.lon
+    solar_positions = solar_calculator.calculate_solar_positions(
+        latitude=lat,
+        longitude=lon,
+        date=request.datetime.date,
+        start_time=request.datetime.start_time or "00:00",
+        end_time=request.datetime.end_time or "23:59",
+        interval_minutes=request.datetime.interval or 60,
+        altitude=request.location.altitude or 0,
+        timezone_name=request.location.timezone,
+    )
+    n_rays = len(solar_positions) * len(request.points)
+    if n_rays > MAX_OCCLUSION_RAYS:
+        raise ValueError(
+            f"Too many (time, point) pairs: {n_rays} > {MAX_OCCLUSION_RAYS}; "
+            "use fewer points or a longer interval"
+        )
+
+    scene = get_scene(
+        [building.model_dump() for building in request.buildings],
+        cell_size=request.cell_size,
+    )
+    points = np.asarray(request.points, dtype=float)
+    if points.ndim != 2 or points.shape[1] < 2:
+        raise ValueError("points must be [[lon, lat], ...]")
+    result = scene.first_occluders(
+        points[:, 0],
+        points[:, 1],
+        solar_positions['apparent_elevation'].to_numpy(dtype=float),
+        solar_positions['azimuth'].to_numpy(dtype=float),
+    )
+
+    frames = [
+        {
+            'timestamp': ts.isoformat(),
+            'sun_up': sun_up,
+            'occluder': occluder,
+        }
+        for ts, sun_up, occluder in zip(
+            solar_positions.index,
+            result['sun_up'].tolist(),
+            result['occluder'].tolist(),
+        )
+    ]
+
+    return {
+        'request_id': str(uuid.uuid4()),
+        'timestamp': datetime.utcnow().isoformat(),
+        'timezone': solar_positions.attrs.get('used_timezone'),
+        'building_ids': scene.ids,
+        'points': [
+            {'inside': inside, 'shaded_steps': steps}
+            for inside, steps in zip(
+                result['inside'].tolist(),
+                result['shaded'].sum(axis=0).tolist(),
+            )
+        ],
+        'frames': frames,
+    }
+
+@router.post("/occlusion", response_model=Dict[str, Any])
+async def calculate_occlusion(request: OcclusionRequest) -> Dict[str, Any]:
+    """
+    Building occlusion for many points over a time window
+    
+    건물 footprint(외곽 링 + 높이)로 장면을 만들고(격자 인덱스, 동일 장면은 재사용)
+    각 시각·지점에서 태양 방향 광선을 막는 첫 건물을 찾는다.
+    
+    **반환:** frames[t].occluder[p] = 가리는 건물 index(-1: 직달광 또는 태양 없음),
+    building_ids 로 index → id 변환. points[p].inside = 지점이 속한 건물 index.
+    """
+    try:
+        return await asyncio.to_thread(_occlusion_sync, request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating occlusion: {str(e)}"
+        )
+
+@router.post("/sunlight-hours", response_model=Dict[str, Any])
+async def calculate_sunlight_raster(request: SunlightRasterRequest) -> Dict[str, Any]:
+    """
+    Direct-sun hours per grid cell over a day, season or year
+    
+    주변 건물 footprint 를 고려한 일조시간 래스터 (북쪽이 위, row 0 = 북단).
+    transform = (west, lon_step, 0, north, 0, -lat_step) — GeoTIFF 와 동일한 affine.
+    
+    **반환:** hours[row][col] (시간), stats(min/max/mean/median, possible_hours, shaded_fraction)
+    """
+    try:
+        raster = await asyncio.to_thread(
+            calculate_sunlight_hours,
+            center_lat=request.location.lat,
+            center_lon=request.location.lon,
+            buildings=[building.model_dump() for building in request.buildings],
+            start_date=request.start_date,
+            end_date=request.end_date,
+            width_m=request.width_m,
+            height_m=request.height_m,
+            resolution_m=request.resolution_m,
+            interval_minutes=request.interval,
+            timezone_name=request.location.timezone,
+            altitude=request.location.altitude or 0,
+        )
+        
+        return {
+            'request_id': str(uuid.uuid4()),
+            'timestamp': datetime.utcnow().isoformat(),
+            'timezone': raster['timezone'],
+            'rows': raster['rows'],
+            'cols': raster['cols'],
+            'resolution_m': raster['resolution_m'],
+            'transform': list(raster['transform']),
+            'hours': np.round(raster['hours'], 2).tolist(),
+            'stats': raster['stats'],
+        }
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating sunlight hours: {str(e)}"
+        )
+
+@router.post("/facade-sun", response_model=Dict[str, Any])
+async def calculate_facade_sun(request: FacadeSunRequest) -> Dict[str, Any]:
+    """
+    Direct-sun hours on facade points (windows) over a day, season or year
+    
+    각 점의 법선 방향(azimuth, tilt)으로 입사각(AOI < 90°)을 확인한 뒤,
+    주변 건물에 의한 차폐를 창 높이에서 추적합니다.
+    
+    **반환:** 점별 sun_hours, possible_hours(건물 없음), 최장 연속 일조 구간
+    """
+    try:
+        result = await asyncio.to_thread(
+            evaluate_facade_sun,
+            center_lat=request.location.lat,
+            center_lon=request.location.lon,
+            buildings=[building.model_dump() for building in request.buildings],
+            points=[point.model_dump() for point in request.points],
+            start_date=request.start_date,
+            end_date=request.end_date,
+            interval_minutes=request.interval,
+            timezone_name=request.location.timezone,
+            altitude=request.location.altitude or 0,
+        )
+        
+        points = []
+        for i, point in enumerate(request.points):
+            points.append({
+                'id': point.id if point.id is not None else str(i),
+                'sun_hours': round(float(result['sun_hours'][i]), 2),
+                'possible_hours': round(float(result['possible_hours'][i]), 2),
+                'longest_hours': round(float(result['longest_hours'][i]), 2),
+                'longest_start': result['longest_start'][i],
+                'longest_end': result['longest_end'][i],
+            })
+        
+        return {
+            'request_id': str(uuid.uuid4()),
+            'timestamp': datetime.utcnow().isoformat(),
+            'timezone': result['timezone'],
+            'daytime_steps': result['daytime_steps'],
+            'points': points,
+        }
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating facade sun hours: {str(e)}"
+        )
+
 @router.get("/test")
 async def test_shadow_calculation() -> Dict[str, Any]:
     """
@@ -2,10 +2,12 @@
 Solar Position API endpoints
 """
 from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import uuid
 from datetime import datetime
 
+import pandas as pd
+
 from app.models.schemas import (
     SolarCalculationRequest,
     SolarCalculationResponse,
@@ -14,11 +16,19 @@ from app.models.schemas import (
     SolarSummary,
     SolarDataPoint
 )
+from app.core.constants import PRECISION_TIERS, DEFAULT_PRECISION
 from app.services.solar_calculator import SolarCalculator
+from app.services.timezone_utils import resolve_timezone, timezone_label
+from app.services.horizon import effective_sun_times, get_horizon_profile
 
 router = APIRouter()
 solar_calculator = SolarCalculator()
 
+# /sunrise-sunset/range 최대 일수 (약 10년)
+MAX_SUN_TIMES_DAYS = 3660
+# /horizon 최대 일수 (1분 간격 시계열)
+MAX_HORIZON_DAYS = 31
+
 @router.post("/position", response_model=SolarCalculationResponse)
 async def calculate_solar_position(
     request: SolarCalculationRequest
@@ -26,7 +36,7 @@ async def calculate_solar_position(
     """
     Calculate solar positions for a given location and date range
     
-    **정확도:** ±0.05° (NREL SPA 알고리즘)
+    **정확도:** precision 에 따라 다름 (high: ±0.05° NREL SPA, medium: ±0.06° 60분 노드 스플라인, low: ±0.11° 120분 노드 스플라인)
     
     **지원 기능:**
     - 고정밀 태양 고도/방위각 계산
@@ -69,6 +79,7 @@ async def calculate_solar_position(
         interval = request.datetime.interval or 60
         
         apply_refraction = request.options.atmosphere if request.options else True
+        precision = request.options.precision if request.options else DEFAULT_PRECISION
         
         # Validate extreme conditions
         conditions = solar_calculator.validate_extreme_conditions(lat, date)
@@ -84,6 +95,7 @@ async def calculate_solar_position(
             altitude=altitude,
             apply_refraction=apply_refraction,
             timezone_name=timezone_name,
+            precision=precision,
         )
         
         # Calculate sunrise/sunset
@@ -108,7 +120,7 @@ async def calculate_solar_position(
                 timestamp=datetime.utcnow().isoformat(),
                 version="0.1.0",
                 accuracy=Accuracy(
-                    position=0.05,  # ±0.05° accuracy
+                    position=PRECISION_TIERS[precision]['position_accuracy'],
                     irradiance=0  # Not calculated yet
                 )
             ),
@@ -192,6 +204,79 @@ async def get_sunrise_sunset(
             detail=f"Error calculating sunrise/sunset: {str(e)}"
         )
 
+@router.get("/sunrise-sunset/range")
+async def get_sunrise_sunset_range(
+    lat: float,
+    lon: float,
+    start_date: str,
+    end_date: str,
+    timezone: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Get sunrise, sunset, solar noon and polar state for every day of a date range
+    
+    **Parameters:**
+    - **lat**: Latitude (-90 to 90)
+    - **lon**: Longitude (-180 to 180)
+    - **start_date**: First date in YYYY-MM-DD format
+    - **end_date**: Last date (inclusive), at most MAX_SUN_TIMES_DAYS after start_date
+    - **timezone**: Optional IANA timezone
+    
+    **Returns:**
+    - timezone: Timezone label used for the timestamps
+    - days: [{date, sunrise, sunset, solar_noon, day_length, polar}]
+    
+    **Example:** `/api/solar/sunrise-sunset/range?lat=37.5665&lon=126.9780&start_date=2025-01-01&end_date=2025-12-31`
+    """
+    try:
+        if not (-90 <= lat <= 90):
+            raise ValueError("Latitude must be between -90 and 90")
+        if not (-180 <= lon <= 180):
+            raise ValueError("Longitude must be between -180 and 180")
+        
+        span_days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+        if span_days > MAX_SUN_TIMES_DAYS:
+            raise ValueError(f"Date range must not exceed {MAX_SUN_TIMES_DAYS} days")
+        
+        tz = resolve_timezone(lat, lon, timezone)
+        table = solar_calculator.calculate_sun_times_range(
+            lat, lon, start_date, end_date, tz=tz
+        )
+        
+        def _iso(value):
+            return value.isoformat() if not pd.isna(value) else None
+        
+        days = [
+            {
+                "date": day.strftime("%Y-%m-%d"),
+                "sunrise": _iso(sunrise),
+                "sunset": _iso(sunset),
+                "solar_noon": _iso(transit),
+                "day_length": day_length,
+                "polar": polar,
+            }
+            for day, sunrise, sunset, transit, day_length, polar in zip(
+                table.index,
+                table["sunrise"],
+                table["sunset"],
+                table["transit"],
+                table["day_length"].tolist(),
+                table["polar"],
+            )
+        ]
+        return {"timezone": timezone_label(tz), "days": days}
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating sunrise/sunset range: {str(e)}"
+        )
+
 @router.get("/test")
 async def test_solar_calculation() -> Dict[str, Any]:
     """
@@ -234,3 +319,67 @@ async def test_solar_calculation() -> Dict[str, Any]:
             "error": str(e),
             "status": "Test failed"
         }
+
+@router.get("/horizon")
+async def get_terrain_horizon(
+    lat: float,
+    lon: float,
+    date: str,
+    end_date: Optional[str] = None,
+    timezone: Optional[str] = None,
+    interval: int = 1,
+) -> Dict[str, Any]:
+    """
+    Terrain horizon profile and effective sunrise/sunset (requires DEM_PATH)
+    
+    **Parameters:**
+    - **lat**, **lon**: Site coordinates
+    - **date**: First date in YYYY-MM-DD format
+    - **end_date**: Optional last date (inclusive), at most MAX_HORIZON_DAYS days
+    - **timezone**: Optional IANA timezone
+    - **interval**: Sampling interval in minutes (effective times are interpolated)
+    
+    **Returns:**
+    - profile: horizon elevation (°) for azimuth 0..359 (north, clockwise)
+    - days: [{date, effective_sunrise, effective_sunset, visible_hours}]
+    
+    **Example:** `/api/solar/horizon?lat=46.0207&lon=7.7491&date=2025-12-21`
+    """
+    try:
+        if not (-90 <= lat <= 90):
+            raise ValueError("Latitude must be between -90 and 90")
+        if not (-180 <= lon <= 180):
+            raise ValueError("Longitude must be between -180 and 180")
+        if not (1 <= interval <= 60):
+            raise ValueError("interval must be between 1 and 60 minutes")
+        span_days = (pd.Timestamp(end_date or date) - pd.Timestamp(date)).days + 1
+        if span_days > MAX_HORIZON_DAYS:
+            raise ValueError(f"Date range must not exceed {MAX_HORIZON_DAYS} days")
+        
+        profile = get_horizon_profile(lat, lon)
+        solar_positions = solar_calculator.calculate_solar_positions(
+            latitude=lat,
+            longitude=lon,
+            date=date,
+            end_date=end_date,
+            interval_minutes=interval,
+            timezone_name=timezone,
+            horizon=True,
+        )
+        
+        return {
+            "timezone": solar_positions.attrs.get("used_timezone"),
+            "profile": profile.tolist(),
+            "days": effective_sun_times(solar_positions),
+        }
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating terrain horizon: {str(e)}"
+        )
@@ -29,6 +29,31 @@ class Settings(BaseSettings):
     DEFAULT_TEMPERATURE: float = 15.0   # Standard temperature (°C)
     MAX_OBJECT_HEIGHT: float = 1000.0   # Maximum object height (meters)
 
+    # Precomputed ephemeris table (app/services/ephemeris_store.py). Empty = nrel_numpy only
+    EPHEMERIS_PATH: str = ""
+    EPHEMERIS_START_YEAR: int = 2020
+    EPHEMERIS_YEARS: int = 16
+
+    # Linke turbidity grid decompressed from pvlib's .h5 (app/services/linke_turbidity.py).
+    # Built with `python -m app.services.linke_turbidity build --out <absolute path>`, then
+    # memory-mapped read-only at startup and shared by all workers. Empty (or missing file) =
+    # each worker decompresses a private ~112 MB copy on its first clear-sky request
+    LINKE_TURBIDITY_PATH: str = ""
+
+    # In-process solar position LRU (app/core/memory_cache.py), bytes per process. 0 = disabled
+    SOLAR_POSITION_CACHE_BYTES: int = 64 * 1024 * 1024
+
+    # Elevation raster for terrain horizons (app/services/horizon.py). Empty = flat horizon
+    DEM_PATH: str = ""
+    HORIZON_MAX_DISTANCE: float = 20000.0  # meters searched for the horizon around a site
+
+    # Worker processes for sunlight-hours rasters (app/services/sunlight_raster.py), one pool
+    # per server process at a time. 0 = all cores
+    RASTER_WORKERS: int = 4
+
+    # Local TMY3/EPW/CSV weather files (app/services/weather_store.py), indexed into <dir>/.cache
+    WEATHER_DIR: str = "data/weather"
+
     # Cache admin (POST /api/cache/clear). If unset, clear is denied.
     CACHE_ADMIN_TOKEN: str = ""
     ENVIRONMENT: str = "production"
@@ -0,0 +1,33 @@
+"""
+Calculation constants shared by request schemas and services (no heavy imports)
+"""
+from typing import Any, Dict
+
+# Precision tiers (CalculationOptions.precision).
+# max_error_deg: worst geometric angular separation from nrel_numpy measured by
+# scripts/benchmark_precision.py (1-minute days, random sites |lat| ≤ 80°,
+# 2020–2029). position_accuracy: reported in response metadata
+# (0.05° baseline + algorithm error).
+PRECISION_TIERS: Dict[str, Dict[str, Any]] = {
+    'high': {
+        'method': 'nrel_numpy',
+        'max_error_deg': 0.0003,
+        'position_accuracy': 0.05,
+    },
+    'medium': {
+        'method': 'spline',
+        'node_minutes': 60,
+        'max_error_deg': 0.01,
+        'position_accuracy': 0.06,
+    },
+    'low': {
+        'method': 'spline',
+        'node_minutes': 120,
+        'max_error_deg': 0.06,
+        'position_accuracy': 0.11,
+    },
+}
+# Default tier for API requests (CalculationOptions) and service calls
+DEFAULT_PRECISION = 'high'
+# GHI → DNI/DHI split for weather rows that only carry GHI
+DECOMPOSITION_MODELS = ('erbs', 'dirint')
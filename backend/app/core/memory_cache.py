@@ -0,0 +1,108 @@
+"""
+In-process LRU cache for numpy results, bounded by bytes
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+# Bookkeeping charged per entry on top of the array payload (key, dict slot, tuple)
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def _payload_bytes(value: Any) -> int:
+    """Bytes held by the numpy arrays inside value (tuple/list/dict aware)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_payload_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_payload_bytes(item) for item in value.values())
+    return 0
+
+
+class ArrayLRUCache:
+    """
+    Thread-safe LRU whose capacity is a byte budget, not an entry count
+
+    Values are stored as-is; callers should store read-only arrays and copy
+    on the way out if they hand the data to code that may mutate it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (and mark it recently used) or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """
+        Store value, evicting least recently used entries to fit the budget
+
+        Returns:
+            False when the value alone exceeds the budget (not stored)
+        """
+        size = _payload_bytes(value) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            # Also covers max_bytes == 0 (cache disabled)
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            while self._entries and self._bytes + size > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.stats['evictions'] += 1
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+        return True
+
+    def clear(self) -> int:
+        """Drop every entry; returns how many were removed."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            total_requests = self.stats['hits'] + self.stats['misses']
+            hit_rate = (self.stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+            return {
+                'hits': self.stats['hits'],
+                'misses': self.stats['misses'],
+                'evictions': self.stats['evictions'],
+                'hit_rate': f"{hit_rate:.2f}%",
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Solar position results shared by every SolarCalculator instance in the process
+solar_position_cache = ArrayLRUCache(settings.SOLAR_POSITION_CACHE_BYTES)
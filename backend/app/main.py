@@ -2,6 +2,7 @@
 SunPath & Shadow Simulator - FastAPI Backend
 Main application entry point
 """
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -13,6 +14,8 @@ from fastapi.middleware.gzip import GZipMiddleware
 # API routers
 from app.api import solar, shadow, irradiance, integrated, cache
 from app.middleware.http_extra import ApiRateLimitMiddleware, RequestLogMiddleware
+from app.core.config import settings
+from app.services.linke_turbidity import get_linke_turbidity_grid
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +27,9 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     print("🚀 Starting SunPath & Shadow Simulator API")
+    # 빌드된 Linke 탁도 .npy 가 설정된 경우에만 시작 시 읽기 전용 매핑 (파일 생성은 CLI 전용)
+    if settings.LINKE_TURBIDITY_PATH:
+        await asyncio.to_thread(get_linke_turbidity_grid)
     yield
     print("👋 Shutting down SunPath & Shadow Simulator API")
 
@@ -5,6 +5,8 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+from app.core.constants import DECOMPOSITION_MODELS, DEFAULT_PRECISION, PRECISION_TIERS
+
 class Location(BaseModel):
     """Location coordinates"""
     lat: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
@@ -55,23 +57,77 @@ class ObjectProperties(BaseModel):
     height: float = Field(..., gt=0, le=1000, description="Object height in meters")
     tilt: Optional[float] = Field(0, ge=0, le=90, description="Tilt angle in degrees")
     azimuth: Optional[float] = Field(0, ge=0, lt=360, description="Azimuth angle in degrees")
+    footprint: Optional[List[List[float]]] = Field(
+        None, min_length=3, description="Prism footprint ring [[lon, lat], ...] (default: rectangle 0.4 × height wide)"
+    )
+
+class TerrainProperties(BaseModel):
+    """Ground plane under the object (for shadow projection)"""
+    slope: float = Field(0, ge=0, lt=90, description="Terrain slope in degrees")
+    aspect: float = Field(0, ge=0, lt=360, description="Downslope direction in degrees (0=North, 90=East)")
 
 class CalculationOptions(BaseModel):
     """Calculation options"""
     atmosphere: bool = Field(True, description="Apply atmospheric refraction correction")
-    precision: str = Field("medium", description="Calculation precision: low, medium, high")
-    include_weather: bool = Field(False, description="Include weather data")
+    precision: str = Field(DEFAULT_PRECISION, description="Calculation precision: low, medium, high")
+    include_weather: bool = Field(
+        False,
+        description="All-sky irradiance from the posted weather series or weather_file",
+    )
+    weather_file: Optional[str] = Field(
+        None, description="TMY3/EPW/CSV file name inside WEATHER_DIR (instead of a posted weather series)"
+    )
+    decomposition: str = Field(
+        "erbs", description="GHI split into DNI/DHI for weather-derived GHI: erbs, dirint"
+    )
+    horizon: bool = Field(False, description="Mask the sun behind terrain from the DEM (requires DEM_PATH)")
     sky_model: str = Field(
         "isotropic",
-        description="Sky diffuse model for POA: isotropic, perez, klucher",
+        description="Sky diffuse model for POA: isotropic, klucher, haydavies, reindl, perez",
+    )
+
+    @field_validator('precision')
+    @classmethod
+    def validate_precision(cls, v):
+        if v not in PRECISION_TIERS:
+            raise ValueError("precision must be one of: low, medium, high")
+        return v
+
+    @field_validator('decomposition')
+    @classmethod
+    def validate_decomposition(cls, v):
+        if v not in DECOMPOSITION_MODELS:
+            raise ValueError(f"decomposition must be one of: {', '.join(DECOMPOSITION_MODELS)}")
+        return v
+
+class WeatherSeries(BaseModel):
+    """Hourly weather (e.g. Open-Meteo hourly) resampled onto the request series"""
+    time: List[str] = Field(
+        ..., min_length=1, max_length=24 * 366,
+        description="Hourly timestamps (ISO 8601; naive values are local wall clock at the site)",
     )
+    cloud_cover: Optional[List[Optional[float]]] = Field(None, description="Total cloud cover (%)")
+    temperature: Optional[List[Optional[float]]] = Field(None, description="Air temperature (°C)")
+    pressure: Optional[List[Optional[float]]] = Field(None, description="Surface pressure (hPa)")
+
+    @field_validator('cloud_cover', 'temperature', 'pressure')
+    @classmethod
+    def validate_length(cls, values, info):
+        time = info.data.get('time')
+        if values is not None and time is not None and len(values) != len(time):
+            raise ValueError(f"{info.field_name} must have one value per time entry")
+        return values
 
 class SolarCalculationRequest(BaseModel):
     """Solar calculation request"""
     location: Location
     datetime: DateTimeRange
     object: Optional[ObjectProperties] = None
+    terrain: Optional[TerrainProperties] = None
     options: Optional[CalculationOptions] = CalculationOptions()
+    weather: Optional[WeatherSeries] = Field(
+        None, description="Hourly weather applied when options.include_weather is true"
+    )
 
 class SunPosition(BaseModel):
     """Sun position at a specific time"""
@@ -87,6 +143,7 @@ class Irradiance(BaseModel):
     dhi: float = Field(..., description="Diffuse Horizontal Irradiance (W/m²)")
     par: Optional[float] = Field(None, description="Photosynthetically Active Radiation (W/m²)")
     poa: Optional[float] = Field(None, description="Plane of Array irradiance (W/m²)")
+    cloud_cover: Optional[float] = Field(None, description="Cloud cover applied at this step (%, include_weather)")
 
 class Shadow(BaseModel):
     """Shadow properties"""
@@ -112,6 +169,8 @@ class SolarSummary(BaseModel):
     day_length: float = Field(..., description="Day length in hours")
     max_altitude: float = Field(..., description="Maximum solar altitude in degrees")
     total_irradiance: Optional[float] = Field(None, description="Total daily irradiance (kWh/m²)")
+    effective_sunrise: Optional[str] = Field(None, description="Sun clears the terrain horizon (horizon option)")
+    effective_sunset: Optional[str] = Field(None, description="Sun drops behind the terrain horizon (horizon option)")
 
 class Accuracy(BaseModel):
     """Calculation accuracy metrics"""
@@ -151,3 +210,70 @@ class BatchCalculationResponse(BaseModel):
     failed: int = Field(..., description="Number of failed calculations")
     processing_time_ms: float = Field(..., description="Total processing time in milliseconds")
     results: List[BatchCalculationResponseItem] = Field(..., description="Individual results")
+
+class BuildingFootprint(BaseModel):
+    """Building footprint (exterior ring) with roof height"""
+    id: Optional[str] = Field(None, description="Building identifier (defaults to list index)")
+    ring: List[List[float]] = Field(..., min_length=3, description="Exterior ring [[lon, lat], ...]")
+    height: float = Field(..., gt=0, le=1000, description="Building height in meters")
+
+class OcclusionRequest(BaseModel):
+    """Which points are shaded by surrounding buildings over a time window"""
+    location: Location
+    datetime: DateTimeRange
+    buildings: List[BuildingFootprint] = Field(..., min_length=1, max_length=5000, description="Scene footprints (max 5000)")
+    points: List[List[float]] = Field(..., min_length=1, max_length=10000, description="Query points [[lon, lat], ...] (max 10000)")
+    cell_size: Optional[float] = Field(None, gt=0, le=1000, description="Spatial grid cell size in meters (default: automatic)")
+
+class SunlightRasterRequest(BaseModel):
+    """Direct-sun hours on a grid around a site"""
+    location: Location
+    start_date: str = Field(..., description="First date (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="Last date, inclusive (default: start_date)")
+    interval: int = Field(10, ge=1, le=120, description="Sun sampling interval in minutes")
+    width_m: float = Field(200, gt=0, le=5000, description="Grid width (east-west) in meters")
+    height_m: float = Field(200, gt=0, le=5000, description="Grid height (north-south) in meters")
+    resolution_m: float = Field(2, gt=0, le=500, description="Cell size in meters")
+    buildings: List[BuildingFootprint] = Field(default_factory=list, max_length=5000, description="Surrounding footprints (max 5000)")
+
+class FacadePoint(BaseModel):
+    """Sample point on a facade (e.g. a window) with its outward normal"""
+    id: Optional[str] = Field(None, description="Point identifier (defaults to list index)")
+    lon: float = Field(..., ge=-180, le=180, description="Longitude in degrees")
+    lat: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
+    height: float = Field(0, ge=0, le=1000, description="Height above ground in meters")
+    azimuth: float = Field(..., ge=0, lt=360, description="Outward normal azimuth in degrees (0=North, 90=East)")
+    tilt: float = Field(90, ge=0, le=90, description="Surface tilt in degrees (90 = vertical wall)")
+
+class FacadeSunRequest(BaseModel):
+    """Direct-sun hours on facade points among surrounding buildings"""
+    location: Location
+    start_date: str = Field(..., description="First date (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="Last date, inclusive (default: start_date)")
+    interval: int = Field(10, ge=1, le=120, description="Sun sampling interval in minutes")
+    buildings: List[BuildingFootprint] = Field(default_factory=list, max_length=5000, description="Surrounding footprints (max 5000)")
+    points: List[FacadePoint] = Field(..., min_length=1, max_length=10000, description="Facade sample points (max 10000)")
+
+class OrientationRequest(BaseModel):
+    """Best fixed tilt/azimuth for a site over a period"""
+    location: Location
+    start_date: str = Field(..., description="First date (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="Last date, inclusive (default: one year from start_date)")
+    interval: int = Field(60, ge=1, le=120, description="Time interval in minutes")
+    sky_model: str = Field("isotropic", description="Sky diffuse model: isotropic, klucher, haydavies, reindl, perez")
+    albedo: float = Field(0.2, ge=0, le=1, description="Ground reflectance")
+    coarse_step: float = Field(5, gt=0, le=30, description="Full-sweep grid step in degrees")
+    fine_step: float = Field(1, gt=0, le=10, description="Refinement grid step in degrees")
+    weather_file: Optional[str] = Field(
+        None, description="TMY3/EPW/CSV file name inside WEATHER_DIR (default: clear-sky irradiance)"
+    )
+    decomposition: str = Field(
+        "erbs", description="GHI split into DNI/DHI for weather-derived GHI: erbs, dirint"
+    )
+
+    @field_validator('decomposition')
+    @classmethod
+    def validate_decomposition(cls, v):
+        if v not in DECOMPOSITION_MODELS:
+            raise ValueError(f"decomposition must be one of: {', '.join(DECOMPOSITION_MODELS)}")
+        return v
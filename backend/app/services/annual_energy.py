@@ -0,0 +1,186 @@
+"""
+Clear-sky energy totals over a year (or several), walked month by month.
+
+Each month is computed as one clear-sky frame (at most ~45k rows at 1-minute
+resolution), folded into small per-month accumulators and dropped, so peak
+memory does not grow with the span. Energy is the trapezoid rule on the real
+timestamps written as per-sample weights: each sample carries half of the
+interval on either side, credited to its own month. The last sample of a
+month is carried into the next chunk so the segment across the boundary is
+counted exactly once.
+
+Sunshine hours follow the WMO definition: time with DNI above 120 W/m².
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.irradiance_calculator import IrradianceCalculator
+
+# WMO sunshine threshold on direct normal irradiance (W/m²)
+SUNSHINE_DNI_THRESHOLD = 120.0
+# Longest span accepted, in years
+MAX_ENERGY_YEARS = 10
+# Nanoseconds per hour (timestamp deltas → hours)
+NS_PER_HOUR = 3_600_000_000_000
+
+_irradiance = IrradianceCalculator()
+
+
+def _month_chunks(start_date: str, end_date: str) -> List[tuple]:
+    """(first, last) local dates of each calendar month in [start_date, end_date]."""
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    if end < start:
+        raise ValueError("end_date must be on or after start_date")
+    if end > start + pd.DateOffset(years=MAX_ENERGY_YEARS):
+        raise ValueError(f"Span is limited to {MAX_ENERGY_YEARS} years")
+    chunks = []
+    month_start = start
+    while month_start <= end:
+        month_end = min(month_start + pd.offsets.MonthEnd(0), end)
+        chunks.append((month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')))
+        month_start = month_end + pd.Timedelta(days=1)
+    return chunks
+
+
+def calculate_energy_totals(
+    latitude: float,
+    longitude: float,
+    start_date: str,
+    end_date: str,
+    interval_minutes: int = 60,
+    altitude: float = 0,
+    timezone_name: Optional[str] = None,
+    model: str = 'ineichen',
+    surface_tilt: Optional[float] = None,
+    surface_azimuth: Optional[float] = None,
+    sky_model: str = 'isotropic',
+    albedo: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Monthly and yearly clear-sky energy with peaks and sunshine hours
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        start_date: First local date (YYYY-MM-DD)
+        end_date: Last local date, inclusive
+        interval_minutes: Sampling step in minutes
+        altitude: Site elevation in meters
+        timezone_name: Optional IANA timezone
+        model: Clear sky model
+        surface_tilt: Optional plane tilt for POA totals (degrees)
+        surface_azimuth: Plane azimuth (degrees, default 180)
+        sky_model: Sky diffuse model for POA
+        albedo: Ground reflectance (0-1)
+
+    Returns:
+        Dictionary with:
+        - months: [{month, days, ghi/dni/dhi(/poa)_kwh_m2, peak_ghi(/poa) with
+          timestamps, sunshine_hours}]
+        - years: same fields aggregated per calendar year
+        - total: same fields over the whole span
+        - timezone
+    """
+    chunks = _month_chunks(start_date, end_date)
+    with_poa = surface_tilt is not None
+    columns = ['ghi', 'dni', 'dhi'] + (['poa'] if with_poa else [])
+    n_columns = len(columns)
+
+    energy: Dict[int, np.ndarray] = {}     # month key → Wh/m² per column
+    sunshine: Dict[int, float] = {}        # month key → hours
+    peaks: Dict[int, np.ndarray] = {}      # month key → max W/m² per column
+    peak_times: Dict[int, List[Optional[str]]] = {}
+    days: Dict[int, int] = {}
+    carry = None                           # (ns, values, sunny, month key) of the previous chunk's last sample
+    timezone = None
+
+    for first, last in chunks:
+        data = _irradiance.calculate_clear_sky_irradiance(
+            latitude=latitude,
+            longitude=longitude,
+            date=first,
+            end_date=last,
+            interval_minutes=interval_minutes,
+            altitude=altitude,
+            model=model,
+            timezone_name=timezone_name,
+        )
+        timezone = data.attrs.get('used_timezone', timezone)
+        values = np.empty((len(data), n_columns))
+        values[:, 0] = data['ghi'].to_numpy(dtype=float)
+        values[:, 1] = data['dni'].to_numpy(dtype=float)
+        values[:, 2] = data['dhi'].to_numpy(dtype=float)
+        if with_poa:
+            values[:, 3] = _irradiance.calculate_poa_series(
+                ghi=values[:, 0],
+                dni=values[:, 1],
+                dhi=values[:, 2],
+                solar_zenith=data['apparent_zenith'].to_numpy(dtype=float),
+                solar_azimuth=data['azimuth'].to_numpy(dtype=float),
+                surface_tilt=surface_tilt,
+                surface_azimuth=180.0 if surface_azimuth is None else surface_azimuth,
+                albedo=albedo,
+                sky_model=sky_model,
+                dni_extra=data['dni_extra'].to_numpy(dtype=float),
+                airmass=data['airmass_relative'].to_numpy(dtype=float),
+            )['poa_global']
+        values = np.nan_to_num(values)
+        sunny = values[:, 1] > SUNSHINE_DNI_THRESHOLD
+        ns = data.index.asi8
+        month = data.index.year.to_numpy() * 100 + data.index.month.to_numpy()
+        key = int(month[0])
+        days[key] = days.get(key, 0) + (pd.Timestamp(last) - pd.Timestamp(first)).days + 1
+
+        # Peaks over this chunk's own samples
+        top = values.argmax(axis=0)
+        peak = values[top, np.arange(n_columns)]
+        if key not in peaks:
+            peaks[key] = np.full(n_columns, -np.inf)
+            peak_times[key] = [None] * n_columns
+        for c in np.nonzero(peak > peaks[key])[0]:
+            peaks[key][c] = peak[c]
+            peak_times[key][c] = data.index[top[c]].isoformat()
+
+        # Trapezoid weights over [carry] + chunk
+        if carry is not None:
+            ns = np.concatenate(([carry[0]], ns))
+            values = np.vstack((carry[1], values))
+            sunny = np.concatenate(([carry[2]], sunny))
+            month = np.concatenate(([carry[3]], month))
+        weights = np.zeros(len(ns))
+        if len(ns) > 1:
+            half = np.diff(ns) / (2 * NS_PER_HOUR)
+            weights[:-1] += half
+            weights[1:] += half
+        for m in np.unique(month):
+            rows = month == m
+            m = int(m)
+            energy[m] = energy.get(m, np.zeros(n_columns)) + weights[rows] @ values[rows]
+            sunshine[m] = sunshine.get(m, 0.0) + float(weights[rows] @ sunny[rows])
+        carry = (ns[-1], values[-1], sunny[-1], month[-1])
+
+    def summary(label_key: str, label: str, keys: List[int]) -> Dict[str, Any]:
+        item = {label_key: label, 'days': sum(days.get(k, 0) for k in keys)}
+        total = sum((energy.get(k, np.zeros(n_columns)) for k in keys), np.zeros(n_columns))
+        for c, name in enumerate(columns):
+            item[f'{name}_kwh_m2'] = float(total[c]) / 1000
+        item['sunshine_hours'] = sum(sunshine.get(k, 0.0) for k in keys)
+        for c, name in enumerate(columns):
+            if name not in ('ghi', 'poa'):
+                continue
+            best = max((k for k in keys if k in peaks), key=lambda k: peaks[k][c], default=None)
+            item[f'peak_{name}'] = float(peaks[best][c]) if best is not None else None
+            item[f'peak_{name}_time'] = peak_times[best][c] if best is not None else None
+        return item
+
+    month_keys = sorted(days)
+    years = sorted({k // 100 for k in month_keys})
+    return {
+        'months': [summary('month', f'{k // 100:04d}-{k % 100:02d}', [k]) for k in month_keys],
+        'years': [summary('year', str(y), [k for k in month_keys if k // 100 == y]) for y in years],
+        'total': summary('period', f'{start_date}/{end_date}', month_keys),
+        'timezone': timezone,
+    }
@@ -0,0 +1,495 @@
+"""
+Multi-building occlusion scene (server-side counterpart of frontend
+lib/building-raycast.ts).
+
+Footprints (exterior rings in [lon, lat] + height) are projected once to a
+local east/north plane around the scene centre and their edges registered in
+a uniform grid (cell → edges, CSR layout). Queries cast one ground ray per
+(time, point) toward the sun azimuth, walk the grid cells it crosses, and
+test only the edges found there — all in NumPy, in chunks of rays.
+
+A building occludes the sun when the ray enters it at ground distance d with
+z + d · tan(altitude) < height (flat-roof prism; z is the point's own height
+above ground, 0 unless elevations are given). The first occluder is the
+nearest such entry. Points inside a footprint (roofs, courtyards of
+non-holed rings) ignore that building, like castShadowRay on the client.
+
+The equirectangular projection is accurate to well under a metre over a few
+kilometres, which is the intended scene size.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.shadow_calculator import EARTH_RADIUS
+
+# Rays starting closer than this to an edge do not count it (points on walls)
+RAY_EPSILON = 1e-3
+# Sun at or below this altitude (degrees) gives no direct light, as in ShadowCalculator
+MIN_SUN_ALTITUDE = 0.1
+# First marching stage in grid cells (doubles each stage)
+FIRST_STAGE_CELLS = 4
+# (time, point) rays per vectorized chunk
+RAYS_PER_CHUNK = 65536
+# Scenes kept by get_scene (index build is reused across requests)
+SCENE_CACHE_SIZE = 16
+
+
+def _ragged_arange(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(owner, value) pairs for value in starts[i] .. starts[i] + counts[i] - 1."""
+    counts = counts.astype(np.int64)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(starts.astype(np.int64), counts) + offsets
+
+
+def _segment_cells(
+    gx0: np.ndarray,
+    gy0: np.ndarray,
+    gx1: np.ndarray,
+    gy1: np.ndarray,
+    nx: int,
+    ny: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grid cells crossed by each segment (coordinates in cell units)
+
+    Collects every x/y grid-line crossing per segment, sorts them along the
+    segment and takes the cell at each midpoint: an exact supercover,
+    without a per-segment Python loop.
+
+    Returns:
+        (segment index, flat cell index) pairs inside the grid
+    """
+    n = len(gx0)
+    dx = gx1 - gx0
+    dy = gy1 - gy0
+    fx0, fx1 = np.floor(gx0), np.floor(gx1)
+    fy0, fy1 = np.floor(gy0), np.floor(gy1)
+
+    ox, kx = _ragged_arange(np.minimum(fx0, fx1) + 1, np.abs(fx1 - fx0))
+    oy, ky = _ragged_arange(np.minimum(fy0, fy1) + 1, np.abs(fy1 - fy0))
+    tx = (kx - gx0[ox]) / dx[ox]
+    ty = (ky - gy0[oy]) / dy[oy]
+
+    base = np.arange(n)
+    owner = np.concatenate((base, base, ox, oy))
+    t = np.concatenate((np.zeros(n), np.ones(n), tx, ty))
+    order = np.lexsort((t, owner))
+    owner = owner[order]
+    t = t[order]
+
+    same = owner[1:] == owner[:-1]
+    seg = owner[1:][same]
+    tm = 0.5 * (t[1:] + t[:-1])[same]
+    ix = np.floor(gx0[seg] + tm * dx[seg]).astype(np.int64)
+    iy = np.floor(gy0[seg] + tm * dy[seg]).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    return seg[inside], iy[inside] * nx + ix[inside]
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Group values by integer key → (ptr[size + 1], values sorted by key)."""
+    order = np.argsort(keys, kind='stable')
+    ptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=ptr[1:])
+    return ptr, values[order]
+
+
+class BuildingScene:
+    """
+    Building footprints + heights with a grid index, built once per scene
+
+    Args:
+        buildings: Sequence of {'ring': [[lon, lat], ...], 'height': meters,
+                   'id': optional identifier}
+        cell_size: Grid cell size in meters (default: from footprint density)
+    """
+
+    def __init__(self, buildings: Sequence[Dict[str, Any]], cell_size: Optional[float] = None):
+        rings = []
+        heights = []
+        ids = []
+        for index, building in enumerate(buildings):
+            ring = np.asarray(building['ring'], dtype=float)
+            if ring.ndim != 2 or ring.shape[1] < 2:
+                raise ValueError(f"Building {index}: ring must be [[lon, lat], ...]")
+            ring = ring[:, :2]
+            if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                ring = ring[:-1]
+            if len(ring) < 3:
+                raise ValueError(f"Building {index}: ring needs at least 3 distinct vertices")
+            height = float(building['height'])
+            if not height > 0:
+                raise ValueError(f"Building {index}: height must be positive")
+            rings.append(ring)
+            heights.append(height)
+            ids.append(str(building.get('id') if building.get('id') is not None else index))
+        if not rings:
+            raise ValueError("At least one building is required")
+
+        self.ids: List[str] = ids
+        self.heights = np.asarray(heights)
+        self.max_height = float(self.heights.max())
+
+        all_vertices = np.concatenate(rings)
+        self.origin_lon = float((all_vertices[:, 0].min() + all_vertices[:, 0].max()) / 2)
+        self.origin_lat = float((all_vertices[:, 1].min() + all_vertices[:, 1].max()) / 2)
+        self._lon_scale = np.radians(1.0) * EARTH_RADIUS * np.cos(np.radians(self.origin_lat))
+        self._lat_scale = np.radians(1.0) * EARTH_RADIUS
+
+        # Edges stored contiguously per building: [x1, y1, x2, y2]
+        edge_counts = np.array([len(ring) for ring in rings])
+        self.edge_ptr = np.concatenate(([0], np.cumsum(edge_counts)))
+        start = np.concatenate([np.column_stack(self.to_local(r[:, 0], r[:, 1])) for r in rings])
+        end = np.concatenate([
+            np.column_stack(self.to_local(np.roll(r[:, 0], -1), np.roll(r[:, 1], -1))) for r in rings
+        ])
+        self.edges = np.hstack((start, end))
+        self.edge_building = np.repeat(np.arange(len(rings)), edge_counts)
+        # Per-edge columns for the intersection kernel (contiguous gathers)
+        self._edge_x = np.ascontiguousarray(self.edges[:, 0])
+        self._edge_y = np.ascontiguousarray(self.edges[:, 1])
+        self._edge_dx = self.edges[:, 2] - self.edges[:, 0]
+        self._edge_dy = self.edges[:, 3] - self.edges[:, 1]
+        self._edge_height = self.heights[self.edge_building]
+
+        self.bbox_min = start.min(axis=0)
+        self.bbox_max = start.max(axis=0)
+        extent = np.maximum(self.bbox_max - self.bbox_min, 1.0)
+        if cell_size is None:
+            # About one footprint per cell, kept between 5 m and 200 m
+            cell_size = float(np.clip(np.sqrt(extent[0] * extent[1] / len(rings)), 5.0, 200.0))
+        self.cell_size = float(cell_size)
+        self.nx = int(np.ceil(extent[0] / self.cell_size)) + 1
+        self.ny = int(np.ceil(extent[1] / self.cell_size)) + 1
+        self.grid_min = self.bbox_min - self.cell_size / 2
+
+        # Edge index: cell → edges crossing it
+        gx0, gy0 = self._grid_coords(self.edges[:, 0], self.edges[:, 1])
+        gx1, gy1 = self._grid_coords(self.edges[:, 2], self.edges[:, 3])
+        edge_of_pair, cell_of_pair = _segment_cells(gx0, gy0, gx1, gy1, self.nx, self.ny)
+        self.cell_ptr, self.cell_edges = _csr(cell_of_pair, edge_of_pair, self.nx * self.ny)
+
+        # Footprint index: cell → buildings whose bbox covers it (point-in-polygon)
+        lo = np.floor(self._grid_coords(*np.minimum.reduceat(start, self.edge_ptr[:-1]).T))
+        hi = np.floor(self._grid_coords(*np.maximum.reduceat(start, self.edge_ptr[:-1]).T))
+        span_x = (hi[0] - lo[0] + 1).astype(np.int64)
+        span_y = (hi[1] - lo[1] + 1).astype(np.int64)
+        owner, flat = _ragged_arange(np.zeros(len(rings)), span_x * span_y)
+        cells = (lo[1][owner] + flat // span_x[owner]) * self.nx + lo[0][owner] + flat % span_x[owner]
+        self.bcell_ptr, self.bcell_buildings = _csr(cells.astype(np.int64), owner, self.nx * self.ny)
+
+    @classmethod
+    def from_geojson(cls, collection: Dict[str, Any], default_height: float = 12.0, **kwargs) -> 'BuildingScene':
+        """
+        Scene from a GeoJSON FeatureCollection of Polygon/MultiPolygon footprints
+
+        Height comes from properties.height (or render_height), else
+        building:levels × 3 m, else default_height. Only exterior rings are used.
+        """
+        buildings = []
+        for index, feature in enumerate(collection.get('features', [])):
+            geometry = feature.get('geometry') or {}
+            props = feature.get('properties') or {}
+            height = props.get('height', props.get('render_height'))
+            if height is None and props.get('building:levels') is not None:
+                height = float(props['building:levels']) * 3
+            height = float(height) if height is not None else default_height
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            for polygon in polygons:
+                buildings.append({
+                    'id': feature.get('id', props.get('id', index)),
+                    'ring': polygon[0],
+                    'height': height,
+                })
+        return cls(buildings, **kwargs)
+
+    def to_local(self, lon, lat) -> Tuple[np.ndarray, np.ndarray]:
+        """[lon, lat] → east/north meters from the scene origin."""
+        x = (np.asarray(lon, dtype=float) - self.origin_lon) * self._lon_scale
+        y = (np.asarray(lat, dtype=float) - self.origin_lat) * self._lat_scale
+        return x, y
+
+    def to_lonlat(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """East/north meters from the scene origin → [lon, lat]."""
+        return (
+            self.origin_lon + np.asarray(x, dtype=float) / self._lon_scale,
+            self.origin_lat + np.asarray(y, dtype=float) / self._lat_scale,
+        )
+
+    def _grid_coords(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            (np.asarray(x, dtype=float) - self.grid_min[0]) / self.cell_size,
+            (np.asarray(y, dtype=float) - self.grid_min[1]) / self.cell_size,
+        )
+
+    def containing_building(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Index of the footprint containing each local point (-1 if none)
+
+        Even-odd parity over the edges of candidate buildings from the grid.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        result = np.full(len(x), -1, dtype=np.int64)
+        gx, gy = self._grid_coords(x, y)
+        ix = np.floor(gx).astype(np.int64)
+        iy = np.floor(gy).astype(np.int64)
+        in_grid = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        points = np.nonzero(in_grid)[0]
+        cells = iy[points] * self.nx + ix[points]
+
+        # (point, candidate building) pairs
+        pair_point, offset = _ragged_arange(self.bcell_ptr[cells], self.bcell_ptr[cells + 1] - self.bcell_ptr[cells])
+        pair_point = points[pair_point]
+        pair_building = self.bcell_buildings[offset]
+        if len(pair_building) == 0:
+            return result
+
+        # (pair, edge) crossings of a ray toward +x
+        starts = self.edge_ptr[pair_building]
+        pair, edge = _ragged_arange(starts, self.edge_ptr[pair_building + 1] - starts)
+        px = x[pair_point[pair]]
+        py = y[pair_point[pair]]
+        x1, y1, x2, y2 = self.edges[edge].T
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = straddles & (px < (x2 - x1) * (py - y1) / (y2 - y1) + x1)
+        inside = np.bincount(pair, weights=crossing, minlength=len(pair_point)) % 2 == 1
+        result[pair_point[inside]] = pair_building[inside]
+        return result
+
+    def _cast(
+        self,
+        px: np.ndarray,
+        py: np.ndarray,
+        pz: np.ndarray,
+        inside: np.ndarray,
+        tan_alt: np.ndarray,
+        ux: np.ndarray,
+        uy: np.ndarray,
+        length: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """First occluding building and its entry distance for one chunk of rays."""
+        n = len(px)
+        occluder = np.full(n, -1, dtype=np.int64)
+        distance = np.full(n, np.nan)
+
+        # Clip rays to the grid box (slab test) before walking cells
+        grid_max = self.grid_min + self.cell_size * np.array([self.nx, self.ny])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_a = (self.grid_min[0] - px) / ux
+            t_b = (grid_max[0] - px) / ux
+            t_c = (self.grid_min[1] - py) / uy
+            t_d = (grid_max[1] - py) / uy
+        t_enter = np.maximum.reduce([
+            np.zeros(n),
+            np.where(ux != 0, np.minimum(t_a, t_b), -np.inf),
+            np.where(uy != 0, np.minimum(t_c, t_d), -np.inf),
+        ])
+        t_exit = np.minimum.reduce([
+            length,
+            np.where(ux != 0, np.maximum(t_a, t_b), np.inf),
+            np.where(uy != 0, np.maximum(t_c, t_d), np.inf),
+        ])
+        # Rays that start outside the x (or y) slab and run parallel to it miss
+        parallel_miss = ((ux == 0) & ((px < self.grid_min[0]) | (px > grid_max[0]))) | (
+            (uy == 0) & ((py < self.grid_min[1]) | (py > grid_max[1]))
+        )
+        rays = np.nonzero((t_enter <= t_exit) & ~parallel_miss)[0]
+        if len(rays) == 0:
+            return occluder, distance
+
+        # March in stages of growing length; rays leave once they hit, so
+        # dense scenes do not pay for edges far beyond the first occluder
+        seg_start = t_enter[rays]
+        seg_length = FIRST_STAGE_CELLS * self.cell_size
+        while len(rays):
+            seg_end = np.minimum(seg_start + seg_length, t_exit[rays])
+            stage_occluder, stage_distance = self._cast_segment(
+                px, py, pz, inside, tan_alt, ux, uy, rays, seg_start, seg_end
+            )
+            hit = stage_occluder >= 0
+            occluder[rays[hit]] = stage_occluder[hit]
+            distance[rays[hit]] = stage_distance[hit]
+            more = ~hit & (seg_end < t_exit[rays])
+            rays, seg_start = rays[more], seg_end[more]
+            seg_length *= 2
+        return occluder, distance
+
+    def _cast_segment(
+        self,
+        px: np.ndarray,
+        py: np.ndarray,
+        pz: np.ndarray,
+        inside: np.ndarray,
+        tan_alt: np.ndarray,
+        ux: np.ndarray,
+        uy: np.ndarray,
+        rays: np.ndarray,
+        t0: np.ndarray,
+        t1: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest blocking entry with t0 <= t <= t1 for the given rays (-1/NaN if none)."""
+        occluder = np.full(len(rays), -1, dtype=np.int64)
+        distance = np.full(len(rays), np.nan)
+        rx, ry, rux, ruy = px[rays], py[rays], ux[rays], uy[rays]
+        gx0, gy0 = self._grid_coords(rx + t0 * rux, ry + t0 * ruy)
+        gx1, gy1 = self._grid_coords(rx + t1 * rux, ry + t1 * ruy)
+        ray_of_cell, cells = _segment_cells(gx0, gy0, gx1, gy1, self.nx, self.ny)
+
+        # (ray, edge) candidates from the cells each ray crosses
+        pair, offset = _ragged_arange(self.cell_ptr[cells], self.cell_ptr[cells + 1] - self.cell_ptr[cells])
+        ray = ray_of_cell[pair]
+        edge = self.cell_edges[offset]
+        keep = self.edge_building[edge] != inside[rays][ray]
+        ray, edge = ray[keep], edge[keep]
+        if len(ray) == 0:
+            return occluder, distance
+
+        # Ray p + t·u against edge a + s·(b - a)
+        ex = self._edge_dx[edge]
+        ey = self._edge_dy[edge]
+        wx = self._edge_x[edge] - rx[ray]
+        wy = self._edge_y[edge] - ry[ray]
+        ray_ux = rux[ray]
+        ray_uy = ruy[ray]
+        den = ray_ux * ey - ray_uy * ex
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (wx * ey - wy * ex) / den
+            s = (wx * ray_uy - wy * ray_ux) / den
+        hit = (
+            (np.abs(den) > 1e-12)
+            & (s >= 0) & (s <= 1)
+            & (t > np.maximum(t0[ray], RAY_EPSILON)) & (t <= t1[ray])
+            & (pz[rays][ray] + t * tan_alt[rays][ray] < self._edge_height[edge])
+        )
+        ray, t = ray[hit], t[hit]
+        if len(ray) == 0:
+            return occluder, distance
+        building = self.edge_building[edge[hit]]
+
+        order = np.lexsort((t, ray))
+        first = order[np.unique(ray[order], return_index=True)[1]]
+        occluder[ray[first]] = building[first]
+        distance[ray[first]] = t[first]
+        return occluder, distance
+
+    def first_occluders(
+        self,
+        lons,
+        lats,
+        sun_altitude,
+        sun_azimuth,
+        rays_per_chunk: int = RAYS_PER_CHUNK,
+        elevations=None,
+        mask=None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        First building blocking the sun for every (time, point)
+
+        Args:
+            lons: Point longitudes (P,)
+            lats: Point latitudes (P,)
+            sun_altitude: Sun altitudes in degrees (T,), apparent elevation
+            sun_azimuth: Sun azimuths in degrees (T,)
+            rays_per_chunk: (time, point) rays evaluated per NumPy pass
+            elevations: Optional point heights above ground in meters (P,),
+                        e.g. windows on a facade (default: ground level)
+            mask: Optional (T, P) bool; rays where it is False are not traced
+                  (reported as unobstructed)
+
+        Returns:
+            Dictionary of arrays:
+            - occluder: (T, P) building index, -1 when unobstructed or sun down
+            - distance: (T, P) ground distance to the occluder entry (m), NaN if none
+            - shaded: (T, P) bool, sun up but blocked by a building
+            - sun_up: (T,) bool, altitude above MIN_SUN_ALTITUDE
+            - inside: (P,) index of the footprint containing the point, -1 if none
+        """
+        x, y = self.to_local(np.atleast_1d(lons), np.atleast_1d(lats))
+        altitude = np.atleast_1d(np.asarray(sun_altitude, dtype=float))
+        azimuth = np.atleast_1d(np.asarray(sun_azimuth, dtype=float))
+        if altitude.shape != azimuth.shape:
+            raise ValueError("sun_altitude and sun_azimuth must have the same length")
+        n_times, n_points = len(altitude), len(x)
+        if elevations is None:
+            z = np.zeros(n_points)
+        else:
+            z = np.broadcast_to(np.asarray(elevations, dtype=float), (n_points,))
+
+        inside = self.containing_building(x, y)
+        sun_up = altitude > MIN_SUN_ALTITUDE
+        occluder = np.full((n_times, n_points), -1, dtype=np.int64)
+        distance = np.full((n_times, n_points), np.nan)
+
+        up_times = np.nonzero(sun_up)[0]
+        if len(up_times) and n_points:
+            tan_alt = np.tan(np.radians(altitude[up_times]))
+            ux_t = np.sin(np.radians(azimuth[up_times]))
+            uy_t = np.cos(np.radians(azimuth[up_times]))
+            # Beyond (max_height - z) / tan(alt) no building can reach the ray
+            reach_t = self.max_height / tan_alt
+
+            total = len(up_times) * n_points
+            traced = None if mask is None else np.flatnonzero(np.asarray(mask, dtype=bool)[up_times])
+            if traced is not None:
+                total = len(traced)
+            for start in range(0, total, rays_per_chunk):
+                flat = np.arange(start, min(start + rays_per_chunk, total))
+                if traced is not None:
+                    flat = traced[flat]
+                ti, pi = np.divmod(flat, n_points)
+                chunk_occluder, chunk_distance = self._cast(
+                    x[pi], y[pi], z[pi], inside[pi], tan_alt[ti], ux_t[ti], uy_t[ti],
+                    np.maximum(reach_t[ti] - z[pi] / tan_alt[ti], 0.0),
+                )
+                occluder[up_times[ti], pi] = chunk_occluder
+                distance[up_times[ti], pi] = chunk_distance
+
+        return {
+            'occluder': occluder,
+            'distance': distance,
+            'shaded': occluder >= 0,
+            'sun_up': sun_up,
+            'inside': inside,
+        }
+
+    def shaded_mask(self, lons, lats, sun_altitude, sun_azimuth) -> np.ndarray:
+        """(T, P) bool: sun up and blocked by a building."""
+        return self.first_occluders(lons, lats, sun_altitude, sun_azimuth)['shaded']
+
+
+_scenes: 'OrderedDict[str, BuildingScene]' = OrderedDict()
+_scenes_lock = threading.Lock()
+
+
+def get_scene(buildings: Sequence[Dict[str, Any]], cell_size: Optional[float] = None) -> BuildingScene:
+    """
+    BuildingScene for these footprints, reusing the index of identical recent scenes
+    """
+    key = hashlib.blake2b(
+        json.dumps([buildings, cell_size], sort_keys=True, default=str).encode(),
+        digest_size=16,
+    ).hexdigest()
+    with _scenes_lock:
+        scene = _scenes.get(key)
+        if scene is not None:
+            _scenes.move_to_end(key)
+            return scene
+    scene = BuildingScene(buildings, cell_size=cell_size)
+    with _scenes_lock:
+        _scenes[key] = scene
+        while len(_scenes) > SCENE_CACHE_SIZE:
+            _scenes.popitem(last=False)
+    return scene
@@ -0,0 +1,239 @@
+"""
+Precomputed geocentric ephemeris table (one row per UTC minute).
+
+The location-independent SPA terms (apparent sidereal time, right ascension,
+declination, parallax, equation of time) are written once to a local .npy
+file plus a small JSON sidecar. Readers open it with ``mmap_mode='r'`` so
+every worker process shares the same pages through the OS page cache, and a
+solar position becomes a table lookup + the topocentric trig in spa_engine.
+
+Build:
+    python -m app.services.ephemeris_store build --start-year 2024 --years 10 --out data/ephemeris.npy
+Verify:
+    python -m app.services.ephemeris_store verify --out data/ephemeris.npy
+"""
+import argparse
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pvlib import solarposition
+
+from app.core.config import settings
+from app.services import spa_engine
+
+COLUMNS = ('v', 'alpha', 'delta', 'xi', 'eot')
+STEP_SECONDS = 60
+FORMAT_VERSION = 1
+# Rows evaluated per build chunk (~1 week of minutes)
+BUILD_CHUNK_ROWS = 7 * 1440
+# Columns that wrap at 360° and must be unwrapped before interpolation
+_WRAPPED = (0, 1)
+
+
+def _sidecar_path(path: str) -> str:
+    return f"{path}.json"
+
+
+class EphemerisStore:
+    """Read-only, memory-mapped view of a built ephemeris table."""
+
+    def __init__(self, path: str):
+        with open(_sidecar_path(path), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION or tuple(meta.get('columns', ())) != COLUMNS:
+            raise ValueError(f"Unsupported ephemeris table format: {path}")
+
+        self.path = path
+        self.meta = meta
+        self.start_unix = float(meta['start_unix'])
+        self.step_seconds = float(meta['step_seconds'])
+        self.delta_t = float(meta['delta_t'])
+        self.table = np.load(path, mmap_mode='r')
+        self.rows = self.table.shape[0]
+        self.end_unix = self.start_unix + (self.rows - 1) * self.step_seconds
+
+    def covers(self, unixtime: np.ndarray) -> bool:
+        """True when every timestamp lies inside the table span."""
+        if len(unixtime) == 0:
+            return False
+        return bool(unixtime.min() >= self.start_unix and unixtime.max() <= self.end_unix)
+
+    def lookup(self, unixtime: np.ndarray) -> Optional[spa_engine.GeocentricTerms]:
+        """
+        Geocentric terms at arbitrary UTC seconds (linear between minutes)
+
+        Args:
+            unixtime: Seconds since epoch (UTC)
+
+        Returns:
+            GeocentricTerms, or None when any timestamp is outside the table
+        """
+        unixtime = np.atleast_1d(np.asarray(unixtime, dtype=np.float64))
+        if not self.covers(unixtime):
+            return None
+
+        position = (unixtime - self.start_unix) / self.step_seconds
+        lower = np.minimum(np.floor(position).astype(np.int64), self.rows - 2)
+        frac = (position - lower)[:, None]
+
+        # Fancy indexing touches only the pages holding the requested rows
+        left = self.table[lower]
+        right = self.table[lower + 1]
+        step = right - left
+        for col in _WRAPPED:
+            step[:, col] = (step[:, col] + 180.0) % 360.0 - 180.0
+        values = left + frac * step
+        for col in _WRAPPED:
+            values[:, col] %= 360.0
+
+        return spa_engine.GeocentricTerms(*(values[:, i] for i in range(len(COLUMNS))))
+
+    def verify(
+        self,
+        samples: int = 2000,
+        seed: int = 0,
+    ) -> Dict[str, float]:
+        """
+        Compare table-driven positions with get_solarposition('nrel_numpy')
+
+        Random sub-minute timestamps inside the span and random sites.
+
+        Returns:
+            Maximum absolute errors in degrees (elevation, azimuth)
+        """
+        rng = np.random.default_rng(seed)
+        unixtime = rng.uniform(self.start_unix, self.end_unix, samples)
+        times = pd.DatetimeIndex(pd.to_datetime(unixtime, unit='s', utc=True))
+        lats = rng.uniform(-85.0, 85.0, samples)
+        lons = rng.uniform(-180.0, 180.0, samples)
+
+        terms = self.lookup(unixtime)
+        fast = spa_engine.topocentric_positions(terms, lats, lons)
+
+        max_elevation = 0.0
+        max_azimuth = 0.0
+        for i in range(samples):
+            reference = solarposition.get_solarposition(
+                times[i:i + 1], lats[i], lons[i], method='nrel_numpy', delta_t=self.delta_t
+            )
+            max_elevation = max(
+                max_elevation,
+                abs(float(reference['apparent_elevation'].iloc[0]) - fast['apparent_elevation'][i]),
+            )
+            azimuth_error = abs(float(reference['azimuth'].iloc[0]) - fast['azimuth'][i]) % 360.0
+            max_azimuth = max(max_azimuth, min(azimuth_error, 360.0 - azimuth_error))
+
+        return {
+            'samples': samples,
+            'max_elevation_error': max_elevation,
+            'max_azimuth_error': max_azimuth,
+        }
+
+
+def build_ephemeris_table(
+    path: str,
+    start_year: int,
+    years: int,
+    delta_t: float = spa_engine.DEFAULT_DELTA_T,
+    days: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Precompute the per-minute geocentric table and write it to disk
+
+    Args:
+        path: Output .npy path (a .json sidecar is written next to it)
+        start_year: First UTC year covered
+        years: Number of years covered
+        delta_t: TT - UT1 in seconds (same default as get_solarposition)
+        days: Optional span in days instead of whole years (short tables)
+
+    Returns:
+        Sidecar metadata
+    """
+    start = datetime(start_year, 1, 1, tzinfo=timezone.utc)
+    end = datetime(start_year + years, 1, 1, tzinfo=timezone.utc)
+    start_unix = start.timestamp()
+    span_seconds = days * 86400 if days is not None else end.timestamp() - start_unix
+    # +1 row so the last minute can still interpolate
+    rows = int(span_seconds // STEP_SECONDS) + 1
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    table = np.lib.format.open_memmap(
+        path, mode='w+', dtype=np.float64, shape=(rows, len(COLUMNS))
+    )
+    for offset in range(0, rows, BUILD_CHUNK_ROWS):
+        stop = min(offset + BUILD_CHUNK_ROWS, rows)
+        unixtime = start_unix + np.arange(offset, stop, dtype=np.float64) * STEP_SECONDS
+        terms = spa_engine.geocentric_terms(unixtime, delta_t)
+        table[offset:stop] = np.column_stack(terms)
+    table.flush()
+    del table
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'columns': list(COLUMNS),
+        'start_unix': start_unix,
+        'step_seconds': STEP_SECONDS,
+        'rows': rows,
+        'start_year': start_year,
+        'years': years,
+        'days': days,
+        'delta_t': delta_t,
+    }
+    with open(_sidecar_path(path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+_store: Optional[EphemerisStore] = None
+_store_path: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def get_ephemeris_store() -> Optional[EphemerisStore]:
+    """
+    Process-wide store for settings.EPHEMERIS_PATH (None when disabled/missing)
+    """
+    global _store, _store_path
+    path = settings.EPHEMERIS_PATH
+    if not path:
+        return None
+    if _store_path == path:
+        return _store
+    with _store_lock:
+        if _store_path != path:
+            try:
+                _store = EphemerisStore(path)
+                print(f"✅ Ephemeris table mapped: {path} ({_store.rows} rows)")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Ephemeris table unavailable ({e}); using nrel_numpy")
+                _store = None
+            _store_path = path
+    return _store
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Build or verify the ephemeris table")
+    parser.add_argument('command', choices=['build', 'verify'])
+    parser.add_argument('--out', default=settings.EPHEMERIS_PATH or 'data/ephemeris.npy')
+    parser.add_argument('--start-year', type=int, default=settings.EPHEMERIS_START_YEAR)
+    parser.add_argument('--years', type=int, default=settings.EPHEMERIS_YEARS)
+    parser.add_argument('--samples', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        meta = build_ephemeris_table(args.out, args.start_year, args.years)
+        print(f"✅ Wrote {meta['rows']} rows to {args.out}")
+    print(json.dumps(EphemerisStore(args.out).verify(args.samples), indent=2))
+
+
+if __name__ == '__main__':
+    _main()
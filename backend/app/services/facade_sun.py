@@ -0,0 +1,168 @@
+"""
+Direct-sun hours on facade points (windows, balconies) with their own normals.
+
+A point receives direct sun at a step when the sun is up, in front of the
+surface (angle of incidence below 90°, pvlib.irradiance.aoi) and the ray
+toward it is not blocked by a building of the scene. The AOI test runs on
+the whole (time, point) grid first; only the rays that pass it are traced in
+BuildingScene, from the point's height above ground.
+
+Points are moved FACADE_OFFSET meters along their normal before tracing so a
+window sitting exactly on its own wall does not start inside that footprint.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from pvlib import irradiance
+
+from app.services.building_scene import MIN_SUN_ALTITUDE, RAYS_PER_CHUNK, get_scene
+from app.services.shadow_calculator import EARTH_RADIUS
+from app.services.solar_calculator import SolarCalculator
+
+# Distance (m) a point is pushed off its surface along the normal
+FACADE_OFFSET = 0.1
+# Largest (daytime step × point) workload accepted
+MAX_FACADE_RAYS = 20_000_000
+
+_solar = SolarCalculator()
+
+
+def _offset_points(points: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Point arrays with positions moved FACADE_OFFSET along the surface normal."""
+    lons = np.array([p['lon'] for p in points], dtype=float)
+    lats = np.array([p['lat'] for p in points], dtype=float)
+    heights = np.array([p.get('height') or 0.0 for p in points], dtype=float)
+    azimuths = np.array([p.get('azimuth') or 0.0 for p in points], dtype=float)
+    tilts = np.array([90.0 if p.get('tilt') is None else p['tilt'] for p in points], dtype=float)
+
+    horizontal = FACADE_OFFSET * np.sin(np.radians(tilts))
+    east = horizontal * np.sin(np.radians(azimuths))
+    north = horizontal * np.cos(np.radians(azimuths))
+    return {
+        'lons': lons + np.degrees(east / (EARTH_RADIUS * np.cos(np.radians(lats)))),
+        'lats': lats + np.degrees(north / EARTH_RADIUS),
+        'heights': heights + FACADE_OFFSET * np.cos(np.radians(tilts)),
+        'tilts': tilts,
+        'azimuths': azimuths,
+    }
+
+
+def evaluate_facade_sun(
+    center_lat: float,
+    center_lon: float,
+    buildings: Sequence[Dict[str, Any]],
+    points: Sequence[Dict[str, Any]],
+    start_date: str,
+    end_date: Optional[str] = None,
+    interval_minutes: int = 10,
+    timezone_name: Optional[str] = None,
+    altitude: float = 0,
+) -> Dict[str, Any]:
+    """
+    Direct-sun hours and longest sunlit stretch per facade point
+
+    Args:
+        center_lat: Site latitude (sun position)
+        center_lon: Site longitude (sun position)
+        buildings: Footprints for BuildingScene ({'ring', 'height', 'id'}); may be empty
+        points: [{'lon', 'lat', 'height', 'azimuth', 'tilt'}] — height above
+                ground (m), azimuth of the outward normal (0=N, 90=E), tilt
+                from horizontal (90 = vertical wall, default)
+        start_date: First local date (YYYY-MM-DD)
+        end_date: Last local date, inclusive (default: start_date)
+        interval_minutes: Sun sampling step; each sunlit step counts this long
+        timezone_name: Optional IANA timezone
+        altitude: Site elevation in meters
+
+    Returns:
+        Dictionary with:
+        - sun_hours: (P,) hours of direct sun
+        - possible_hours: (P,) hours with the sun in front of the surface (no buildings)
+        - longest_hours: (P,) longest continuous sunlit stretch in hours
+        - longest_start / longest_end: (P,) timestamps of that stretch (None if never sunlit)
+        - timezone, daytime_steps
+    """
+    if not points:
+        raise ValueError("At least one facade point is required")
+    solar_positions = _solar.calculate_solar_positions(
+        latitude=center_lat,
+        longitude=center_lon,
+        date=start_date,
+        end_date=end_date,
+        interval_minutes=interval_minutes,
+        altitude=altitude,
+        timezone_name=timezone_name,
+    )
+    sun_altitude = solar_positions['apparent_elevation'].to_numpy(dtype=float)
+    sun_zenith = solar_positions['apparent_zenith'].to_numpy(dtype=float)
+    sun_azimuth = solar_positions['azimuth'].to_numpy(dtype=float)
+    times = solar_positions.index
+    sun_up = sun_altitude > MIN_SUN_ALTITUDE
+    n_points = len(points)
+    if int(sun_up.sum()) * n_points > MAX_FACADE_RAYS:
+        raise ValueError(
+            f"Too many daytime steps × points (max {MAX_FACADE_RAYS}); "
+            "shorten the period, raise the interval or split the points"
+        )
+
+    facade = _offset_points(points)
+    scene = get_scene(list(buildings)) if buildings else None
+    facing_count = np.zeros(n_points, dtype=np.int64)
+    sunlit_count = np.zeros(n_points, dtype=np.int64)
+    run = np.zeros(n_points, dtype=np.int64)
+    best_run = np.zeros(n_points, dtype=np.int64)
+    best_end = np.full(n_points, -1, dtype=np.int64)
+
+    # Blocks of steps keep the (steps, points) arrays small; runs carry across blocks
+    block = max(1, RAYS_PER_CHUNK // n_points)
+    for start in range(0, len(times), block):
+        stop = min(start + block, len(times))
+        aoi = irradiance.aoi(
+            facade['tilts'][None, :],
+            facade['azimuths'][None, :],
+            sun_zenith[start:stop, None],
+            sun_azimuth[start:stop, None],
+        )
+        facing = sun_up[start:stop, None] & (np.asarray(aoi) < 90)
+        sunlit = facing
+        if scene is not None and facing.any():
+            shaded = scene.first_occluders(
+                facade['lons'], facade['lats'],
+                sun_altitude[start:stop], sun_azimuth[start:stop],
+                elevations=facade['heights'], mask=facing,
+            )['shaded']
+            sunlit = facing & ~shaded
+        facing_count += facing.sum(axis=0)
+        sunlit_count += sunlit.sum(axis=0)
+
+        # Run length ending at each step: steps since the last dark step
+        step = np.arange(stop - start)[:, None]
+        last_dark = np.maximum.accumulate(np.where(sunlit, -1, step), axis=0)
+        runs = np.where(last_dark < 0, run[None, :] + step + 1, step - last_dark)
+        runs[~sunlit] = 0
+        block_best = runs.argmax(axis=0)
+        block_run = runs[block_best, np.arange(n_points)]
+        longer = block_run > best_run
+        best_run[longer] = block_run[longer]
+        best_end[longer] = start + block_best[longer]
+        run = runs[-1]
+
+    step_hours = interval_minutes / 60.0
+    step = np.timedelta64(interval_minutes, 'm')
+    longest_start = [
+        times[end - length + 1].isoformat() if length else None
+        for end, length in zip(best_end.tolist(), best_run.tolist())
+    ]
+    longest_end = [
+        (times[end] + step).isoformat() if length else None
+        for end, length in zip(best_end.tolist(), best_run.tolist())
+    ]
+    return {
+        'sun_hours': sunlit_count * step_hours,
+        'possible_hours': facing_count * step_hours,
+        'longest_hours': best_run * step_hours,
+        'longest_start': longest_start,
+        'longest_end': longest_end,
+        'timezone': solar_positions.attrs.get('used_timezone'),
+        'daytime_steps': int(sun_up.sum()),
+    }
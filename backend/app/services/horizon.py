@@ -0,0 +1,327 @@
+"""
+Terrain horizon profiles from a local elevation raster (DEM).
+
+The DEM is a geographic (lon/lat) grid, either
+- a .npy array opened with ``mmap_mode='r'`` plus a JSON sidecar
+  ``<path>.json``: {"transform": [west, lon_step, 0, north, 0, -lat_step],
+  "nodata": -9999}, or
+- a GeoTIFF read window by window through rasterio (optional dependency).
+
+Only the window within HORIZON_MAX_DISTANCE of a site is read, so many sites
+can be processed against a large DEM without loading it into RAM. For each
+site, 360 azimuth rays are sampled at geometrically spaced distances; the
+horizon elevation is the largest elevation angle of the terrain, corrected
+for Earth curvature and standard terrestrial refraction. Profiles are cached
+per (DEM, rounded site, observer height).
+
+Convert a GeoTIFF to the .npy layout once:
+    python -m app.services.horizon convert --src dem.tif --out data/dem.npy
+"""
+import argparse
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import ndimage
+
+from app.core.config import settings
+from app.services.shadow_calculator import EARTH_RADIUS
+
+HORIZON_AZIMUTHS = 360
+# Distance samples per azimuth ray (geometric spacing from one cell to the max distance)
+HORIZON_SAMPLES = 400
+# Terrestrial refraction coefficient (light curves with ~1/7.5 of Earth's radius)
+REFRACTION_COEFFICIENT = 0.13
+# Eye height above the DEM surface (meters)
+DEFAULT_OBSERVER_HEIGHT = 2.0
+# Sites closer than this (in degrees, ~11 m) share one cached profile
+HORIZON_COORD_DECIMALS = 4
+HORIZON_CACHE_SIZE = 1024
+
+
+def _sidecar_path(path: str) -> str:
+    return f"{path}.json"
+
+
+class DemRaster:
+    """Read-only geographic DEM; reads windows around sites on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path.lower().endswith(('.tif', '.tiff')):
+            try:
+                import rasterio
+            except ImportError as e:
+                raise ValueError("GeoTIFF DEMs require rasterio; convert to .npy instead") from e
+            self._dataset = rasterio.open(path)
+            if self._dataset.crs is not None and not self._dataset.crs.is_geographic:
+                raise ValueError(f"DEM must use geographic coordinates (lon/lat): {path}")
+            t = self._dataset.transform
+            self.transform = (t.c, t.a, t.b, t.f, t.d, t.e)
+            self.nodata = self._dataset.nodata
+            self.shape = (self._dataset.height, self._dataset.width)
+            self._array = None
+        else:
+            with open(_sidecar_path(path), encoding='utf-8') as f:
+                meta = json.load(f)
+            self.transform = tuple(float(v) for v in meta['transform'])
+            self.nodata = meta.get('nodata')
+            self._array = np.load(path, mmap_mode='r')
+            if self._array.ndim != 2:
+                raise ValueError(f"DEM must be a 2-D array: {path}")
+            self.shape = self._array.shape
+            self._dataset = None
+        west, lon_step, _, north, _, lat_step = self.transform
+        if lon_step <= 0 or lat_step >= 0:
+            raise ValueError(f"DEM must be north-up with positive lon_step: {path}")
+
+    def pixel(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """Fractional (row, col) of cell centres for lat/lon (0, 0 = centre of the first cell)."""
+        west, lon_step, _, north, _, lat_step = self.transform
+        return (
+            (np.asarray(lat, dtype=float) - north) / lat_step - 0.5,
+            (np.asarray(lon, dtype=float) - west) / lon_step - 0.5,
+        )
+
+    def cell_size_m(self, lat: float) -> float:
+        """Approximate cell size in meters at a latitude (smaller side)."""
+        _, lon_step, _, _, _, lat_step = self.transform
+        scale = np.radians(1.0) * EARTH_RADIUS
+        return float(min(abs(lat_step) * scale, lon_step * scale * np.cos(np.radians(lat))))
+
+    def window(self, row0: int, row1: int, col0: int, col1: int) -> np.ndarray:
+        """float64 copy of rows [row0, row1) × cols [col0, col1), nodata → NaN."""
+        row0, col0 = max(row0, 0), max(col0, 0)
+        row1, col1 = min(row1, self.shape[0]), min(col1, self.shape[1])
+        if row1 <= row0 or col1 <= col0:
+            return np.empty((0, 0))
+        if self._array is not None:
+            data = np.array(self._array[row0:row1, col0:col1], dtype=np.float64)
+        else:
+            from rasterio.windows import Window
+
+            data = self._dataset.read(1, window=Window(col0, row0, col1 - col0, row1 - row0)).astype(np.float64)
+        if self.nodata is not None:
+            data[data == self.nodata] = np.nan
+        return data
+
+
+def compute_horizon_profile(
+    dem: DemRaster,
+    latitude: float,
+    longitude: float,
+    observer_height: float = DEFAULT_OBSERVER_HEIGHT,
+    max_distance: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Horizon elevation angle (degrees) for azimuths 0..359 (north, clockwise)
+
+    Args:
+        dem: DEM raster
+        latitude: Site latitude
+        longitude: Site longitude
+        observer_height: Eye height above the terrain in meters
+        max_distance: Ray length in meters (default settings.HORIZON_MAX_DISTANCE)
+
+    Returns:
+        (HORIZON_AZIMUTHS,) float64; 0 (flat) where a ray leaves the DEM at once
+    """
+    if max_distance is None:
+        max_distance = settings.HORIZON_MAX_DISTANCE
+    site_row, site_col = dem.pixel(latitude, longitude)
+    if not (0 <= site_row <= dem.shape[0] - 1 and 0 <= site_col <= dem.shape[1] - 1):
+        raise ValueError(f"Site ({latitude}, {longitude}) is outside the DEM")
+
+    # Only the window that the rays can reach
+    _, lon_step, _, _, _, lat_step = dem.transform
+    deg_lat = np.degrees(max_distance / EARTH_RADIUS)
+    deg_lon = deg_lat / max(np.cos(np.radians(latitude)), 1e-6)
+    reach_rows = int(np.ceil(deg_lat / abs(lat_step))) + 2
+    reach_cols = int(np.ceil(deg_lon / lon_step)) + 2
+    row0 = max(int(site_row) - reach_rows, 0)
+    col0 = max(int(site_col) - reach_cols, 0)
+    data = dem.window(row0, int(site_row) + reach_rows + 1, col0, int(site_col) + reach_cols + 1)
+
+    site_elevation = ndimage.map_coordinates(
+        data, [[site_row - row0], [site_col - col0]], order=1, mode='nearest'
+    )[0]
+    if not np.isfinite(site_elevation):
+        raise ValueError(f"No DEM elevation at ({latitude}, {longitude})")
+    eye = site_elevation + observer_height
+
+    first = max(dem.cell_size_m(latitude), 1.0)
+    distance = np.geomspace(first, max(max_distance, first * 2), HORIZON_SAMPLES)
+    azimuth = np.radians(np.arange(HORIZON_AZIMUTHS) * 360.0 / HORIZON_AZIMUTHS)
+    north = np.cos(azimuth)[:, None] * distance[None, :]
+    east = np.sin(azimuth)[:, None] * distance[None, :]
+    lat = latitude + np.degrees(north / EARTH_RADIUS)
+    lon = longitude + np.degrees(east / (EARTH_RADIUS * np.cos(np.radians(latitude))))
+    rows, cols = dem.pixel(lat, lon)
+    inside = (rows >= 0) & (rows <= dem.shape[0] - 1) & (cols >= 0) & (cols <= dem.shape[1] - 1)
+    terrain = ndimage.map_coordinates(
+        data, [(rows - row0).ravel(), (cols - col0).ravel()], order=1, mode='nearest'
+    ).reshape(rows.shape)
+    terrain = np.where(inside, terrain, np.nan)
+
+    # Curvature drop of the target below the observer's horizontal plane
+    drop = distance ** 2 * (1 - REFRACTION_COEFFICIENT) / (2 * EARTH_RADIUS)
+    angle = np.degrees(np.arctan2(terrain - eye - drop[None, :], distance[None, :]))
+    angle = np.where(np.isfinite(angle), angle, -np.inf).max(axis=1)
+    return np.where(np.isfinite(angle), angle, 0.0)
+
+
+def horizon_at(profile: np.ndarray, azimuth) -> np.ndarray:
+    """Horizon elevation interpolated (periodically) at sun azimuths in degrees."""
+    step = 360.0 / len(profile)
+    return np.interp(np.mod(azimuth, 360.0), np.arange(len(profile) + 1) * step, np.append(profile, profile[0]))
+
+
+def effective_sun_times(
+    solar_positions: pd.DataFrame,
+    apply_refraction: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Terrain sunrise/sunset per local day from a frame with horizon_elevation
+
+    The crossing of elevation - horizon is interpolated linearly between
+    samples; a day that starts or ends with the sun visible reports None for
+    that side (as does a day without any visible sun).
+
+    Args:
+        solar_positions: Output of SolarCalculator with horizon columns
+        apply_refraction: Elevation column to compare (default: frame attrs)
+
+    Returns:
+        [{'date', 'effective_sunrise', 'effective_sunset', 'visible_hours'}, ...]
+    """
+    if apply_refraction is None:
+        apply_refraction = solar_positions.attrs.get('apply_refraction', True)
+    elevation_column = 'apparent_elevation' if apply_refraction else 'elevation'
+    margin = (
+        solar_positions[elevation_column].to_numpy(dtype=float)
+        - solar_positions['horizon_elevation'].to_numpy(dtype=float)
+    )
+    times_ns = solar_positions.index.asi8.astype(float)
+    tz = solar_positions.index.tz
+    bounds = solar_positions.attrs.get('day_bounds') or [(None, 0, len(solar_positions))]
+
+    def crossing(i: int, j: int) -> str:
+        # Linear zero of margin between samples i and j
+        fraction = margin[i] / (margin[i] - margin[j])
+        ns = times_ns[i] + fraction * (times_ns[j] - times_ns[i])
+        return pd.Timestamp(int(round(ns)), tz='UTC').tz_convert(tz).isoformat()
+
+    days = []
+    for day, start, stop in bounds:
+        visible = np.nonzero(margin[start:stop] > 0)[0] + start
+        if len(visible) == 0:
+            days.append({'date': day, 'effective_sunrise': None, 'effective_sunset': None, 'visible_hours': 0.0})
+            continue
+        first, last = visible[0], visible[-1]
+        sunrise = crossing(first - 1, first) if first > start else None
+        sunset = crossing(last, last + 1) if last + 1 < stop else None
+        # Visible time: sum of sample spacings around visible samples
+        step_hours = np.diff(times_ns[start:stop]).mean() / 3.6e12 if stop - start > 1 else 0.0
+        days.append({
+            'date': day,
+            'effective_sunrise': sunrise,
+            'effective_sunset': sunset,
+            'visible_hours': float(len(visible) * step_hours),
+        })
+    return days
+
+
+_dem: Optional[DemRaster] = None
+_dem_path: Optional[str] = None
+_dem_lock = threading.Lock()
+
+
+def get_dem() -> Optional[DemRaster]:
+    """
+    Process-wide DEM for settings.DEM_PATH (None when disabled/missing)
+    """
+    global _dem, _dem_path
+    path = settings.DEM_PATH
+    if not path:
+        return None
+    if _dem_path == path:
+        return _dem
+    with _dem_lock:
+        if _dem_path != path:
+            try:
+                _dem = DemRaster(path)
+                print(f"✅ DEM mapped: {path} {_dem.shape}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ DEM unavailable ({e}); horizon masking disabled")
+                _dem = None
+            _dem_path = path
+    return _dem
+
+
+@lru_cache(maxsize=HORIZON_CACHE_SIZE)
+def _cached_profile(path: str, latitude: float, longitude: float, observer_height: float, max_distance: float) -> np.ndarray:
+    dem = get_dem()
+    if dem is None or dem.path != path:
+        raise ValueError("Horizon masking requires a DEM (set DEM_PATH)")
+    profile = compute_horizon_profile(dem, latitude, longitude, observer_height, max_distance)
+    profile.setflags(write=False)
+    return profile
+
+
+def get_horizon_profile(
+    latitude: float,
+    longitude: float,
+    observer_height: float = DEFAULT_OBSERVER_HEIGHT,
+) -> np.ndarray:
+    """
+    Cached horizon profile for a site from settings.DEM_PATH (read-only array)
+
+    Raises:
+        ValueError: No DEM configured, or the site is outside it
+    """
+    if get_dem() is None:
+        raise ValueError("Horizon masking requires a DEM (set DEM_PATH)")
+    return _cached_profile(
+        settings.DEM_PATH,
+        round(float(latitude), HORIZON_COORD_DECIMALS),
+        round(float(longitude), HORIZON_COORD_DECIMALS),
+        float(observer_height),
+        float(settings.HORIZON_MAX_DISTANCE),
+    )
+
+
+def convert_geotiff(src: str, out: str) -> None:
+    """Copy band 1 of a geographic GeoTIFF into the .npy + sidecar layout (block by block)."""
+    dem = DemRaster(src)
+    directory = os.path.dirname(out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{out}.tmp.npy"
+    table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=dem.shape)
+    step = 1024
+    for start in range(0, dem.shape[0], step):
+        block = dem.window(start, start + step, 0, dem.shape[1])
+        table[start:start + len(block)] = np.where(np.isfinite(block), block, -9999)
+    table.flush()
+    del table
+    os.replace(tmp_path, out)
+    with open(_sidecar_path(out), 'w', encoding='utf-8') as f:
+        json.dump({'transform': list(dem.transform), 'nodata': -9999}, f, indent=2)
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Prepare a DEM for horizon profiles")
+    parser.add_argument('command', choices=['convert'])
+    parser.add_argument('--src', required=True, help="GeoTIFF (lon/lat)")
+    parser.add_argument('--out', default=settings.DEM_PATH or 'data/dem.npy')
+    args = parser.parse_args()
+    convert_geotiff(args.src, args.out)
+    print(f"✅ Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    _main()
@@ -4,10 +4,11 @@
 """
 from __future__ import annotations
 
-import math
 import uuid
 from datetime import datetime
 
+import numpy as np
+
 from app.models.schemas import (
     SolarCalculationRequest,
     SolarCalculationResponse,
@@ -15,9 +16,12 @@ from app.models.schemas import (
     Accuracy,
     SolarSummary,
 )
+from app.core.constants import PRECISION_TIERS, DEFAULT_PRECISION
 from app.services.solar_calculator import SolarCalculator
-from app.services.shadow_calculator import ShadowCalculator
-from app.services.irradiance_calculator import IrradianceCalculator
+from app.services.shadow_calculator import ShadowCalculator, STATUS_NORMAL, STATUS_NO_SUN
+from app.services.irradiance_calculator import IrradianceCalculator, SKY_DIFFUSE_MODELS
+from app.services.horizon import effective_sun_times
+from app.services.weather_store import get_weather_store, resample_weather_series
 from app.core.redis_client import cache_manager
 from app.core.config import settings
 
@@ -26,14 +30,16 @@ _shadow = ShadowCalculator()
 _irradiance = IrradianceCalculator()
 
 
-def _safe_number(value: float):
-    try:
-        f = float(value)
-        if math.isnan(f) or math.isinf(f):
-            return None
-        return f
-    except (TypeError, ValueError):
-        return None
+def _finite_column(values) -> np.ndarray:
+    """float64 배열로 변환하고 NaN/inf 는 NaN 으로 통일."""
+    arr = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(arr), arr, np.nan)
+
+
+def _optional_floats(values: np.ndarray) -> list:
+    """직렬화 경계: NaN → None, 나머지는 Python float."""
+    finite = np.isfinite(values).tolist()
+    return [v if ok else None for v, ok in zip(values.tolist(), finite)]
 
 
 def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalculationResponse:
@@ -49,17 +55,34 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
     interval = request.datetime.interval or 60
 
     object_height = request.object.height if request.object else None
+    footprint = request.object.footprint if request.object else None
     surface_tilt = request.object.tilt if request.object else None
     surface_azimuth = request.object.azimuth if request.object else None
     apply_refraction = request.options.atmosphere if request.options else True
-    precision = request.options.precision if request.options else "medium"
+    precision = request.options.precision if request.options else DEFAULT_PRECISION
+    use_horizon = request.options.horizon if request.options else False
+    terrain_slope = request.terrain.slope if request.terrain else 0.0
+    terrain_aspect = request.terrain.aspect if request.terrain else 0.0
     poa_sky_model = (
         request.options.sky_model if request.options and request.options.sky_model else "isotropic"
     )
-    if poa_sky_model not in ("isotropic", "perez", "klucher"):
+    if poa_sky_model not in SKY_DIFFUSE_MODELS:
         poa_sky_model = "isotropic"
     # Clear-sky horizontal model stays Ineichen; sky_model applies to POA diffuse
     clear_sky_model = "ineichen"
+    include_weather = request.options.include_weather if request.options else False
+    weather_file = request.options.weather_file if request.options else None
+    decomposition = request.options.decomposition if request.options else "erbs"
+    posted_weather = request.weather if include_weather else None
+    weather_key = ""
+    if include_weather:
+        if weather_file and posted_weather is not None:
+            raise ValueError("Use either a posted weather series or options.weather_file, not both")
+        if weather_file:
+            # Cache table name changes with the file's size/mtime, so edited files miss the cache
+            weather_key = get_weather_store(weather_file).key
+        elif posted_weather is None:
+            raise ValueError("include_weather needs a posted weather series or options.weather_file")
 
     cache_key = cache_manager.generate_cache_key(
         prefix="integrated",
@@ -70,6 +93,7 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
         end=end_time,
         interval=interval,
         height=object_height,
+        footprint=footprint,
         altitude=altitude,
         tz=timezone_name or "",
         atmosphere=apply_refraction,
@@ -78,6 +102,12 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
         sky=poa_sky_model,
         tilt=surface_tilt if surface_tilt is not None else "",
         saz=surface_azimuth if surface_azimuth is not None else "",
+        horizon=use_horizon,
+        slope=terrain_slope,
+        aspect=terrain_aspect,
+        weather=weather_key,
+        weather_series=posted_weather.model_dump() if posted_weather is not None else "",
+        decomposition=decomposition if include_weather else "",
     )
 
     cached_result = cache_manager.get(cache_key)
@@ -85,18 +115,56 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
         print(f"🎯 Cache HIT: {cache_key}")
         return SolarCalculationResponse(**cached_result)
 
-    irradiance_data = _irradiance.calculate_clear_sky_irradiance(
-        latitude=lat,
-        longitude=lon,
-        date=date,
-        start_time=start_time,
-        end_time=end_time,
-        interval_minutes=interval,
-        altitude=altitude,
-        model=clear_sky_model,
-        timezone_name=timezone_name,
-        apply_refraction=apply_refraction,
-    )
+    if weather_file and include_weather:
+        # All-sky series on the weather file's own timestamps
+        irradiance_data = _irradiance.calculate_weather_irradiance(
+            latitude=lat,
+            longitude=lon,
+            weather_file=weather_file,
+            date=date,
+            start_time=start_time,
+            end_time=end_time,
+            altitude=altitude,
+            decomposition=decomposition,
+            timezone_name=timezone_name,
+            apply_refraction=apply_refraction,
+            precision=precision,
+            horizon=use_horizon,
+        )
+    else:
+        irradiance_data = _irradiance.calculate_clear_sky_irradiance(
+            latitude=lat,
+            longitude=lon,
+            date=date,
+            start_time=start_time,
+            end_time=end_time,
+            interval_minutes=interval,
+            altitude=altitude,
+            model=clear_sky_model,
+            timezone_name=timezone_name,
+            apply_refraction=apply_refraction,
+            precision=precision,
+            horizon=use_horizon,
+        )
+        if posted_weather is not None:
+            # Hourly arrays onto the request interval, then one vectorized weather pass
+            weather = resample_weather_series(
+                posted_weather.time,
+                {
+                    "cloud_cover": posted_weather.cloud_cover,
+                    "temperature": posted_weather.temperature,
+                    "pressure": posted_weather.pressure,
+                },
+                irradiance_data.index,
+            )
+            irradiance_data = _irradiance.apply_weather_series(
+                irradiance_data,
+                cloud_cover=weather.get("cloud_cover"),
+                temperature=weather.get("temperature"),
+                pressure=weather.get("pressure"),
+                decomposition=decomposition,
+                altitude=altitude,
+            )
 
     daily_totals = _irradiance.calculate_daily_total_irradiance(
         irradiance_data=irradiance_data,
@@ -109,6 +177,10 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
     max_altitude = _solar.get_max_solar_altitude(
         irradiance_data, apply_refraction=apply_refraction
     )
+    effective = (
+        effective_sun_times(irradiance_data, apply_refraction=apply_refraction)[0]
+        if use_horizon else {}
+    )
 
     alt_col = "apparent_elevation" if apply_refraction else "elevation"
     zen_col = "apparent_zenith" if apply_refraction else "zenith"
@@ -117,129 +189,140 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
     if zen_col not in irradiance_data.columns:
         zen_col = "apparent_zenith"
 
-    series_data = []
-    for idx, row in irradiance_data.iterrows():
-        sun_alt = _safe_number(row[alt_col])
-        sun_azi = _safe_number(row["azimuth"])
-        sun_zen = _safe_number(row[zen_col])
+    # 열 단위 파이프라인: 각 단계는 전체 배열에 대해 한 번만 실행
+    times = irradiance_data.index
+    sun_alt = _finite_column(irradiance_data[alt_col])
+    sun_azi = _finite_column(irradiance_data["azimuth"])
+    sun_zen = _finite_column(irradiance_data[zen_col])
+    ghi = _finite_column(irradiance_data["ghi"])
+    dni = _finite_column(irradiance_data["dni"])
+    dhi = _finite_column(irradiance_data["dhi"])
+    par = _finite_column(_irradiance.calculate_par_series(irradiance_data["ghi"]))
+    cloud_cover = (
+        _finite_column(irradiance_data["cloud_cover"])
+        if "cloud_cover" in irradiance_data.columns else np.full(len(irradiance_data), np.nan)
+    )
+    hour_angles = _solar._calculate_hour_angles(times)
+
+    poa = np.full(len(times), np.nan)
+    if surface_tilt is not None and surface_tilt > 0:
+        valid = (
+            np.isfinite(ghi)
+            & np.isfinite(dni)
+            & np.isfinite(dhi)
+            & np.isfinite(sun_zen)
+            & np.isfinite(sun_azi)
+        )
+        if poa_sky_model == "klucher":
+            # 스칼라 경로는 ghi == 0 에서 dhi / ghi 가 ZeroDivisionError → None 이었음
+            valid &= ghi != 0
+        if valid.any():
+            # Invalid sky model / inputs raise ValueError → 400 in the router
+            poa_components = _irradiance.calculate_poa_series(
+                ghi=ghi[valid],
+                dni=dni[valid],
+                dhi=dhi[valid],
+                solar_zenith=sun_zen[valid],
+                solar_azimuth=sun_azi[valid],
+                surface_tilt=float(surface_tilt),
+                surface_azimuth=float(surface_azimuth or 180.0),
+                sky_model=poa_sky_model,
+                dni_extra=irradiance_data["dni_extra"].to_numpy(dtype=float)[valid],
+                airmass=irradiance_data["airmass_relative"].to_numpy(dtype=float)[valid],
+            )
+            poa[valid] = _finite_column(poa_components["poa_global"])
 
-        ghi = _safe_number(row["ghi"])
-        dni = _safe_number(row["dni"])
-        dhi = _safe_number(row["dhi"])
-        par_val = _safe_number(_irradiance.calculate_par(row["ghi"]))
+    shadow_points = None
+    if request.object and request.object.height:
+        object_height = float(request.object.height)
+        # calculate_shadow 는 원본 값(NaN 포함)을 받으므로 raw 열 사용
+        shadow_series = _shadow.calculate_shadow_series(
+            object_height,
+            irradiance_data[alt_col].to_numpy(dtype=float),
+            irradiance_data["azimuth"].to_numpy(dtype=float),
+            terrain_slope,
+            terrain_aspect,
+        )
+        length = shadow_series["length"]
+        direction = shadow_series["direction"]
+        normal = shadow_series["status"] == STATUS_NORMAL
+        no_sun = shadow_series["status"] == STATUS_NO_SUN
+        end_lat, end_lon = _shadow.calculate_shadow_endpoints(lat, lon, length, direction)
 
-        hour_angle = _solar._calculate_hour_angle(idx, sun_azi or 0)
+        has_polygon = normal & np.isfinite(length) & ~np.isnan(direction)
+        if footprint:
+            polygons = _shadow.calculate_footprint_shadows(
+                footprint, length[has_polygon], direction[has_polygon]
+            ).tolist()
+        else:
+            width = max(1.0, object_height * 0.4)
+            polygons = _shadow.calculate_shadow_polygons(
+                lat, lon, width, length[has_polygon], direction[has_polygon]
+            ).tolist()
+        polygon_iter = iter(polygons)
 
-        poa_val = None
-        if (
-            surface_tilt is not None
-            and surface_tilt > 0
-            and ghi is not None
-            and dni is not None
-            and dhi is not None
-            and sun_zen is not None
-            and sun_azi is not None
+        shadow_points = []
+        for i, (length_val, direction_val, end_lat_val, end_lon_val) in enumerate(
+            zip(
+                _optional_floats(length),
+                direction.tolist(),
+                end_lat.tolist(),
+                end_lon.tolist(),
+            )
         ):
-            try:
-                poa = _irradiance.calculate_poa_irradiance(
-                    ghi=ghi,
-                    dni=dni,
-                    dhi=dhi,
-                    solar_zenith=sun_zen,
-                    solar_azimuth=sun_azi,
-                    surface_tilt=float(surface_tilt),
-                    surface_azimuth=float(surface_azimuth or 180.0),
-                    sky_model=poa_sky_model,
-                )
-                poa_val = _safe_number(poa.get("poa_global"))
-            except Exception:
-                poa_val = None
+            shadow_points.append({
+                "length": length_val,
+                "direction": None if no_sun[i] else direction_val,
+                "coordinates": [[lon, lat], [end_lon_val, end_lat_val]] if normal[i] else None,
+                "polygon": next(polygon_iter) if has_polygon[i] else None,
+            })
 
-        data_point = {
-            "timestamp": idx.isoformat(),
+    # 직렬화 경계: 여기서만 포인트별 dict 생성
+    series_data = []
+    for i, (ts, alt_val, azi_val, zen_val, ha, ghi_val, dni_val, dhi_val, par_val, poa_val, cloud_val) in enumerate(
+        zip(
+            times,
+            _optional_floats(sun_alt),
+            _optional_floats(sun_azi),
+            _optional_floats(sun_zen),
+            hour_angles.tolist(),
+            _optional_floats(ghi),
+            _optional_floats(dni),
+            _optional_floats(dhi),
+            _optional_floats(par),
+            _optional_floats(poa),
+            _optional_floats(cloud_cover),
+        )
+    ):
+        series_data.append({
+            "timestamp": ts.isoformat(),
             "sun": {
                 # Pydantic SunPosition requires float — coerce missing to 0
-                "altitude": sun_alt if sun_alt is not None else 0.0,
-                "azimuth": sun_azi if sun_azi is not None else 0.0,
-                "zenith": sun_zen if sun_zen is not None else 90.0,
-                "hour_angle": hour_angle,
+                "altitude": alt_val if alt_val is not None else 0.0,
+                "azimuth": azi_val if azi_val is not None else 0.0,
+                "zenith": zen_val if zen_val is not None else 90.0,
+                "hour_angle": ha,
             },
             "irradiance": {
-                "ghi": ghi if ghi is not None else 0.0,
-                "dni": dni if dni is not None else 0.0,
-                "dhi": dhi if dhi is not None else 0.0,
+                "ghi": ghi_val if ghi_val is not None else 0.0,
+                "dni": dni_val if dni_val is not None else 0.0,
+                "dhi": dhi_val if dhi_val is not None else 0.0,
                 "par": par_val,
                 "poa": poa_val,
+                "cloud_cover": cloud_val,
             },
-        }
-
-        if request.object and request.object.height:
-            shadow_result = _shadow.calculate_shadow(
-                object_height=request.object.height,
-                sun_altitude=row[alt_col],
-                sun_azimuth=row["azimuth"],
-            )
-
-            end_lat, end_lon = None, None
-            if shadow_result["status"] == "normal":
-                end_lat, end_lon = _shadow.calculate_shadow_endpoint(
-                    start_lat=lat,
-                    start_lon=lon,
-                    shadow_length=shadow_result["length"],
-                    shadow_direction=shadow_result["direction"],
-                )
-
-            length_val = (
-                None
-                if shadow_result["length"] is None
-                or (
-                    isinstance(shadow_result["length"], float)
-                    and math.isinf(shadow_result["length"])
-                )
-                else _safe_number(shadow_result["length"])
-            )
-            direction_val = (
-                shadow_result["direction"] if shadow_result["direction"] is not None else None
-            )
-
-            polygon = None
-            if (
-                length_val is not None
-                and direction_val is not None
-                and shadow_result["status"] == "normal"
-            ):
-                try:
-                    width = max(1.0, float(request.object.height) * 0.4)
-                    polygon = _shadow.calculate_shadow_polygon(
-                        center_lat=lat,
-                        center_lon=lon,
-                        object_height=float(request.object.height),
-                        object_width=width,
-                        shadow_length=float(length_val),
-                        shadow_direction=float(direction_val),
-                    )
-                except Exception:
-                    polygon = None
-
-            data_point["shadow"] = {
-                "length": length_val,
-                "direction": direction_val,
-                "coordinates": [[lon, lat], [end_lon, end_lat]]
-                if (end_lon is not None and end_lat is not None)
-                else None,
-                "polygon": polygon,
-            }
-        else:
-            data_point["shadow"] = None
-
-        series_data.append(data_point)
+            "shadow": shadow_points[i] if shadow_points is not None else None,
+        })
 
     response = SolarCalculationResponse(
         metadata=Metadata(
             request_id=str(uuid.uuid4()),
             timestamp=datetime.utcnow().isoformat(),
             version="0.1.0",
-            accuracy=Accuracy(position=0.05, irradiance=5.0),
+            accuracy=Accuracy(
+                position=PRECISION_TIERS[precision]["position_accuracy"],
+                irradiance=5.0,
+            ),
         ),
         summary=SolarSummary(
             sunrise=sun_times["sunrise"] or "N/A",
@@ -248,6 +331,8 @@ def run_integrated_calculation(request: SolarCalculationRequest) -> SolarCalcula
             day_length=sun_times["day_length"],
             max_altitude=max_altitude,
             total_irradiance=daily_totals["ghi"],
+            effective_sunrise=effective.get("effective_sunrise"),
+            effective_sunset=effective.get("effective_sunset"),
         ),
         series=series_data,
     )
@@ -4,9 +4,21 @@ Calculate solar irradiance using Clear Sky Models
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
-from pvlib import irradiance, atmosphere, location
+from typing import Dict, Any, List, Optional
+from pvlib import irradiance, atmosphere, clearsky
+from app.core.constants import DEFAULT_PRECISION, DECOMPOSITION_MODELS
 from app.services.solar_calculator import SolarCalculator
+from app.services.linke_turbidity import get_linke_turbidity_grid
+from app.services.timezone_utils import resolve_timezone
+from app.services.weather_store import get_weather_store
+
+CLEAR_SKY_MODELS = ('ineichen', 'haurwitz', 'simplified_solis')
+# Transposition models accepted for POA sky diffuse
+SKY_DIFFUSE_MODELS = ('isotropic', 'klucher', 'haydavies', 'reindl', 'perez')
+# Share of clear-sky GHI left under full overcast (%), Larson et al. (2016)
+CLOUD_COVER_OFFSET = 35.0
+# Largest great-circle distance (degrees) between the site and a weather file's station
+MAX_STATION_DISTANCE_DEG = 1.0
 
 class IrradianceCalculator:
     """
@@ -28,6 +40,9 @@ class IrradianceCalculator:
         model: str = "ineichen",
         timezone_name: str = None,
         apply_refraction: bool = True,
+        precision: str = DEFAULT_PRECISION,
+        horizon: bool = False,
+        end_date: Optional[str] = None,
     ) -> pd.DataFrame:
         """
         Calculate clear sky irradiance using specified model
@@ -43,18 +58,23 @@ class IrradianceCalculator:
             model: Clear sky model ('ineichen', 'haurwitz', 'simplified_solis')
             timezone_name: Optional IANA timezone
             apply_refraction: Prefer apparent solar angles when True
+            precision: Solar position tier ('low', 'medium', 'high')
+            horizon: Block the beam behind terrain from the DEM (DNI → 0,
+                     GHI → DHI while the sun is below the terrain horizon)
+            end_date: Optional last date, inclusive (multi-day series)
             
         Returns:
-            DataFrame with GHI, DNI, DHI columns
+            DataFrame with solar position, GHI, DNI, DHI, dni_extra,
+            airmass_relative and airmass_absolute columns (horizon=True also: horizon_elevation,
+            sun_visible)
         """
-        # Create Location object
-        loc = location.Location(
-            latitude=latitude,
-            longitude=longitude,
-            altitude=altitude
-        )
+        if model not in CLEAR_SKY_MODELS:
+            raise ValueError(
+                f"{model} is not a valid clear sky model. "
+                f"Must be one of {', '.join(CLEAR_SKY_MODELS)}"
+            )
         
-        # Get solar positions
+        # Get solar positions (the only SPA run for this request)
         solar_positions = self.solar_calculator.calculate_solar_positions(
             latitude=latitude,
             longitude=longitude,
@@ -65,19 +85,311 @@ class IrradianceCalculator:
             altitude=altitude,
             timezone_name=timezone_name,
             apply_refraction=apply_refraction,
+            precision=precision,
+            horizon=horizon,
+            end_date=end_date,
         )
         
-        # Calculate clear sky irradiance using Location object
-        clearsky = loc.get_clearsky(
-            times=solar_positions.index,
-            model=model
+        # Clear-sky models take the computed geometry directly; Location.get_clearsky
+        # would run SPA a second time. Same inputs as get_clearsky derives:
+        # apparent zenith, Kasten-Young airmass at site pressure, extraterrestrial DNI
+        times = solar_positions.index
+        apparent_zenith = solar_positions['apparent_zenith']
+        site_pressure = atmosphere.alt2pres(altitude)
+        dni_extra = irradiance.get_extra_radiation(times)
+        airmass_relative = atmosphere.get_relative_airmass(apparent_zenith)
+        airmass_absolute = atmosphere.get_absolute_airmass(airmass_relative, site_pressure)
+        
+        if model == 'ineichen':
+            linke_turbidity = self.lookup_linke_turbidity(times, latitude, longitude)
+            clear_sky = clearsky.ineichen(
+                apparent_zenith,
+                airmass_absolute,
+                linke_turbidity,
+                altitude=altitude,
+                dni_extra=dni_extra,
+            )
+        elif model == 'haurwitz':
+            clear_sky = clearsky.haurwitz(apparent_zenith)
+        else:
+            clear_sky = clearsky.simplified_solis(
+                solar_positions['apparent_elevation'],
+                pressure=site_pressure,
+                dni_extra=dni_extra,
+            )
+        
+        result = pd.concat([solar_positions, pd.DataFrame(clear_sky, index=times)], axis=1)
+        # concat drops attrs (timezone, day bounds, refraction flag)
+        result.attrs = dict(solar_positions.attrs)
+        result['dni_extra'] = dni_extra
+        result['airmass_relative'] = airmass_relative
+        result['airmass_absolute'] = airmass_absolute
+        
+        if horizon:
+            # Diffuse sky is kept; only the beam is blocked by terrain
+            blocked = ~result['sun_visible'].to_numpy(dtype=bool)
+            result.loc[blocked, 'dni'] = 0.0
+            result.loc[blocked, 'ghi'] = result.loc[blocked, 'dhi']
+        
+        return result
+    
+    def calculate_weather_irradiance(
+        self,
+        latitude: float,
+        longitude: float,
+        weather_file: str,
+        date: str,
+        end_date: Optional[str] = None,
+        start_time: str = "00:00",
+        end_time: str = "23:59",
+        altitude: float = 0,
+        decomposition: str = "erbs",
+        timezone_name: str = None,
+        apply_refraction: bool = True,
+        precision: str = DEFAULT_PRECISION,
+        horizon: bool = False,
+    ) -> pd.DataFrame:
+        """
+        All-sky irradiance from a local weather file (TMY3, EPW or CSV)
+        
+        Samples are the file's own timestamps (interval midpoints) inside the
+        local window; typical-year files are replayed on the requested
+        calendar. Rows with GHI but no DNI/DHI are split with Erbs or DIRINT
+        (closure DHI = GHI - DNI·cos z), rows with DNI/DHI but no GHI get the
+        closure GHI. Files that record a station location (TMY3, EPW) are
+        rejected for sites more than MAX_STATION_DISTANCE_DEG away.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            weather_file: File name inside settings.WEATHER_DIR
+            date: First local date (YYYY-MM-DD)
+            end_date: Last local date, inclusive (default: date)
+            start_time: Daily window start (HH:MM) on the first date
+            end_time: Window end (HH:MM) on the last date, inclusive
+            altitude: Elevation above sea level in meters
+            decomposition: 'erbs' or 'dirint'
+            timezone_name: Optional IANA timezone
+            apply_refraction: Prefer apparent solar angles when True
+            precision: Solar position tier ('low', 'medium', 'high')
+            horizon: Block the beam behind terrain from the DEM
+            
+        Returns:
+            DataFrame shaped like calculate_clear_sky_irradiance plus
+            temp_air (°C) and pressure (mbar) columns; attrs also carry
+            weather_file and decomposition
+        """
+        if decomposition not in DECOMPOSITION_MODELS:
+            raise ValueError(
+                f"{decomposition} is not a valid decomposition model. "
+                f"Must be one of {', '.join(DECOMPOSITION_MODELS)}"
+            )
+        store = get_weather_store(weather_file)
+        station_lat, station_lon = store.meta.get('latitude'), store.meta.get('longitude')
+        if station_lat is not None and station_lon is not None:
+            # Haversine central angle between the site and the station
+            phi1, phi2 = np.radians(latitude), np.radians(station_lat)
+            half = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(
+                np.radians(station_lon - longitude) / 2
+            ) ** 2
+            distance = np.degrees(2 * np.arcsin(np.sqrt(min(half, 1.0))))
+            if distance > MAX_STATION_DISTANCE_DEG:
+                raise ValueError(
+                    f"Weather file {weather_file} was recorded at ({station_lat:.3f}, {station_lon:.3f}), "
+                    f"{distance:.1f}° from the site (max {MAX_STATION_DISTANCE_DEG}°)"
+                )
+        tz = resolve_timezone(latitude, longitude, timezone_name)
+        start = pd.Timestamp(f"{date} {start_time}").tz_localize(tz)
+        end = pd.Timestamp(f"{end_date or date} {end_time}").tz_localize(tz) + pd.Timedelta(minutes=1)
+        if end <= start:
+            raise ValueError("end_date/end_time must be after date/start_time")
+        weather = store.select(start, end)
+        if weather.empty:
+            raise ValueError(f"Weather file {weather_file} has no rows between {start} and {end}")
+        weather.index = weather.index.tz_convert(tz)
+        
+        solar_positions = self.solar_calculator.calculate_solar_positions(
+            latitude=latitude,
+            longitude=longitude,
+            times=weather.index,
+            altitude=altitude,
+            timezone_name=timezone_name,
+            apply_refraction=apply_refraction,
+            precision=precision,
+            horizon=horizon,
         )
+        times = solar_positions.index
+        zenith = solar_positions['zenith'].to_numpy(dtype=float)
+        cos_zenith = np.cos(np.radians(zenith))
+        ghi = weather['ghi'].to_numpy(dtype=float)
+        dni = weather['dni'].to_numpy(dtype=float)
+        dhi = weather['dhi'].to_numpy(dtype=float)
+        # Missing pressure falls back to the standard atmosphere at the site
+        pressure = weather['pressure'].to_numpy(dtype=float)
+        pressure = np.where(np.isfinite(pressure), pressure, atmosphere.alt2pres(altitude) / 100.0)
         
-        # Combine with solar positions
-        result = pd.concat([solar_positions, clearsky], axis=1)
+        closure = np.isnan(ghi) & np.isfinite(dni) & np.isfinite(dhi)
+        ghi[closure] = dhi[closure] + dni[closure] * np.maximum(cos_zenith[closure], 0.0)
+        split = np.isfinite(ghi) & (np.isnan(dni) | np.isnan(dhi))
+        if split.any():
+            split_dni, split_dhi = self.decompose_ghi(ghi, zenith, times, decomposition, pressure)
+            dni[split] = split_dni[split]
+            dhi[split] = split_dhi[split]
+        
+        # The file's own pressure and temperature drive refraction at every step
+        self.solar_calculator.apply_atmosphere(solar_positions, pressure, weather['temp_air'].to_numpy(dtype=float))
+        dni_extra = irradiance.get_extra_radiation(times)
+        airmass_relative = atmosphere.get_relative_airmass(solar_positions['apparent_zenith'])
+        airmass_absolute = atmosphere.get_absolute_airmass(airmass_relative, pressure * 100.0)
+        
+        result = solar_positions.copy()
+        result.attrs = dict(solar_positions.attrs, weather_file=weather_file, decomposition=decomposition)
+        result['ghi'] = ghi
+        result['dni'] = dni
+        result['dhi'] = dhi
+        result['dni_extra'] = dni_extra
+        result['airmass_relative'] = airmass_relative
+        result['airmass_absolute'] = airmass_absolute
+        result['temp_air'] = weather['temp_air'].to_numpy(dtype=float)
+        result['pressure'] = pressure
+        
+        if horizon:
+            blocked = ~result['sun_visible'].to_numpy(dtype=bool)
+            result.loc[blocked, 'dni'] = 0.0
+            result.loc[blocked, 'ghi'] = result.loc[blocked, 'dhi']
         
         return result
     
+    def decompose_ghi(
+        self,
+        ghi: np.ndarray,
+        zenith: np.ndarray,
+        times: pd.DatetimeIndex,
+        decomposition: str = "erbs",
+        pressure: Optional[np.ndarray] = None,
+    ) -> tuple:
+        """
+        Split GHI into DNI and DHI (Erbs or DIRINT), whole series at once
+        
+        Args:
+            ghi: GHI per step (W/m², NaN treated as 0)
+            zenith: True (geometric) solar zenith per step (degrees)
+            times: Timestamps of the steps
+            decomposition: 'erbs' or 'dirint'
+            pressure: Pressure per step in mbar for DIRINT (default: standard)
+            
+        Returns:
+            (dni, dhi) arrays; DHI from closure GHI - DNI·cos z for DIRINT
+        """
+        if decomposition not in DECOMPOSITION_MODELS:
+            raise ValueError(
+                f"{decomposition} is not a valid decomposition model. "
+                f"Must be one of {', '.join(DECOMPOSITION_MODELS)}"
+            )
+        ghi = np.nan_to_num(np.asarray(ghi, dtype=float))
+        zenith = np.asarray(zenith, dtype=float)
+        if decomposition == 'erbs':
+            parts = irradiance.erbs(ghi, zenith, times)
+            return np.asarray(parts['dni'], dtype=float), np.asarray(parts['dhi'], dtype=float)
+        # DIRINT's Δkt' term needs the neighbouring samples: run on the full series
+        pressure_pa = 101325.0 if pressure is None else np.asarray(pressure, dtype=float) * 100.0
+        dni = np.nan_to_num(np.asarray(irradiance.dirint(
+            pd.Series(ghi, index=times), pd.Series(zenith, index=times), times, pressure=pressure_pa,
+        ), dtype=float))
+        dhi = np.maximum(ghi - dni * np.maximum(np.cos(np.radians(zenith)), 0.0), 0.0)
+        return dni, dhi
+    
+    def apply_weather_series(
+        self,
+        irradiance_data: pd.DataFrame,
+        cloud_cover: Optional[np.ndarray] = None,
+        temperature: Optional[np.ndarray] = None,
+        pressure: Optional[np.ndarray] = None,
+        decomposition: str = "erbs",
+        altitude: float = 0,
+    ) -> pd.DataFrame:
+        """
+        Cloud-adjust a clear-sky frame and re-refract with per-step weather
+        
+        GHI is scaled linearly with cloud cover, keeping CLOUD_COVER_OFFSET %
+        under full overcast (Larson et al. 2016, as in pvlib's former
+        forecast models), then split with decompose_ghi. Steps without a
+        cloud value keep the clear-sky values. Pressure and temperature
+        re-apply SPA refraction (SolarCalculator.apply_atmosphere) and set
+        the absolute airmass.
+        
+        Args:
+            irradiance_data: Frame from calculate_clear_sky_irradiance
+            cloud_cover: Cloud cover per step (%), NaN = unknown
+            temperature: Air temperature per step (°C), NaN = default
+            pressure: Surface pressure per step (mbar/hPa), NaN = site standard
+            decomposition: 'erbs' or 'dirint'
+            altitude: Site elevation (m) for the standard pressure fallback
+            
+        Returns:
+            New frame with adjusted ghi/dni/dhi, apparent angles and airmass,
+            plus cloud_cover, temp_air and pressure columns
+        """
+        result = irradiance_data.copy()
+        result.attrs = dict(irradiance_data.attrs, decomposition=decomposition)
+        n_times = len(result)
+        
+        def per_step(values) -> np.ndarray:
+            if values is None:
+                return np.full(n_times, np.nan)
+            return np.broadcast_to(np.asarray(values, dtype=float), (n_times,)).copy()
+        
+        cloud_cover = np.clip(per_step(cloud_cover), 0.0, 100.0)
+        temperature = per_step(temperature)
+        pressure = per_step(pressure)
+        pressure = np.where(np.isfinite(pressure), pressure, atmosphere.alt2pres(altitude) / 100.0)
+        
+        self.solar_calculator.apply_atmosphere(result, pressure, temperature)
+        airmass_relative = atmosphere.get_relative_airmass(result['apparent_zenith'])
+        result['airmass_relative'] = airmass_relative
+        result['airmass_absolute'] = atmosphere.get_absolute_airmass(airmass_relative, pressure * 100.0)
+        
+        cloudy = np.isfinite(cloud_cover)
+        if cloudy.any():
+            ghi = result['ghi'].to_numpy(dtype=float)
+            scale = (CLOUD_COVER_OFFSET + (100.0 - CLOUD_COVER_OFFSET) * (1.0 - cloud_cover / 100.0)) / 100.0
+            ghi = np.where(cloudy, ghi * scale, ghi)
+            dni, dhi = self.decompose_ghi(ghi, result['zenith'].to_numpy(dtype=float), result.index,
+                                          decomposition, pressure)
+            if 'sun_visible' in result.columns:
+                # Beam stays blocked behind terrain; all of the sky's GHI is diffuse there
+                blocked = ~result['sun_visible'].to_numpy(dtype=bool)
+                dni[blocked] = 0.0
+                dhi[blocked] = ghi[blocked]
+            result['ghi'] = ghi
+            result['dni'] = np.where(cloudy, dni, result['dni'].to_numpy(dtype=float))
+            result['dhi'] = np.where(cloudy, dhi, result['dhi'].to_numpy(dtype=float))
+        
+        result['cloud_cover'] = cloud_cover
+        result['temp_air'] = temperature
+        result['pressure'] = pressure
+        return result
+    
+    def lookup_linke_turbidity(
+        self,
+        times: pd.DatetimeIndex,
+        latitude: float,
+        longitude: float,
+    ) -> pd.Series:
+        """
+        Linke turbidity from the shared in-memory grid (no file I/O per request)
+        
+        Args:
+            times: Timestamps
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            
+        Returns:
+            Day-of-year interpolated Linke turbidity, same as
+            pvlib.clearsky.lookup_linke_turbidity
+        """
+        return get_linke_turbidity_grid().lookup(times, latitude, longitude)
+    
     def calculate_daily_total_irradiance(
         self,
         irradiance_data: pd.DataFrame,
@@ -88,16 +400,17 @@ class IrradianceCalculator:
         
         Args:
             irradiance_data: DataFrame with ghi, dni, dhi columns
-            interval_minutes: Time interval in minutes
+            interval_minutes: Time interval in minutes (only used when the
+                              index carries no timestamps)
             
         Returns:
             Dictionary with total GHI, DNI, DHI in kWh/m²
         """
-        # Convert interval to hours
-        interval_hours = interval_minutes / 60.0
-
-        # Create time axis in hours for proper integration
-        time_hours = np.arange(len(irradiance_data)) * interval_hours
+        # Time axis in hours from the real timestamps (DST days, gaps), else even spacing
+        if isinstance(irradiance_data.index, pd.DatetimeIndex) and len(irradiance_data):
+            time_hours = (irradiance_data.index.asi8 - irradiance_data.index.asi8[0]) / 3.6e12
+        else:
+            time_hours = np.arange(len(irradiance_data)) * (interval_minutes / 60.0)
 
         # Integrate using trapezoidal rule with time axis (W/m² * hours → Wh/m² → kWh/m²)
         trapz = getattr(np, "trapezoid", None) or getattr(np, "trapz")
@@ -121,7 +434,9 @@ class IrradianceCalculator:
         surface_tilt: float,
         surface_azimuth: float,
         albedo: float = 0.2,
-        sky_model: str = 'isotropic'
+        sky_model: str = 'isotropic',
+        dni_extra: Optional[float] = None,
+        airmass: Optional[float] = None,
     ) -> Dict[str, float]:
         """
         Calculate Plane of Array (POA) irradiance for tilted surfaces
@@ -135,41 +450,117 @@ class IrradianceCalculator:
             surface_tilt: Surface tilt from horizontal (degrees)
             surface_azimuth: Surface azimuth (degrees)
             albedo: Ground reflectance (0-1)
-            sky_model: Sky diffuse model ('isotropic', 'perez', 'klucher')
+            sky_model: Sky diffuse model (see SKY_DIFFUSE_MODELS)
+            dni_extra: Extraterrestrial DNI (W/m²), required by haydavies, reindl, perez
+            airmass: Relative airmass for perez (default: from solar_zenith)
             
         Returns:
             Dictionary with POA components
         """
-        # Calculate angle of incidence
-        aoi = irradiance.aoi(
+        poa_components = self.calculate_poa_series(
+            ghi=np.atleast_1d(ghi),
+            dni=np.atleast_1d(dni),
+            dhi=np.atleast_1d(dhi),
+            solar_zenith=np.atleast_1d(solar_zenith),
+            solar_azimuth=np.atleast_1d(solar_azimuth),
             surface_tilt=surface_tilt,
             surface_azimuth=surface_azimuth,
-            solar_zenith=solar_zenith,
-            solar_azimuth=solar_azimuth
+            albedo=albedo,
+            sky_model=sky_model,
+            dni_extra=None if dni_extra is None else np.atleast_1d(dni_extra),
+            airmass=None if airmass is None else np.atleast_1d(airmass),
         )
         
-        # Calculate POA components with specified sky model
+        result = {key: float(values[0]) for key, values in poa_components.items()}
+        result['sky_model'] = sky_model
+        return result
+    
+    def calculate_poa_series(
+        self,
+        ghi: np.ndarray,
+        dni: np.ndarray,
+        dhi: np.ndarray,
+        solar_zenith: np.ndarray,
+        solar_azimuth: np.ndarray,
+        surface_tilt: float,
+        surface_azimuth: float,
+        albedo: float = 0.2,
+        sky_model: str = 'isotropic',
+        dni_extra: Optional[np.ndarray] = None,
+        airmass: Optional[np.ndarray] = None,
+        times: Optional[pd.DatetimeIndex] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized POA irradiance: one get_total_irradiance call over whole arrays
+        
+        Extraterrestrial DNI and relative airmass are taken from the caller
+        (calculate_clear_sky_irradiance already has both) or derived once
+        for the whole series, so Perez and friends never run per row.
+        
+        Args:
+            ghi, dni, dhi: Irradiance arrays (W/m²)
+            solar_zenith: Solar zenith angle array (degrees)
+            solar_azimuth: Solar azimuth angle array (degrees)
+            surface_tilt: Surface tilt from horizontal (degrees)
+            surface_azimuth: Surface azimuth (degrees)
+            albedo: Ground reflectance (0-1)
+            sky_model: Sky diffuse model (see SKY_DIFFUSE_MODELS)
+            dni_extra: Extraterrestrial DNI array (W/m²); needed by haydavies,
+                       reindl and perez unless times is given
+            airmass: Relative airmass array for perez (default: Kasten-Young
+                     from solar_zenith)
+            times: Timestamps to derive dni_extra from when it is not given
+            
+        Returns:
+            Dictionary of POA component arrays (poa_global, poa_direct,
+            poa_diffuse, poa_sky_diffuse, poa_ground_diffuse) and aoi
+        """
+        if sky_model not in SKY_DIFFUSE_MODELS:
+            raise ValueError(
+                f"{sky_model} is not a valid sky diffuse model. "
+                f"Must be one of {', '.join(SKY_DIFFUSE_MODELS)}"
+            )
+        solar_zenith = np.asarray(solar_zenith, dtype=float)
+        solar_azimuth = np.asarray(solar_azimuth, dtype=float)
+        if sky_model in ('haydavies', 'reindl', 'perez') and dni_extra is None:
+            if times is None:
+                raise ValueError(f"dni_extra (or times) is required for sky model {sky_model}")
+            dni_extra = np.asarray(irradiance.get_extra_radiation(times), dtype=float)
+        if sky_model == 'perez' and airmass is None:
+            airmass = np.asarray(atmosphere.get_relative_airmass(solar_zenith), dtype=float)
+        
         poa_components = irradiance.get_total_irradiance(
             surface_tilt=surface_tilt,
             surface_azimuth=surface_azimuth,
             solar_zenith=solar_zenith,
             solar_azimuth=solar_azimuth,
-            dni=dni,
-            ghi=ghi,
-            dhi=dhi,
+            dni=np.asarray(dni, dtype=float),
+            ghi=np.asarray(ghi, dtype=float),
+            dhi=np.asarray(dhi, dtype=float),
+            dni_extra=None if dni_extra is None else np.asarray(dni_extra, dtype=float),
+            airmass=None if airmass is None else np.asarray(airmass, dtype=float),
             albedo=albedo,
             model=sky_model
         )
+        aoi = irradiance.aoi(
+            surface_tilt=surface_tilt,
+            surface_azimuth=surface_azimuth,
+            solar_zenith=solar_zenith,
+            solar_azimuth=solar_azimuth
+        )
         
-        return {
-            'poa_global': float(poa_components['poa_global']),
-            'poa_direct': float(poa_components['poa_direct']),
-            'poa_diffuse': float(poa_components['poa_diffuse']),
-            'poa_sky_diffuse': float(poa_components['poa_sky_diffuse']),
-            'poa_ground_diffuse': float(poa_components['poa_ground_diffuse']),
-            'aoi': float(aoi),
-            'sky_model': sky_model
+        result = {
+            key: np.asarray(poa_components[key], dtype=float)
+            for key in (
+                'poa_global',
+                'poa_direct',
+                'poa_diffuse',
+                'poa_sky_diffuse',
+                'poa_ground_diffuse',
+            )
         }
+        result['aoi'] = np.asarray(aoi, dtype=float)
+        return result
     
     def calculate_par(
         self,
@@ -189,6 +580,21 @@ class IrradianceCalculator:
         par = ghi * 0.45
         return float(par)
     
+    def calculate_par_series(
+        self,
+        ghi: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized PAR (same 45% ratio as calculate_par)
+        
+        Args:
+            ghi: GHI array (W/m²)
+            
+        Returns:
+            PAR array in W/m²
+        """
+        return np.asarray(ghi, dtype=float) * 0.45
+    
     def format_irradiance_series(
         self,
         irradiance_data: pd.DataFrame,
@@ -207,39 +613,57 @@ class IrradianceCalculator:
             surface_tilt: Surface tilt for POA calculation (optional)
             surface_azimuth: Surface azimuth for POA calculation (optional)
             albedo: Ground reflectance for POA calculation
-            sky_model: Sky diffuse model for POA ('isotropic', 'perez', 'klucher')
+            sky_model: Sky diffuse model for POA (see SKY_DIFFUSE_MODELS)
             
         Returns:
             List of irradiance data points
         """
-        result = []
+        ghi = irradiance_data['ghi'].to_numpy(dtype=float)
+        dni = irradiance_data['dni'].to_numpy(dtype=float)
+        dhi = irradiance_data['dhi'].to_numpy(dtype=float)
         
-        for idx, row in irradiance_data.iterrows():
+        # POA for the whole frame in one call; rows only pick their values
+        poa_rows = None
+        if surface_tilt is not None and surface_azimuth is not None:
+            poa_components = self.calculate_poa_series(
+                ghi=ghi,
+                dni=dni,
+                dhi=dhi,
+                solar_zenith=irradiance_data['apparent_zenith'].to_numpy(dtype=float),
+                solar_azimuth=irradiance_data['azimuth'].to_numpy(dtype=float),
+                surface_tilt=surface_tilt,
+                surface_azimuth=surface_azimuth,
+                albedo=albedo,
+                sky_model=sky_model,
+                dni_extra=irradiance_data['dni_extra'].to_numpy(dtype=float) if 'dni_extra' in irradiance_data else None,
+                airmass=irradiance_data['airmass_relative'].to_numpy(dtype=float) if 'airmass_relative' in irradiance_data else None,
+                times=irradiance_data.index,
+            )
+            keys = list(poa_components)
+            poa_rows = [
+                dict(zip(keys, values), sky_model=sky_model)
+                for values in zip(*(poa_components[key].tolist() for key in keys))
+            ]
+        par = self.calculate_par_series(ghi).tolist() if include_par else None
+        
+        result = []
+        for i, (idx, ghi_val, dni_val, dhi_val) in enumerate(
+            zip(irradiance_data.index, ghi.tolist(), dni.tolist(), dhi.tolist())
+        ):
             data_point = {
                 'timestamp': idx.isoformat(),
-                'ghi': float(row['ghi']),
-                'dni': float(row['dni']),
-                'dhi': float(row['dhi'])
+                'ghi': ghi_val,
+                'dni': dni_val,
+                'dhi': dhi_val
             }
             
             # Add PAR if requested
-            if include_par:
-                data_point['par'] = self.calculate_par(row['ghi'])
+            if par is not None:
+                data_point['par'] = par[i]
             
             # Add POA if surface parameters provided
-            if surface_tilt is not None and surface_azimuth is not None:
-                poa = self.calculate_poa_irradiance(
-                    ghi=row['ghi'],
-                    dni=row['dni'],
-                    dhi=row['dhi'],
-                    solar_zenith=row['apparent_zenith'],
-                    solar_azimuth=row['azimuth'],
-                    surface_tilt=surface_tilt,
-                    surface_azimuth=surface_azimuth,
-                    albedo=albedo,
-                    sky_model=sky_model
-                )
-                data_point['poa'] = poa
+            if poa_rows is not None:
+                data_point['poa'] = poa_rows[i]
             
             result.append(data_point)
         
@@ -0,0 +1,224 @@
+"""
+Linke turbidity climatology held in memory instead of read per request.
+
+pvlib.clearsky.lookup_linke_turbidity opens the gzip-compressed
+``LinkeTurbidities.h5`` on every call. Here the 2160 x 4320 x 12 uint8 grid
+is decompressed once into a plain .npy file and opened with
+``mmap_mode='r'`` (all worker processes share the same pages); the 12
+monthly values per grid cell are then cached per (lat, lon) cell and
+interpolated to day of year exactly like pvlib.
+
+Build the .npy ahead of time (it is never written by the server itself) and
+point LINKE_TURBIDITY_PATH at it; the app maps it read-only at startup:
+    python -m app.services.linke_turbidity build --out /srv/sunpath/linke_turbidity.npy
+
+Without a table (empty LINKE_TURBIDITY_PATH, or a missing file) every worker
+process decompresses the .h5 into its own private ~112 MB array on the first
+clear-sky request, which costs about a second on that request.
+"""
+import argparse
+import calendar
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pvlib
+
+from app.core.config import settings
+
+GRID_SHAPE = (2160, 4320, 12)
+# Stored values are 20 × Linke turbidity
+SCALE = 20.0
+# Per-cell monthly values kept in memory (12 floats each)
+MONTHLY_CACHE_SIZE = 4096
+PVLIB_H5_PATH = os.path.join(os.path.dirname(pvlib.__file__), 'data', 'LinkeTurbidities.h5')
+
+
+def _month_middles(year: int) -> np.ndarray:
+    """Day-of-year of each month's middle plus the neighbouring Dec/Jan (pvlib layout)."""
+    mdays = np.array(calendar.mdays[1:])
+    ydays = 365
+    if calendar.isleap(year):
+        mdays[1] += 1
+        ydays = 366
+    return np.concatenate([
+        [-calendar.mdays[-1] / 2.0],
+        np.cumsum(mdays) - mdays / 2.0,
+        [ydays + calendar.mdays[1] / 2.0],
+    ])
+
+
+_MIDDLES_LEAP = _month_middles(2016)
+_MIDDLES_NO_LEAP = _month_middles(2015)
+
+
+def _grid_index(degrees: float, start: float, stop: float, size: int) -> int:
+    """Nearest cell index along one grid axis (same rounding as pvlib)."""
+    scale = size / (stop - start)
+    center = start + 1 / scale / 2
+    index = (degrees - center) * scale
+    last = size - 1
+    # 0.500001 tolerates float error at the grid edges, as in pvlib
+    if index > last:
+        if index - last <= 0.500001:
+            return last
+    elif index < 0:
+        if -index <= 0.500001:
+            return 0
+    else:
+        return int(np.around(index))
+    raise ValueError(f"Coordinate {degrees:g} is out of range ({start:g}, {stop:g})")
+
+
+class LinkeTurbidityGrid:
+    """Monthly Linke turbidity climatology backed by an in-memory or mapped array."""
+
+    def __init__(self, table: np.ndarray, source: str):
+        if table.shape != GRID_SHAPE or table.dtype != np.uint8:
+            raise ValueError(f"Unexpected Linke turbidity grid {table.shape} {table.dtype}: {source}")
+        self.table = table
+        self.source = source
+        self._monthly = lru_cache(maxsize=MONTHLY_CACHE_SIZE)(self._read_monthly)
+
+    def _read_monthly(self, lat_index: int, lon_index: int) -> np.ndarray:
+        values = self.table[lat_index, lon_index].astype(np.float64) / SCALE
+        values.setflags(write=False)
+        return values
+
+    def monthly(self, latitude: float, longitude: float) -> np.ndarray:
+        """12 monthly Linke turbidity values (Jan..Dec) for the cell containing the site."""
+        return self._monthly(
+            _grid_index(latitude, 90, -90, GRID_SHAPE[0]),
+            _grid_index(longitude, -180, 180, GRID_SHAPE[1]),
+        )
+
+    def lookup(
+        self,
+        times: pd.DatetimeIndex,
+        latitude: float,
+        longitude: float,
+        interp_turbidity: bool = True,
+    ) -> pd.Series:
+        """
+        Drop-in replacement for pvlib.clearsky.lookup_linke_turbidity
+
+        Args:
+            times: Timestamps (day of year is taken in UTC, as in pvlib)
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            interp_turbidity: Interpolate monthly values to the day of year
+
+        Returns:
+            Linke turbidity Series aligned with times
+        """
+        monthly = self.monthly(latitude, longitude)
+        times_utc = pd.DatetimeIndex(times)
+        if times_utc.tz is not None:
+            times_utc = times_utc.tz_convert('UTC')
+
+        if not interp_turbidity:
+            return pd.Series(monthly[times_utc.month - 1], index=times)
+
+        # Monthly values sit at month middles; pad with Dec/Jan to wrap the year
+        padded = np.concatenate([[monthly[-1]], monthly, [monthly[0]]])
+        dayofyear = times_utc.dayofyear.to_numpy()
+        values = np.where(
+            times_utc.is_leap_year,
+            np.interp(dayofyear, _MIDDLES_LEAP, padded),
+            np.interp(dayofyear, _MIDDLES_NO_LEAP, padded),
+        )
+        return pd.Series(values, index=times)
+
+    def cache_info(self):
+        return self._monthly.cache_info()
+
+
+def build_turbidity_table(path: str, source: str = PVLIB_H5_PATH) -> None:
+    """
+    Decompress pvlib's LinkeTurbidities.h5 into a .npy file (written atomically)
+
+    Args:
+        path: Output .npy path
+        source: HDF5 file shipped with pvlib
+    """
+    import h5py
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Unique temp name next to the target: concurrent builds never share a file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory or '.', prefix=f"{os.path.basename(path)}.", suffix='.tmp.npy'
+    )
+    os.close(fd)
+    try:
+        with h5py.File(source, 'r') as h5:
+            dataset = h5['LinkeTurbidity']
+            table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=GRID_SHAPE)
+            # Copy in HDF5 chunk-row blocks to keep peak memory low
+            step = (dataset.chunks or (GRID_SHAPE[0],))[0]
+            for start in range(0, GRID_SHAPE[0], step):
+                stop = min(start + step, GRID_SHAPE[0])
+                table[start:stop] = dataset[start:stop]
+            table.flush()
+            del table
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _load_grid(path: str) -> LinkeTurbidityGrid:
+    if not path:
+        import h5py
+
+        with h5py.File(PVLIB_H5_PATH, 'r') as h5:
+            return LinkeTurbidityGrid(h5['LinkeTurbidity'][...], PVLIB_H5_PATH)
+
+    try:
+        return LinkeTurbidityGrid(np.load(path, mmap_mode='r'), path)
+    except (OSError, ValueError) as e:
+        print(
+            f"⚠️ Linke turbidity table unavailable ({e}); loading into memory "
+            f"(build it with: python -m app.services.linke_turbidity build --out {path})"
+        )
+        return _load_grid("")
+
+
+_grid: Optional[LinkeTurbidityGrid] = None
+_grid_path: Optional[str] = None
+_grid_lock = threading.Lock()
+
+
+def get_linke_turbidity_grid() -> LinkeTurbidityGrid:
+    """
+    Process-wide grid for settings.LINKE_TURBIDITY_PATH (empty = in-memory copy of the .h5)
+    """
+    global _grid, _grid_path
+    path = settings.LINKE_TURBIDITY_PATH
+    if _grid is not None and _grid_path == path:
+        return _grid
+    with _grid_lock:
+        if _grid is None or _grid_path != path:
+            _grid = _load_grid(path)
+            _grid_path = path
+            print(f"✅ Linke turbidity grid ready: {_grid.source}")
+    return _grid
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Build the Linke turbidity .npy table")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--out', default=settings.LINKE_TURBIDITY_PATH or None, required=not settings.LINKE_TURBIDITY_PATH)
+    args = parser.parse_args()
+    build_turbidity_table(args.out)
+    print(f"✅ Wrote {args.out}")
+
+
+if __name__ == '__main__':
+    _main()
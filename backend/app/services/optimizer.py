@@ -1,13 +1,25 @@
 """
 Optimization Service - Analyze solar data to find optimal time periods
+and the panel orientation that collects the most energy
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import math
 
+import numpy as np
+import pandas as pd
+
+from app.services.irradiance_calculator import IrradianceCalculator
+
+# (orientation × timestep) cells per transposition call (bounds pvlib temporaries)
+ORIENTATION_CHUNK_CELLS = 2_000_000
+
 class OptimizationService:
     """Analyze solar data and provide optimization recommendations"""
     
+    def __init__(self):
+        self.irradiance_calculator = IrradianceCalculator()
+    
     def analyze_optimal_periods(self, solar_data_points: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze solar data to find optimal time periods
@@ -170,4 +182,138 @@ class OptimizationService:
         """Convert HH:MM string to minutes since midnight"""
         parts = time_str.split(':')
         return int(parts[0]) * 60 + int(parts[1])
-
+    
+    def optimize_orientation(
+        self,
+        irradiance_data: pd.DataFrame,
+        sky_model: str = 'isotropic',
+        albedo: float = 0.2,
+        coarse_step: float = 5.0,
+        fine_step: float = 1.0,
+        tilt_range: Tuple[float, float] = (0.0, 90.0),
+        azimuth_range: Tuple[float, float] = (0.0, 360.0),
+    ) -> Dict[str, Any]:
+        """
+        Tilt × azimuth with the most plane-of-array energy over a period
+        
+        The whole coarse grid is transposed against the series in one
+        broadcast get_total_irradiance call per chunk ((K, 1) orientations
+        against (1, T) timesteps), then a fine_step grid of ±coarse_step
+        around the best cell refines the optimum.
+        
+        Args:
+            irradiance_data: Frame from calculate_clear_sky_irradiance (or a
+                             weather frame with the same columns: ghi, dni, dhi,
+                             apparent_zenith, azimuth, dni_extra, airmass_relative)
+            sky_model: Sky diffuse model (see SKY_DIFFUSE_MODELS)
+            albedo: Ground reflectance (0-1)
+            coarse_step: Grid step of the full sweep (degrees)
+            fine_step: Grid step of the refinement (degrees)
+            tilt_range: (min, max) tilt in degrees
+            azimuth_range: (min, max) azimuth in degrees; a full 360° span wraps
+            
+        Returns:
+            Dictionary with:
+            - optimum: {tilt, azimuth, energy_kwh_m2}
+            - surface: {tilts, azimuths, energy_kwh_m2 (tilts × azimuths)} of the coarse sweep
+            - horizontal_kwh_m2: energy on a flat plane
+            - gain_percent: optimum over horizontal
+            - evaluated: number of orientations transposed
+        """
+        if coarse_step <= 0 or fine_step <= 0 or fine_step > coarse_step:
+            raise ValueError("Steps must be positive and fine_step <= coarse_step")
+        tilt_min, tilt_max = tilt_range
+        azimuth_min, azimuth_max = azimuth_range
+        if not 0 <= tilt_min <= tilt_max <= 90:
+            raise ValueError("tilt_range must lie within 0-90 degrees")
+        if not 0 <= azimuth_min <= azimuth_max <= 360:
+            raise ValueError("azimuth_range must lie within 0-360 degrees")
+        wraps = azimuth_max - azimuth_min >= 360
+        
+        # Trapezoid weights (hours) on the real timestamps; night rows add nothing
+        ns = irradiance_data.index.asi8
+        weights = np.zeros(len(ns))
+        if len(ns) > 1:
+            half = np.diff(ns) / 7.2e12
+            weights[:-1] += half
+            weights[1:] += half
+        zenith = irradiance_data['apparent_zenith'].to_numpy(dtype=float)
+        day = (zenith < 90) & (weights > 0)
+        if not day.any():
+            raise ValueError("No daylight samples in the period")
+        
+        def column(name: str) -> np.ndarray:
+            return irradiance_data[name].to_numpy(dtype=float)[day][None, :]
+        
+        series = {
+            'ghi': column('ghi'),
+            'dni': column('dni'),
+            'dhi': column('dhi'),
+            'solar_zenith': column('apparent_zenith'),
+            'solar_azimuth': column('azimuth'),
+            'dni_extra': column('dni_extra') if 'dni_extra' in irradiance_data else None,
+            'airmass': column('airmass_relative') if 'airmass_relative' in irradiance_data else None,
+        }
+        day_weights = weights[day]
+        evaluated = 0
+        
+        def energy(tilts: np.ndarray, azimuths: np.ndarray) -> np.ndarray:
+            """kWh/m² for each (tilt, azimuth) pair."""
+            nonlocal evaluated
+            result = np.empty(len(tilts))
+            chunk = max(1, ORIENTATION_CHUNK_CELLS // day_weights.size)
+            for start in range(0, len(tilts), chunk):
+                stop = start + chunk
+                poa = self.irradiance_calculator.calculate_poa_series(
+                    surface_tilt=tilts[start:stop, None],
+                    surface_azimuth=azimuths[start:stop, None],
+                    albedo=albedo,
+                    sky_model=sky_model,
+                    times=irradiance_data.index[day],
+                    **series,
+                )['poa_global']
+                result[start:stop] = np.nan_to_num(poa) @ day_weights / 1000
+            evaluated += len(tilts)
+            return result
+        
+        def axis(low: float, high: float, step: float, wrap: bool) -> np.ndarray:
+            if wrap:
+                return np.arange(low, low + 360, step) % 360
+            return np.unique(np.append(np.arange(low, high, step), high))
+        
+        # Coarse sweep over the whole range
+        tilts = axis(tilt_min, tilt_max, coarse_step, False)
+        azimuths = axis(azimuth_min, azimuth_max, coarse_step, wraps)
+        tilt_grid, azimuth_grid = np.meshgrid(tilts, azimuths, indexing='ij')
+        surface = energy(tilt_grid.ravel(), azimuth_grid.ravel()).reshape(tilt_grid.shape)
+        best_tilt, best_azimuth = np.unravel_index(np.argmax(surface), surface.shape)
+        best = (float(tilts[best_tilt]), float(azimuths[best_azimuth]), float(surface.max()))
+        
+        # Fine grid of ±coarse_step around the coarse optimum
+        if fine_step < coarse_step:
+            offsets = np.arange(-coarse_step, coarse_step + fine_step / 2, fine_step)
+            fine_tilts = np.unique(np.clip(best[0] + offsets, tilt_min, tilt_max))
+            fine_azimuths = best[1] + offsets
+            if wraps:
+                fine_azimuths = np.unique(fine_azimuths % 360)
+            else:
+                fine_azimuths = np.unique(np.clip(fine_azimuths, azimuth_min, azimuth_max))
+            fine_tilt, fine_azimuth = np.meshgrid(fine_tilts, fine_azimuths, indexing='ij')
+            fine = energy(fine_tilt.ravel(), fine_azimuth.ravel())
+            k = int(np.argmax(fine))
+            if fine[k] > best[2]:
+                best = (float(fine_tilt.ravel()[k]), float(fine_azimuth.ravel()[k]), float(fine[k]))
+        
+        horizontal = float(energy(np.zeros(1), np.full(1, 180.0))[0])
+        return {
+            'optimum': {'tilt': best[0], 'azimuth': best[1], 'energy_kwh_m2': best[2]},
+            'surface': {
+                'tilts': tilts.tolist(),
+                'azimuths': azimuths.tolist(),
+                'energy_kwh_m2': surface.tolist(),
+            },
+            'horizontal_kwh_m2': horizontal,
+            'gain_percent': 100.0 * (best[2] / horizontal - 1) if horizontal > 0 else 0.0,
+            'evaluated': evaluated,
+            'sky_model': sky_model,
+        }
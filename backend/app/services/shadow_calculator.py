@@ -5,6 +5,91 @@ Calculates shadow length, direction, and coordinates based on sun position
 import math
 from typing import Dict, Any, List, Tuple, Optional
 
+import numpy as np
+
+# Status codes of calculate_shadow_series (int8); names match calculate_shadow['status']
+STATUS_NORMAL = 0
+STATUS_NO_SUN = 1
+STATUS_INFINITE_SHADOW = 2
+# Sun below the sloped terrain plane: the slope itself is in shadow
+STATUS_TERRAIN_SHADED = 3
+STATUS_NAMES = ('normal', 'no_sun', 'infinite_shadow', 'terrain_shaded')
+TERRAIN_SHADED_MESSAGE = '경사면이 태양을 등지고 있습니다. 지형 자체가 그늘입니다.'
+
+# Mean Earth radius (meters) used by the endpoint/polygon geometry
+EARTH_RADIUS = 6371000
+
+# Swept envelope: radial sampling step (degrees) between hull-vertex directions
+ENVELOPE_ANGLE_STEP = 0.5
+# Swept envelope: default simplification tolerance (meters)
+ENVELOPE_TOLERANCE = 0.1
+
+
+def _convex_hull(points: np.ndarray) -> np.ndarray:
+    """Counter-clockwise convex hull of (n, 2) points (monotone chain)."""
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return points
+    
+    def half(sequence):
+        chain = []
+        for p in sequence:
+            while len(chain) >= 2 and (
+                (chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1])
+                - (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0])
+            ) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain[:-1]
+    
+    return np.array(half(points) + half(points[::-1]))
+
+
+def _simplify_ring(ring: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker on a closed ring (no repeated closing vertex); returns kept indices."""
+    n = len(ring)
+    if n <= 3:
+        return np.arange(n)
+    # Split at vertex 0 and the vertex farthest from it
+    far = int(np.argmax(np.hypot(*(ring - ring[0]).T)))
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, far]] = True
+    closed = np.vstack((ring, ring[:1]))
+    stack = [(0, far), (far, n)]
+    while stack:
+        start, stop = stack.pop()
+        if stop - start < 2:
+            continue
+        a, b = closed[start], closed[stop]
+        inner = closed[start + 1:stop]
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / norm
+        worst = int(np.argmax(dist))
+        if dist[worst] > tolerance:
+            mid = start + 1 + worst
+            keep[mid] = True
+            stack.extend(((start, mid), (mid, stop)))
+    return np.nonzero(keep)[0]
+
+
+def _inside_convex(points: np.ndarray, polygons: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    (P, K) membership of points in counter-clockwise convex polygons (K, V, 2)
+    
+    Repeated vertices (padding) give zero-length edges, which never exclude.
+    """
+    a = polygons
+    b = np.roll(polygons, -1, axis=1)
+    edge = b - a
+    length = np.hypot(edge[..., 0], edge[..., 1])
+    rel = points[:, None, None, :] - a[None]
+    cross = edge[None, ..., 0] * rel[..., 1] - edge[None, ..., 1] * rel[..., 0]
+    return np.all(cross >= -tolerance * length[None], axis=2)
+
 class ShadowCalculator:
     """
     Calculate shadow properties based on solar position
@@ -29,10 +114,10 @@ class ShadowCalculator:
             sun_altitude: Solar altitude angle in degrees
             sun_azimuth: Solar azimuth angle in degrees (0=North, 90=East)
             terrain_slope: Terrain slope in degrees (optional)
-            terrain_aspect: Terrain aspect/direction in degrees (optional)
+            terrain_aspect: Downslope direction in degrees (optional)
             
         Returns:
-            Dictionary with shadow length, direction, and status
+            Dictionary with shadow length (horizontal, meters), direction, and status
         """
         # JSON-safe: use None instead of Infinity (non-standard JSON)
         if sun_altitude <= 0:
@@ -56,6 +141,9 @@ class ShadowCalculator:
         sun_altitude_rad = math.radians(sun_altitude)
         shadow_length = object_height / math.tan(sun_altitude_rad)
         
+        # Shadow direction is opposite to sun azimuth
+        shadow_direction = (sun_azimuth + 180) % 360
+        
         # Apply terrain correction if needed
         if terrain_slope > 0:
             slope_correction = self._calculate_slope_correction(
@@ -64,11 +152,15 @@ class ShadowCalculator:
                 sun_azimuth,
                 sun_altitude
             )
+            if slope_correction is None:
+                return {
+                    'length': None,
+                    'direction': shadow_direction,
+                    'status': 'terrain_shaded',
+                    'message': TERRAIN_SHADED_MESSAGE
+                }
             shadow_length *= slope_correction
         
-        # Shadow direction is opposite to sun azimuth
-        shadow_direction = (sun_azimuth + 180) % 360
-        
         return {
             'length': abs(shadow_length),
             'direction': shadow_direction,
@@ -76,6 +168,84 @@ class ShadowCalculator:
             'message': None
         }
     
+    def calculate_shadow_series(
+        self,
+        object_height: float,
+        sun_altitude,
+        sun_azimuth,
+        terrain_slope=0,
+        terrain_aspect=0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Array version of calculate_shadow for whole time series
+        
+        Same rules as the scalar method, evaluated in one NumPy pass.
+        Messages are not built here; use shadow_status_names /
+        shadow_messages when a response actually needs them.
+        
+        Args:
+            object_height: Height of object in meters
+            sun_altitude: Solar altitude angles in degrees (array)
+            sun_azimuth: Solar azimuth angles in degrees (array)
+            terrain_slope: Terrain slope in degrees (scalar or array)
+            terrain_aspect: Downslope direction in degrees (scalar or array)
+            
+        Returns:
+            Dictionary of arrays:
+            - length: horizontal meters, NaN unless status is normal
+            - direction: degrees, NaN when no_sun
+            - status: int8 codes (STATUS_NORMAL, STATUS_NO_SUN,
+              STATUS_INFINITE_SHADOW, STATUS_TERRAIN_SHADED)
+        """
+        altitude = np.asarray(sun_altitude, dtype=float)
+        azimuth = np.asarray(sun_azimuth, dtype=float)
+        
+        # NaN altitude falls through to normal with NaN length, like the scalar path
+        no_sun = altitude <= 0
+        infinite = ~no_sun & (altitude <= self.EPSILON)
+        status = np.full(altitude.shape, STATUS_NORMAL, dtype=np.int8)
+        status[no_sun] = STATUS_NO_SUN
+        status[infinite] = STATUS_INFINITE_SHADOW
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            length = object_height / np.tan(np.radians(altitude))
+            slope = np.asarray(terrain_slope, dtype=float)
+            if np.any(slope > 0):
+                correction = self._slope_correction_series(
+                    slope, np.asarray(terrain_aspect, dtype=float), azimuth, altitude
+                )
+                length = np.where(slope > 0, length * correction, length)
+                status[(status == STATUS_NORMAL) & (slope > 0) & np.isinf(correction)] = STATUS_TERRAIN_SHADED
+        normal = status == STATUS_NORMAL
+        
+        return {
+            'length': np.where(normal, np.abs(length), np.nan),
+            'direction': np.where(no_sun, np.nan, (azimuth + 180) % 360),
+            'status': status,
+        }
+    
+    @staticmethod
+    def shadow_status_names(status: np.ndarray) -> List[str]:
+        """Status codes → calculate_shadow status strings."""
+        return [STATUS_NAMES[code] for code in np.asarray(status).tolist()]
+    
+    @staticmethod
+    def shadow_messages(status: np.ndarray, sun_altitude) -> List[Optional[str]]:
+        """Status codes → the Korean messages calculate_shadow would return."""
+        messages = []
+        for code, altitude in zip(np.asarray(status).tolist(), np.asarray(sun_altitude, dtype=float).tolist()):
+            if code == STATUS_NO_SUN:
+                messages.append('태양이 지평선 아래에 있습니다.')
+            elif code == STATUS_INFINITE_SHADOW:
+                messages.append(
+                    f'태양 고도가 매우 낮습니다 ({altitude:.2f}°). 그림자가 무한대로 길어집니다.'
+                )
+            elif code == STATUS_TERRAIN_SHADED:
+                messages.append(TERRAIN_SHADED_MESSAGE)
+            else:
+                messages.append(None)
+        return messages
+    
     def calculate_shadow_endpoint(
         self,
         start_lat: float,
@@ -129,6 +299,331 @@ class ShadowCalculator:
         
         return end_lat, end_lon
     
+    @staticmethod
+    def tangent_plane_error_bound(latitude, distance):
+        """
+        Upper bound (meters) on the local-tangent-plane endpoint error
+        
+        The flat-earth step (Δnorth = d·cos θ, Δeast = d·sin θ, east scaled by
+        1/cos φ) deviates from the spherical destination point by a
+        second-order term; d²·(|tan φ| + 1)/R bounds it for d up to tens of
+        kilometers (measured worst case ≈ 0.6 of the bound over random
+        sites, bearings and 1 m–30 km). Example: 1 km at 60° → ≤ 0.43 m;
+        100 m at 60° → ≤ 4 mm. Infinite at the poles, so they always stay spherical.
+        
+        Args:
+            latitude: Start latitude in degrees
+            distance: Step length in meters
+        """
+        with np.errstate(over='ignore', invalid='ignore'):
+            tan_lat = np.abs(np.tan(np.radians(latitude)))
+            return np.asarray(distance, dtype=float) ** 2 * (tan_lat + 1) / EARTH_RADIUS
+    
+    def calculate_shadow_endpoints(
+        self,
+        start_lat,
+        start_lon,
+        shadow_length,
+        shadow_direction,
+        tangent_tolerance: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Array version of calculate_shadow_endpoint
+        
+        Args:
+            start_lat: Starting latitude(s)
+            start_lon: Starting longitude(s)
+            shadow_length: Shadow lengths in meters (NaN → NaN endpoint)
+            shadow_direction: Shadow directions in degrees (0=North)
+            tangent_tolerance: Optional error budget in meters; rows whose
+                               tangent_plane_error_bound fits use the flat
+                               local-tangent-plane step instead of spherical trig
+            
+        Returns:
+            Tuple of (end_latitudes, end_longitudes) arrays
+        """
+        lat, lon, length, direction = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (start_lat, start_lon, shadow_length, shadow_direction))
+        )
+        lat_rad = np.radians(lat)
+        lon_rad = np.radians(lon)
+        direction_rad = np.radians(direction)
+        angular_distance = length / EARTH_RADIUS
+        
+        end_lat_rad = np.arcsin(
+            np.sin(lat_rad) * np.cos(angular_distance)
+            + np.cos(lat_rad) * np.sin(angular_distance) * np.cos(direction_rad)
+        )
+        end_lon_rad = lon_rad + np.arctan2(
+            np.sin(direction_rad) * np.sin(angular_distance) * np.cos(lat_rad),
+            np.cos(angular_distance) - np.sin(lat_rad) * np.sin(end_lat_rad)
+        )
+        
+        if tangent_tolerance is not None:
+            flat = self.tangent_plane_error_bound(lat, length) <= tangent_tolerance
+            if flat.any():
+                end_lat_rad = np.where(
+                    flat, lat_rad + angular_distance * np.cos(direction_rad), end_lat_rad
+                )
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    flat_lon = lon_rad + angular_distance * np.sin(direction_rad) / np.cos(lat_rad)
+                end_lon_rad = np.where(flat, flat_lon, end_lon_rad)
+        
+        end_lat = np.degrees(end_lat_rad)
+        end_lon = ((np.degrees(end_lon_rad) + 180) % 360) - 180
+        return end_lat, end_lon
+    
+    def calculate_shadow_polygons(
+        self,
+        center_lat: float,
+        center_lon: float,
+        object_width,
+        shadow_length,
+        shadow_direction,
+        tangent_tolerance: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Array version of calculate_shadow_polygon (every frame in one call)
+        
+        Args:
+            center_lat: Object center latitude
+            center_lon: Object center longitude
+            object_width: Object width in meters (scalar or per frame)
+            shadow_length: Shadow lengths in meters
+            shadow_direction: Shadow directions in degrees
+            tangent_tolerance: Optional per-step error budget in meters
+                               (see calculate_shadow_endpoints)
+            
+        Returns:
+            (N, 4, 2) array of [lon, lat] in calculate_shadow_polygon vertex
+            order; rows with NaN length are NaN
+        """
+        length = np.atleast_1d(np.asarray(shadow_length, dtype=float))
+        direction = np.atleast_1d(np.asarray(shadow_direction, dtype=float))
+        half_width = np.asarray(object_width, dtype=float) / 2
+        perp_direction = (direction - 90) % 360
+        
+        corners = [
+            self.calculate_shadow_endpoints(
+                center_lat, center_lon, half_width, offset_dir, tangent_tolerance
+            )
+            for offset_dir in (perp_direction, (perp_direction + 180) % 360)
+        ]
+        shadow_corners = [
+            self.calculate_shadow_endpoints(
+                corner_lat, corner_lon, length, direction, tangent_tolerance
+            )
+            for corner_lat, corner_lon in corners
+        ]
+        
+        ring = corners + shadow_corners[::-1]
+        polygons = np.stack([np.column_stack((ring_lon, ring_lat)) for ring_lat, ring_lon in ring], axis=1)
+        # Match the scalar method: no polygon without a finite shadow
+        polygons[~np.isfinite(length)] = np.nan
+        return polygons
+    
+    def calculate_footprint_shadows(
+        self,
+        footprint,
+        shadow_length,
+        shadow_direction,
+        tangent_tolerance: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Shadow of a vertical prism with an arbitrary footprint, every frame at once
+        
+        The roof (footprint raised to the object height) projects onto the
+        ground as the footprint shifted by the shadow vector. The shadow is
+        the convex hull of base and projected roof: the footprint hull with
+        the chain of edges facing the shadow direction moved by the vector,
+        i.e. H + 2 vertices for an H-vertex hull, built for all frames with
+        array operations only. Concave footprints use their convex hull.
+        
+        Args:
+            footprint: Ring [[lon, lat], ...] (closing vertex optional)
+            shadow_length: Shadow lengths in meters (NaN → NaN row)
+            shadow_direction: Shadow directions in degrees
+            tangent_tolerance: Optional per-step error budget in meters
+                               (see calculate_shadow_endpoints)
+            
+        Returns:
+            (N, H + 2, 2) array of [lon, lat], counter-clockwise
+        """
+        ring = np.asarray(footprint, dtype=float)
+        if ring.ndim != 2 or ring.shape[1] < 2 or not np.isfinite(ring[:, :2]).all():
+            raise ValueError("footprint must be [[lon, lat], ...]")
+        ring = ring[:, :2]
+        
+        # Hull in local meters, then back to lon/lat
+        lon0, lat0 = ring.mean(axis=0)
+        east_scale = np.radians(1.0) * EARTH_RADIUS * np.cos(np.radians(lat0))
+        north_scale = np.radians(1.0) * EARTH_RADIUS
+        hull = _convex_hull(np.column_stack(((ring[:, 0] - lon0) * east_scale, (ring[:, 1] - lat0) * north_scale)))
+        hull_area = 0.5 * np.sum(hull[:, 0] * np.roll(hull[:, 1], -1) - np.roll(hull[:, 0], -1) * hull[:, 1])
+        if len(hull) < 3 or hull_area < 1e-3:
+            raise ValueError("footprint must enclose an area (at least 3 non-collinear vertices)")
+        hull_lon = lon0 + hull[:, 0] / east_scale
+        hull_lat = lat0 + hull[:, 1] / north_scale
+        n_vertices = len(hull)
+        
+        length = np.atleast_1d(np.asarray(shadow_length, dtype=float))
+        direction = np.broadcast_to(np.atleast_1d(np.asarray(shadow_direction, dtype=float)), length.shape)
+        roof_lat, roof_lon = self.calculate_shadow_endpoints(
+            hull_lat[None, :], hull_lon[None, :], length[:, None], direction[:, None], tangent_tolerance
+        )
+        base = np.broadcast_to(np.stack((hull_lon, hull_lat), axis=-1), (len(length), n_vertices, 2))
+        roof = np.stack((roof_lon, roof_lat), axis=-1)
+        
+        # Edge i runs from vertex i to i + 1; it faces the shadow if its outward normal does
+        edge = np.roll(hull, -1, axis=0) - hull
+        direction_rad = np.radians(direction)
+        facing = (
+            edge[None, :, 1] * np.sin(direction_rad)[:, None]
+            - edge[None, :, 0] * np.cos(direction_rad)[:, None]
+        ) > 0
+        facing_in = np.roll(facing, 1, axis=1)  # edge ending at vertex i
+        
+        # Per vertex: the point on its incoming edge, then (at a transition) the other one
+        first = np.where(facing_in[..., None], roof, base)
+        second = np.where(facing[..., None], roof, base)
+        candidates = np.stack((first, second), axis=2).reshape(len(length), 2 * n_vertices, 2)
+        keep = np.stack((np.ones_like(facing), facing != facing_in), axis=2).reshape(len(length), 2 * n_vertices)
+        
+        # Kept points first (stable), trimmed to H + 2; rows with fewer repeat their last point
+        order = np.argsort(~keep, axis=1, kind='stable')[:, :n_vertices + 2]
+        counts = keep.sum(axis=1)
+        column = np.minimum(np.arange(n_vertices + 2)[None, :], counts[:, None] - 1)
+        order = np.take_along_axis(order, column, axis=1)
+        polygons = np.take_along_axis(candidates, order[..., None], axis=1)
+        polygons[~np.isfinite(length)] = np.nan
+        return polygons
+    
+    def calculate_shadow_envelope(
+        self,
+        center_lat: float,
+        center_lon: float,
+        polygons,
+        times=None,
+        simplify_tolerance: float = ENVELOPE_TOLERANCE,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Area swept by the shadow over a time series (union of all footprints)
+        
+        Each pair of consecutive footprints is replaced by the convex hull of
+        both, which covers the shadow in between. Every hull contains the
+        object centre, so their union is star-shaped around it and is traced
+        as the largest hull radius per direction (exact at every hull vertex
+        direction, sampled every ENVELOPE_ANGLE_STEP° in between), then
+        simplified with Douglas-Peucker.
+        
+        Args:
+            center_lat: Object center latitude
+            center_lon: Object center longitude
+            polygons: (N, V, 2) convex footprints [lon, lat] per time step, e.g.
+                      from calculate_shadow_polygons; NaN rows = no shadow
+            times: (N,) numeric step times (e.g. epoch seconds); default 0..N-1
+            simplify_tolerance: Allowed deviation of the simplified outline (meters)
+            
+        Returns:
+            None without any finite footprint, else dictionary with:
+            - polygon: (M, 2) [lon, lat] outline, counter-clockwise, not closed
+            - earliest / latest: (M,) first and last time each outline vertex is
+              shaded (within one step: between footprints the sweep is taken
+              at the midpoint)
+            - area_m2: outline area in square meters
+        """
+        polygons = np.asarray(polygons, dtype=float)
+        n_steps = len(polygons)
+        times = np.arange(n_steps, dtype=float) if times is None else np.asarray(times, dtype=float)
+        valid = np.isfinite(polygons).all(axis=(1, 2))
+        if not valid.any():
+            return None
+        
+        # Local east/north meters around the object (inverted exactly below)
+        east_scale = np.radians(1.0) * EARTH_RADIUS * np.cos(np.radians(center_lat))
+        north_scale = np.radians(1.0) * EARTH_RADIUS
+        local = np.stack((
+            (polygons[..., 0] - center_lon) * east_scale,
+            (polygons[..., 1] - center_lat) * north_scale,
+        ), axis=-1)
+        # Footprints counter-clockwise for the membership test
+        signed_area = np.sum(
+            local[..., 0] * np.roll(local[..., 1], -1, axis=1)
+            - np.roll(local[..., 0], -1, axis=1) * local[..., 1],
+            axis=1,
+        )
+        local[signed_area < 0] = local[signed_area < 0, ::-1]
+        
+        # Sweep hulls: consecutive valid pairs, plus isolated single frames
+        steps = np.nonzero(valid)[0]
+        paired = np.zeros(n_steps, dtype=bool)
+        spans = []
+        for i, j in zip(steps[:-1], steps[1:]):
+            if j == i + 1:
+                spans.append((i, j))
+                paired[[i, j]] = True
+        spans.extend((i, i) for i in steps if not paired[i])
+        spans = np.array(sorted(spans))
+        hulls = [_convex_hull(np.vstack((local[i], local[j]))) for i, j in spans]
+        width = max(len(hull) for hull in hulls)
+        # Pad by repeating the last vertex (zero-length edges)
+        hulls = np.stack([
+            np.vstack((hull, np.repeat(hull[-1:], width - len(hull), axis=0))) for hull in hulls
+        ])
+        
+        # Largest hull radius per direction: min over edges facing away, max over hulls
+        vertex_angles = np.arctan2(hulls[..., 1], hulls[..., 0]).ravel()
+        angles = np.unique(np.concatenate((
+            np.radians(np.arange(-180, 180, ENVELOPE_ANGLE_STEP)),
+            vertex_angles[np.hypot(hulls[..., 0], hulls[..., 1]).ravel() > 0],
+        )))
+        direction = np.column_stack((np.cos(angles), np.sin(angles)))
+        edge = np.roll(hulls, -1, axis=1) - hulls
+        normal = np.stack((edge[..., 1], -edge[..., 0]), axis=-1)
+        offset = np.maximum(np.sum(normal * hulls, axis=-1), 0)
+        facing = np.einsum('ad,kvd->akv', direction, normal)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            limit = np.where(facing > 1e-12, offset[None] / facing, np.inf)
+        radius = limit.min(axis=2)
+        radius = np.where(np.isfinite(radius), radius, 0).max(axis=1)
+        outline = direction * radius[:, None]
+        
+        keep = _simplify_ring(outline, simplify_tolerance)
+        outline = outline[keep]
+        # Drop consecutive duplicates (several directions collapsing onto the centre)
+        distinct = np.hypot(*(outline - np.roll(outline, 1, axis=0)).T) > 1e-9
+        if distinct.any():
+            outline = outline[distinct]
+        
+        # Shading window per outline vertex
+        tolerance = 1e-6 * max(float(np.abs(outline).max()), 1.0) + 1e-3
+        in_hull = _inside_convex(outline, hulls, tolerance)
+        in_footprint = _inside_convex(outline, local[steps], tolerance)
+        step_column = np.full(n_steps, -1)
+        step_column[steps] = np.arange(len(steps))
+        at_start = in_footprint[:, step_column[spans[:, 0]]]
+        at_end = in_footprint[:, step_column[spans[:, 1]]]
+        t_start = times[spans[:, 0]]
+        t_end = times[spans[:, 1]]
+        t_mid = (t_start + t_end) / 2
+        first = np.where(at_start, t_start, np.where(at_end, t_end, t_mid))
+        last = np.where(at_end, t_end, np.where(at_start, t_start, t_mid))
+        earliest = np.where(in_hull, first, np.inf).min(axis=1)
+        latest = np.where(in_hull, last, -np.inf).max(axis=1)
+        
+        area = 0.5 * float(np.sum(
+            outline[:, 0] * np.roll(outline[:, 1], -1) - np.roll(outline[:, 0], -1) * outline[:, 1]
+        ))
+        return {
+            'polygon': np.column_stack((
+                center_lon + outline[:, 0] / east_scale,
+                center_lat + outline[:, 1] / north_scale,
+            )),
+            'earliest': earliest,
+            'latest': latest,
+            'area_m2': abs(area),
+        }
+    
     def calculate_shadow_polygon(
         self,
         center_lat: float,
@@ -188,42 +683,52 @@ class ShadowCalculator:
         terrain_aspect: float,
         sun_azimuth: float,
         sun_altitude: float
-    ) -> float:
+    ) -> Optional[float]:
         """
-        Calculate shadow length correction factor for sloped terrain
+        Horizontal shadow length on sloped terrain relative to flat ground
+        
+        The object stands vertically on a plane that descends toward
+        terrain_aspect. The shadow tip is where the ray from the object top
+        (away from the sun) meets that plane, at horizontal distance
+        H / (tan(alt) + tan(slope)·cos(azimuth - aspect)), i.e. the flat
+        length times tan(alt) / (tan(alt) + tan(slope)·cos(azimuth - aspect)).
+        Shadows running uphill are shorter, downhill longer.
         
         Args:
             terrain_slope: Slope angle in degrees
-            terrain_aspect: Direction of slope in degrees
+            terrain_aspect: Downslope direction in degrees
             sun_azimuth: Solar azimuth in degrees
             sun_altitude: Solar altitude in degrees
             
         Returns:
-            Correction factor (multiplier for shadow length)
+            Correction factor (multiplier for the flat shadow length), or
+            None when the sun is at or below the terrain plane
         """
-        # Convert to radians
-        slope_rad = math.radians(terrain_slope)
-        aspect_rad = math.radians(terrain_aspect)
-        sun_az_rad = math.radians(sun_azimuth)
-        sun_alt_rad = math.radians(sun_altitude)
-        
-        # Calculate angle between sun and slope normal
-        # This is a simplified calculation
-        # Full 3D terrain shadow calculation would be more complex
-        
-        # Angle between shadow direction and slope aspect
-        angle_diff = abs(sun_azimuth - terrain_aspect)
-        if angle_diff > 180:
-            angle_diff = 360 - angle_diff
-        angle_diff_rad = math.radians(angle_diff)
-        
-        # Correction factor based on slope and sun position
-        # When shadow goes upslope, it's shorter
-        # When shadow goes downslope, it's longer
-        correction = 1.0 + (math.sin(slope_rad) * math.cos(angle_diff_rad) / 
-                           math.tan(sun_alt_rad))
-        
-        return max(0.1, correction)  # Ensure positive and reasonable
+        tan_altitude = math.tan(math.radians(sun_altitude))
+        denominator = tan_altitude + (
+            math.tan(math.radians(terrain_slope))
+            * math.cos(math.radians(sun_azimuth - terrain_aspect))
+        )
+        if denominator <= 0:
+            return None
+        return tan_altitude / denominator
+    
+    @staticmethod
+    def _slope_correction_series(
+        terrain_slope: np.ndarray,
+        terrain_aspect: np.ndarray,
+        sun_azimuth: np.ndarray,
+        sun_altitude: np.ndarray
+    ) -> np.ndarray:
+        """Array version of _calculate_slope_correction (inf where the scalar returns None)."""
+        tan_altitude = np.tan(np.radians(sun_altitude))
+        denominator = tan_altitude + (
+            np.tan(np.radians(terrain_slope))
+            * np.cos(np.radians(sun_azimuth - terrain_aspect))
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # NaN altitude stays NaN (normal status, NaN length), like the scalar path
+            return np.where(denominator <= 0, np.inf, tan_altitude / denominator)
     
     def validate_shadow_calculation(
         self,
@@ -4,12 +4,31 @@ NREL SPA (Solar Position Algorithm) implementation
 """
 import pandas as pd
 import numpy as np
+import hashlib
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any, Optional
 import pvlib
 from pvlib import solarposition, irradiance
+from scipy.interpolate import CubicSpline
 from app.core.config import settings
+from app.core.constants import PRECISION_TIERS, DEFAULT_PRECISION
+from app.core.memory_cache import solar_position_cache
 from app.services.timezone_utils import resolve_timezone, timezone_label
+from app.services import spa_engine
+from app.services.ephemeris_store import get_ephemeris_store
+from app.services.horizon import get_horizon_profile, horizon_at
+
+# Multi-site chunking: cap each intermediate (sites × times) array at ~8 MB
+MULTI_SITE_CHUNK_ELEMENTS = 1 << 20
+
+# Request/config pressures are mbar (hPa); pvlib's SPA expects Pa
+PA_PER_MBAR = 100.0
+# Sunrise/sunset tables memoized per (site, timezone, year); one entry is ~365 rows
+SUN_TIMES_CACHE_SIZE = 512
+# Decimal places of lat/lon in the memo key (1e-4° ≈ 11 m, < 1 s of sunrise shift)
+SUN_TIMES_COORD_DECIMALS = 4
+_POSITION_COLUMNS = ['apparent_zenith', 'zenith', 'apparent_elevation', 'elevation', 'azimuth']
 
 class SolarCalculator:
     """
@@ -25,7 +44,7 @@ class SolarCalculator:
         self,
         latitude: float,
         longitude: float,
-        date: str,
+        date: Optional[str] = None,
         start_time: str = "00:00",
         end_time: str = "23:59",
         interval_minutes: int = 60,
@@ -34,14 +53,24 @@ class SolarCalculator:
         temperature: float = None,
         apply_refraction: bool = True,
         timezone_name: Optional[str] = None,
+        end_date: Optional[str] = None,
+        times: Optional[pd.DatetimeIndex] = None,
+        precision: str = DEFAULT_PRECISION,
+        node_minutes: Optional[int] = None,
+        horizon: bool = False,
     ) -> pd.DataFrame:
         """
         Calculate solar positions for a given location and time range
         
+        Three modes share one SPA run:
+        - single day: ``date`` + HH:MM bounds
+        - date range: ``date`` (start) + ``end_date``, same HH:MM window every day
+        - explicit index: ``times`` (naive times are localized to the site timezone)
+        
         Args:
             latitude: Latitude in degrees (-90 to 90)
             longitude: Longitude in degrees (-180 to 180)
-            date: Date in ISO 8601 format (YYYY-MM-DD)
+            date: Date (or range start) in ISO 8601 format (YYYY-MM-DD)
             start_time: Start time (HH:MM)
             end_time: End time (HH:MM)
             interval_minutes: Time interval in minutes
@@ -50,39 +79,211 @@ class SolarCalculator:
             temperature: Temperature in Celsius (default: 15)
             apply_refraction: Prefer apparent_* (True) vs geometric elevation/zenith
             timezone_name: Optional IANA timezone
+            end_date: Optional inclusive range end (YYYY-MM-DD)
+            times: Optional explicit DatetimeIndex (overrides date/time bounds)
+            precision: 'high' (SPA), 'medium' (hourly SPA nodes + spline) or
+                       'low' (2-hourly SPA nodes + spline); see PRECISION_TIERS
+            node_minutes: Optional SPA node spacing; the requested resolution
+                          is filled by a cubic spline (overrides precision)
+            horizon: Add terrain horizon columns from the DEM (see apply_horizon)
             
         Returns:
             DataFrame with columns: timestamp, apparent_zenith, zenith, 
                                    apparent_elevation, elevation, azimuth
-            Plus attrs: used_timezone, apply_refraction
+            (horizon=True also: horizon_elevation, sun_visible)
+            Plus attrs: used_timezone, apply_refraction, day_bounds, precision
+            (spline modes also: node_minutes, max_deviation_deg)
+            (use iter_days() to slice per local day without copying)
         """
         if pressure is None:
             pressure = self.pressure
         if temperature is None:
             temperature = self.temperature
-        
-        date_obj = datetime.fromisoformat(date)
-        start_dt = datetime.combine(date_obj.date(), 
-                                    datetime.strptime(start_time, "%H:%M").time())
-        end_dt = datetime.combine(date_obj.date(), 
-                                 datetime.strptime(end_time, "%H:%M").time())
+        # pvlib (and spa_engine) take pressure in Pa
+        pressure_pa = pressure * PA_PER_MBAR
         
         tz = resolve_timezone(latitude, longitude, timezone_name)
         
-        times = pd.date_range(
-            start=start_dt,
-            end=end_dt,
-            freq=f'{interval_minutes}min'
+        if times is not None:
+            times = pd.DatetimeIndex(times)
+            if times.tz is None:
+                times, tz = self._localize_wall_clock(times, tz)
+            else:
+                tz = times.tz
+        else:
+            if date is None:
+                raise ValueError("Either date or times is required")
+            wall_clock = self._wall_clock_grid(
+                date, end_date or date, start_time, end_time, interval_minutes
+            )
+            times, tz = self._localize_wall_clock(wall_clock, tz)
+        
+        if precision not in PRECISION_TIERS:
+            raise ValueError(f"Unknown precision '{precision}' (low, medium, high)")
+        
+        if node_minutes is not None and node_minutes <= 0:
+            raise ValueError("node_minutes must be positive")
+        
+        # Shared across services: identical site/time grids are computed once
+        cache_key = self._position_cache_key(
+            times, latitude, longitude, altitude, pressure, temperature, precision, node_minutes
         )
+        cached = solar_position_cache.get(cache_key)
+        if cached is not None:
+            values, columns, attrs = cached
+            solar_pos = pd.DataFrame(values.copy(), index=times, columns=list(columns))
+            solar_pos.attrs.update(attrs)
+        elif node_minutes is not None:
+            solar_pos = self._interpolated_positions(
+                times, latitude, longitude, altitude, pressure_pa, temperature,
+                node_minutes=node_minutes,
+            )
+        elif PRECISION_TIERS[precision]['method'] == 'spline':
+            solar_pos = self._interpolated_positions(
+                times, latitude, longitude, altitude, pressure_pa, temperature,
+                node_minutes=PRECISION_TIERS[precision]['node_minutes'],
+            )
+        else:
+            solar_pos = self._spa_positions(
+                times, latitude, longitude, altitude, pressure_pa, temperature
+            )
         
-        try:
-            times = times.tz_localize(tz)
-        except (ValueError, TypeError) as e:
-            print(f"⚠️ Timezone localization failed: {e}. Using UTC.")
-            times = times.tz_localize('UTC')
-            tz = resolve_timezone(0, 0, 'UTC')
+        if cached is None:
+            values = solar_pos.to_numpy(dtype=np.float64, copy=True)
+            values.setflags(write=False)
+            solar_position_cache.set(
+                cache_key, (values, tuple(solar_pos.columns), dict(solar_pos.attrs))
+            )
         
-        solar_pos = solarposition.get_solarposition(
+        # Expose which columns consumers should prefer
+        solar_pos.attrs['apply_refraction'] = apply_refraction
+        solar_pos.attrs['precision'] = precision
+        solar_pos.attrs['used_timezone'] = timezone_label(tz)
+        solar_pos.attrs['day_bounds'] = self._day_bounds(solar_pos.index)
+        
+        if horizon:
+            self.apply_horizon(solar_pos, latitude, longitude)
+        
+        return solar_pos
+    
+    def apply_horizon(
+        self,
+        solar_positions: pd.DataFrame,
+        latitude: float,
+        longitude: float,
+    ) -> pd.DataFrame:
+        """
+        Mask positions with the site's terrain horizon (in place)
+        
+        Adds horizon_elevation (terrain elevation angle toward the sun's
+        azimuth) and sun_visible (sun above that terrain) in one vectorized pass.
+        
+        Raises:
+            ValueError: No DEM configured (settings.DEM_PATH) or site outside it
+        """
+        profile = get_horizon_profile(latitude, longitude)
+        column = 'apparent_elevation' if solar_positions.attrs.get('apply_refraction', True) else 'elevation'
+        terrain = horizon_at(profile, solar_positions['azimuth'].to_numpy(dtype=float))
+        elevation = solar_positions[column].to_numpy(dtype=float)
+        solar_positions['horizon_elevation'] = terrain
+        solar_positions['sun_visible'] = elevation > terrain
+        return solar_positions
+
+    def apply_atmosphere(
+        self,
+        solar_positions: pd.DataFrame,
+        pressure=None,
+        temperature=None,
+    ) -> pd.DataFrame:
+        """
+        Re-apply SPA refraction with per-step pressure and temperature (in place)
+
+        The geometric position does not depend on the atmosphere, so the
+        cached SPA run is reused and only apparent_elevation/apparent_zenith
+        are recomputed from elevation. sun_visible follows when a horizon
+        mask is present.
+
+        Args:
+            solar_positions: Frame from calculate_solar_positions
+            pressure: Pressure per step in mbar (hPa); NaN → default
+            temperature: Temperature per step in Celsius; NaN → default
+        """
+        n_times = len(solar_positions)
+        pressure = np.broadcast_to(
+            np.asarray(self.pressure if pressure is None else pressure, dtype=float), (n_times,)
+        )
+        temperature = np.broadcast_to(
+            np.asarray(self.temperature if temperature is None else temperature, dtype=float), (n_times,)
+        )
+        pressure = np.where(np.isfinite(pressure), pressure, self.pressure)
+        temperature = np.where(np.isfinite(temperature), temperature, self.temperature)
+
+        apparent_elevation = spa_engine.apparent_elevation(
+            solar_positions['elevation'].to_numpy(dtype=float), pressure * PA_PER_MBAR, temperature
+        )
+        solar_positions['apparent_elevation'] = apparent_elevation
+        solar_positions['apparent_zenith'] = 90 - apparent_elevation
+        if 'horizon_elevation' in solar_positions.columns:
+            column = 'apparent_elevation' if solar_positions.attrs.get('apply_refraction', True) else 'elevation'
+            solar_positions['sun_visible'] = (
+                solar_positions[column].to_numpy(dtype=float)
+                > solar_positions['horizon_elevation'].to_numpy(dtype=float)
+            )
+        return solar_positions
+    
+    @staticmethod
+    def _position_cache_key(
+        times: pd.DatetimeIndex,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        pressure: float,
+        temperature: float,
+        precision: str,
+        node_minutes: Optional[int],
+    ) -> Tuple:
+        """Key for solar_position_cache: site, atmosphere, method and a digest of the UTC instants."""
+        digest = hashlib.blake2b(np.ascontiguousarray(times.asi8).tobytes(), digest_size=16).hexdigest()
+        return (
+            'solar_positions',
+            float(latitude),
+            float(longitude),
+            float(altitude),
+            float(pressure),
+            float(temperature),
+            precision,
+            node_minutes,
+            # A configured ephemeris table changes the 'high' evaluation path
+            settings.EPHEMERIS_PATH,
+            len(times),
+            digest,
+        )
+    
+    def _spa_positions(
+        self,
+        times: pd.DatetimeIndex,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        pressure: float,
+        temperature: float,
+    ) -> pd.DataFrame:
+        """
+        Single SPA evaluation for one site
+        
+        Uses the memory-mapped ephemeris table when configured and covering
+        the span (topocentric trig only), otherwise pvlib nrel_numpy.
+        """
+        store = get_ephemeris_store()
+        if store is not None:
+            terms = store.lookup(spa_engine.times_to_unixtime(times))
+            if terms is not None:
+                return spa_engine.solar_position_frame(
+                    times, latitude, longitude, altitude, pressure, temperature,
+                    terms=terms,
+                )
+        
+        return solarposition.get_solarposition(
             time=times,
             latitude=latitude,
             longitude=longitude,
@@ -91,12 +292,285 @@ class SolarCalculator:
             temperature=temperature,
             method='nrel_numpy'
         )
+    
+    def _interpolated_positions(
+        self,
+        times: pd.DatetimeIndex,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        pressure: float,
+        temperature: float,
+        node_minutes: int,
+    ) -> pd.DataFrame:
+        """
+        SPA at coarse UTC nodes, cubic spline of the sun unit vector
+        
+        Interpolating (east, north, up) instead of angles avoids the 360°→0°
+        azimuth wrap and the zenith singularity; refraction is re-applied to
+        the interpolated geometric elevation so the horizon crossing uses the
+        SPA formula rather than a spline through its discontinuity.
+        
+        SPA is also evaluated at every node midpoint (where the spline error
+        peaks) and the worst angular separation is stored in
+        attrs['max_deviation_deg'].
+        """
+        if len(times) == 0:
+            return self._spa_positions(times, latitude, longitude, altitude, pressure, temperature)
+        
+        unixtime = spa_engine.times_to_unixtime(times)
+        step = node_minutes * 60.0
+        first = np.floor(unixtime.min() / step) * step
+        last = np.ceil(unixtime.max() / step) * step
+        node_unix = np.arange(first, last + step / 2, step)
+        if len(node_unix) < 4 or 2 * len(node_unix) >= len(times):
+            # Too few samples for interpolation to pay off
+            direct = self._spa_positions(times, latitude, longitude, altitude, pressure, temperature)
+            direct.attrs['max_deviation_deg'] = 0.0
+            return direct
+        
+        # Nodes and midpoints in one SPA call
+        sample_unix = np.concatenate((node_unix, node_unix[:-1] + step / 2))
+        samples = self._spa_positions(
+            pd.DatetimeIndex(pd.to_datetime(sample_unix, unit='s', utc=True)),
+            latitude, longitude, altitude, pressure, temperature,
+        )
+        sample_vectors = self._unit_vectors(
+            samples['elevation'].to_numpy(), samples['azimuth'].to_numpy()
+        )
+        n_nodes = len(node_unix)
+        spline = CubicSpline(node_unix - first, sample_vectors[:n_nodes], axis=0)
         
-        # Expose which columns consumers should prefer
-        solar_pos.attrs['apply_refraction'] = apply_refraction
-        solar_pos.attrs['used_timezone'] = timezone_label(tz)
+        midpoint_vectors = spline(sample_unix[n_nodes:] - first)
+        midpoint_vectors /= np.linalg.norm(midpoint_vectors, axis=1, keepdims=True)
+        cos_sep = np.clip(np.sum(midpoint_vectors * sample_vectors[n_nodes:], axis=1), -1.0, 1.0)
+        max_deviation = float(np.degrees(np.arccos(cos_sep)).max())
         
-        return solar_pos
+        east, north, up = spline(unixtime - first).T
+        elevation = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        azimuth = np.degrees(np.arctan2(east, north)) % 360
+        apparent_elevation = spa_engine.apparent_elevation(elevation, pressure, temperature)
+        
+        result = pd.DataFrame(
+            {
+                'apparent_zenith': 90 - apparent_elevation,
+                'zenith': 90 - elevation,
+                'apparent_elevation': apparent_elevation,
+                'elevation': elevation,
+                'azimuth': azimuth,
+            },
+            index=times,
+        )
+        result.attrs['node_minutes'] = node_minutes
+        result.attrs['max_deviation_deg'] = max_deviation
+        return result
+    
+    @staticmethod
+    def _unit_vectors(elevation: np.ndarray, azimuth: np.ndarray) -> np.ndarray:
+        """(N, 3) east/north/up unit vectors toward the sun."""
+        el_rad = np.radians(elevation)
+        az_rad = np.radians(azimuth)
+        return np.column_stack((
+            np.cos(el_rad) * np.sin(az_rad),
+            np.cos(el_rad) * np.cos(az_rad),
+            np.sin(el_rad),
+        ))
+    
+    def build_local_times(
+        self,
+        start_date: str,
+        end_date: str,
+        start_time: str = "00:00",
+        end_time: str = "23:59",
+        interval_minutes: int = 60,
+        tz: Any = None,
+    ) -> pd.DatetimeIndex:
+        """
+        Build one tz-aware index covering every day in [start_date, end_date]
+        
+        Each day gets the same wall-clock grid (start_time..end_time every
+        interval_minutes), so day N of a range equals a single-day request.
+        DST: nonexistent wall times shift forward (duplicates dropped),
+        ambiguous wall times resolve to the first (DST) occurrence.
+        
+        Args:
+            start_date: First local date (YYYY-MM-DD)
+            end_date: Last local date, inclusive (YYYY-MM-DD)
+            start_time: Daily start time (HH:MM)
+            end_time: Daily end time (HH:MM)
+            interval_minutes: Time interval in minutes
+            tz: tzinfo from resolve_timezone (None → naive index)
+            
+        Returns:
+            Sorted, duplicate-free DatetimeIndex
+        """
+        wall_clock = self._wall_clock_grid(
+            start_date, end_date, start_time, end_time, interval_minutes
+        )
+        if tz is None:
+            return wall_clock
+        times, _ = self._localize_wall_clock(wall_clock, tz)
+        return times
+    
+    def _wall_clock_grid(
+        self,
+        start_date: str,
+        end_date: str,
+        start_time: str,
+        end_time: str,
+        interval_minutes: int,
+    ) -> pd.DatetimeIndex:
+        """Naive per-day HH:MM grid for every date in the inclusive range."""
+        first_day = datetime.fromisoformat(start_date).date()
+        last_day = datetime.fromisoformat(end_date).date()
+        if last_day < first_day:
+            raise ValueError("end_date must be greater than or equal to date")
+        
+        day_start = datetime.strptime(start_time, "%H:%M")
+        day_end = datetime.strptime(end_time, "%H:%M")
+        offsets = pd.timedelta_range(
+            start=timedelta(hours=day_start.hour, minutes=day_start.minute),
+            end=timedelta(hours=day_end.hour, minutes=day_end.minute),
+            freq=f'{interval_minutes}min'
+        )
+        days = pd.date_range(start=first_day, end=last_day, freq='D')
+        
+        return pd.DatetimeIndex(
+            (days.values[:, None] + offsets.values[None, :]).ravel()
+        )
+    
+    @staticmethod
+    def _localize_wall_clock(
+        wall_clock: pd.DatetimeIndex,
+        tz: Any,
+    ) -> Tuple[pd.DatetimeIndex, Any]:
+        """Localize naive wall-clock times, resolving DST gaps/overlaps."""
+        try:
+            # pandas localizes IANA names through its vectorized tz database;
+            # passing a ZoneInfo object falls back to per-element lookups
+            times = wall_clock.tz_localize(
+                getattr(tz, 'key', None) or tz,
+                ambiguous=np.ones(len(wall_clock), dtype=bool),
+                nonexistent='shift_forward',
+            )
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Timezone localization failed: {e}. Using UTC.")
+            times = wall_clock.tz_localize('UTC')
+            tz = resolve_timezone(0, 0, 'UTC')
+        return times[~times.duplicated()], tz
+    
+    def _day_bounds(self, times: pd.DatetimeIndex) -> List[Tuple[str, int, int]]:
+        """[(local date, start row, stop row), ...] for contiguous local days."""
+        if len(times) == 0:
+            return []
+        local_days = times.tz_localize(None).normalize() if times.tz is not None else times.normalize()
+        day_values = local_days.asi8
+        breaks = np.flatnonzero(day_values[1:] != day_values[:-1]) + 1
+        starts = np.concatenate(([0], breaks))
+        stops = np.concatenate((breaks, [len(times)]))
+        return [
+            (local_days[start].strftime('%Y-%m-%d'), int(start), int(stop))
+            for start, stop in zip(starts, stops)
+        ]
+    
+    def iter_days(self, solar_positions: pd.DataFrame):
+        """
+        Yield (local date, rows of that day) from a range result
+        
+        Rows are positional iloc slices of the original frame (views of the
+        same column blocks, no copy).
+        """
+        bounds = solar_positions.attrs.get('day_bounds')
+        if bounds is None:
+            bounds = self._day_bounds(solar_positions.index)
+        for day, start, stop in bounds:
+            yield day, solar_positions.iloc[start:stop]
+    
+    def calculate_solar_positions_multi(
+        self,
+        latitudes,
+        longitudes,
+        times: pd.DatetimeIndex,
+        altitudes=None,
+        pressure: float = None,
+        temperature: float = None,
+        apply_refraction: bool = True,
+        chunk_size: Optional[int] = None,
+        dtype=np.float64,
+    ) -> Dict[str, Any]:
+        """
+        Solar positions for many sites sharing one time index
+        
+        The time-only SPA terms are evaluated once; the topocentric part is
+        broadcast over chunks of sites so intermediate memory stays bounded.
+        
+        Args:
+            latitudes: Array of latitudes in degrees
+            longitudes: Array of longitudes in degrees
+            times: Shared DatetimeIndex (naive times are treated as UTC)
+            altitudes: Optional array of elevations in meters (default 0)
+            pressure: Atmospheric pressure in mbar (default: 1013.25)
+            temperature: Temperature in Celsius
+            apply_refraction: Return apparent (True) or geometric angles
+            chunk_size: Sites per chunk (default: ~1M elements per chunk)
+            dtype: Output dtype (float32 halves result memory)
+            
+        Returns:
+            Dictionary with times plus (sites × times) arrays:
+            elevation, zenith, azimuth
+        """
+        if pressure is None:
+            pressure = self.pressure
+        if temperature is None:
+            temperature = self.temperature
+        
+        lats = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        if altitudes is None:
+            alts = np.zeros_like(lats)
+        else:
+            alts = np.broadcast_to(np.asarray(altitudes, dtype=np.float64), lats.shape)
+        if lats.shape != lons.shape:
+            raise ValueError("latitudes and longitudes must have the same length")
+        
+        times = pd.DatetimeIndex(times)
+        unixtime = spa_engine.times_to_unixtime(times)
+        store = get_ephemeris_store()
+        terms = store.lookup(unixtime) if store is not None else None
+        if terms is None:
+            terms = spa_engine.geocentric_terms(unixtime)
+        
+        n_sites, n_times = len(lats), len(times)
+        if chunk_size is None:
+            chunk_size = max(1, MULTI_SITE_CHUNK_ELEMENTS // max(n_times, 1))
+        
+        elevation = np.empty((n_sites, n_times), dtype=dtype)
+        zenith = np.empty((n_sites, n_times), dtype=dtype)
+        azimuth = np.empty((n_sites, n_times), dtype=dtype)
+        alt_key = 'apparent_elevation' if apply_refraction else 'elevation'
+        zen_key = 'apparent_zenith' if apply_refraction else 'zenith'
+        
+        for start in range(0, n_sites, chunk_size):
+            stop = min(start + chunk_size, n_sites)
+            position = spa_engine.topocentric_positions(
+                terms,
+                lats[start:stop, None],
+                lons[start:stop, None],
+                alts[start:stop, None],
+                pressure * PA_PER_MBAR,
+                temperature,
+            )
+            elevation[start:stop] = position[alt_key]
+            zenith[start:stop] = position[zen_key]
+            azimuth[start:stop] = position['azimuth']
+        
+        return {
+            'times': times,
+            'elevation': elevation,
+            'zenith': zenith,
+            'azimuth': azimuth,
+            'apply_refraction': apply_refraction,
+        }
     
     def calculate_sunrise_sunset(
         self,
@@ -118,49 +592,112 @@ class SolarCalculator:
             Dictionary with sunrise, sunset, solar_noon, and day_length
         """
         tz = resolve_timezone(latitude, longitude, timezone_name)
-        
-        try:
-            date_obj = pd.Timestamp(date).tz_localize(tz)
-        except (ValueError, TypeError) as e:
-            print(f"⚠️ Timezone localization failed in sunrise_sunset: {e}. Using UTC.")
-            date_obj = pd.Timestamp(date).tz_localize('UTC')
-        
-        times = pd.DatetimeIndex([date_obj])
-        sun_times = solarposition.sun_rise_set_transit_spa(
-            times,
-            latitude,
-            longitude
-        )
-        
-        sunrise = sun_times['sunrise'].iloc[0]
-        sunset = sun_times['sunset'].iloc[0]
-        solar_noon = sun_times['transit'].iloc[0]
-        
-        if pd.notna(sunrise) and pd.notna(sunset):
-            day_length = (sunset - sunrise).total_seconds() / 3600
-        elif pd.isna(sunrise) and pd.isna(sunset):
-            # Polar day vs polar night: check noon elevation
-            noon_dt = pd.Timestamp(f"{date}T12:00:00").tz_localize(tz)
-            noon_pos = solarposition.get_solarposition(
-                time=pd.DatetimeIndex([noon_dt]),
-                latitude=latitude,
-                longitude=longitude,
-                method='nrel_numpy',
-            )
-            noon_alt = float(noon_pos['apparent_elevation'].iloc[0])
-            day_length = 24.0 if noon_alt > 0 else 0.0
-        else:
-            print(f"⚠️ Anomalous sun times: sunrise={sunrise}, sunset={sunset}")
-            day_length = 0.0
+        day = self.calculate_sun_times_range(
+            latitude, longitude, date, date, timezone_name=timezone_name, tz=tz
+        ).iloc[0]
         
         return {
-            'sunrise': sunrise.isoformat() if pd.notna(sunrise) else None,
-            'sunset': sunset.isoformat() if pd.notna(sunset) else None,
-            'solar_noon': solar_noon.isoformat() if pd.notna(solar_noon) else None,
-            'day_length': day_length,
+            'sunrise': day['sunrise'].isoformat() if pd.notna(day['sunrise']) else None,
+            'sunset': day['sunset'].isoformat() if pd.notna(day['sunset']) else None,
+            'solar_noon': day['transit'].isoformat() if pd.notna(day['transit']) else None,
+            'day_length': float(day['day_length']),
             'timezone': timezone_label(tz),
         }
     
+    def calculate_sun_times_range(
+        self,
+        latitude: float,
+        longitude: float,
+        start_date: str,
+        end_date: str,
+        timezone_name: Optional[str] = None,
+        tz: Any = None,
+    ) -> pd.DataFrame:
+        """
+        Sunrise, sunset, transit, day length and polar state for every day
+        
+        Whole calendar years are solved in one vectorized
+        sun_rise_set_transit_spa call and memoized per (rounded lat/lon,
+        timezone, year), so repeated requests for the same site are lookups.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            start_date: First date (YYYY-MM-DD)
+            end_date: Last date, inclusive (YYYY-MM-DD)
+            timezone_name: Optional IANA timezone
+            tz: Already resolved tzinfo (skips resolve_timezone)
+            
+        Returns:
+            DataFrame indexed by local date with columns sunrise, sunset,
+            transit (tz-aware), day_length (hours) and polar
+            ('polar_day', 'polar_night' or None)
+        """
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+        if tz is None:
+            tz = resolve_timezone(latitude, longitude, timezone_name)
+        
+        lat_key = round(float(latitude), SUN_TIMES_COORD_DECIMALS)
+        lon_key = round(float(longitude), SUN_TIMES_COORD_DECIMALS)
+        years = [
+            self._sun_times_year(lat_key, lon_key, tz, year)
+            for year in range(start.year, end.year + 1)
+        ]
+        table = years[0] if len(years) == 1 else pd.concat(years)
+        # Copy: the memoized year tables are shared
+        return table.loc[start:end].copy()
+    
+    @staticmethod
+    @lru_cache(maxsize=SUN_TIMES_CACHE_SIZE)
+    def _sun_times_year(latitude: float, longitude: float, tz: Any, year: int) -> pd.DataFrame:
+        """One calendar year of sun times (memoized; treat as read-only)."""
+        dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq='D')
+        # sun_rise_set_transit_spa solves the UTC day containing each input, so
+        # pass local noon: local midnight east of UTC falls on the previous UTC day
+        noons, _ = SolarCalculator._localize_wall_clock(dates + pd.Timedelta(hours=12), tz)
+        
+        sun_times = solarposition.sun_rise_set_transit_spa(noons, latitude, longitude)
+        sunrise = sun_times['sunrise']
+        sunset = sun_times['sunset']
+        transit = sun_times['transit']
+        
+        has_rise = sunrise.notna().to_numpy()
+        has_set = sunset.notna().to_numpy()
+        polar = ~has_rise & ~has_set
+        
+        day_length = np.zeros(len(noons))
+        both = has_rise & has_set
+        day_length[both] = (sunset[both] - sunrise[both]).dt.total_seconds().to_numpy() / 3600
+        
+        polar_state = np.full(len(noons), None, dtype=object)
+        if polar.any():
+            # Polar day vs polar night: sun elevation at transit (same default
+            # atmosphere as get_solarposition), one vectorized SPA call
+            transit_times = pd.DatetimeIndex(transit[polar])
+            transit_alt = spa_engine.solar_position_frame(
+                transit_times, latitude, longitude
+            )['apparent_elevation'].to_numpy()
+            polar_day = transit_alt > 0
+            day_length[polar] = np.where(polar_day, 24.0, 0.0)
+            polar_state[polar] = np.where(polar_day, 'polar_day', 'polar_night')
+        
+        if (has_rise != has_set).any():
+            print(f"⚠️ Anomalous sun times on {int((has_rise != has_set).sum())} day(s) in {year}")
+        
+        return pd.DataFrame(
+            {
+                'sunrise': sunrise.to_numpy(),
+                'sunset': sunset.to_numpy(),
+                'transit': transit.to_numpy(),
+                'day_length': day_length,
+                'polar': polar_state,
+            },
+            index=pd.DatetimeIndex(noons.tz_localize(None).normalize(), name='date'),
+        )
+    
     def get_max_solar_altitude(
         self,
         solar_positions: pd.DataFrame,
@@ -213,7 +750,15 @@ class SolarCalculator:
         hour_of_day = timestamp.hour + timestamp.minute / 60
         solar_noon = 12.0
         return (hour_of_day - solar_noon) * 15
-    
+
+    def _calculate_hour_angles(self, times: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Vectorized _calculate_hour_angle over a whole DatetimeIndex.
+        """
+        hour_of_day = times.hour.to_numpy() + times.minute.to_numpy() / 60
+        solar_noon = 12.0
+        return (hour_of_day - solar_noon) * 15
+
     def validate_extreme_conditions(
         self,
         latitude: float,
@@ -0,0 +1,198 @@
+"""
+Vectorized NREL SPA split into a time-only (geocentric) stage and a
+per-site (topocentric) stage.
+
+Built from the same pvlib.spa building blocks as
+``get_solarposition(method='nrel_numpy')``, so a single site reproduces it
+exactly; many sites share one evaluation of the expensive time terms
+(Julian dates, heliocentric position, nutation, sidereal time, declination,
+equation of time).
+"""
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from pvlib import spa
+
+# pvlib.solarposition.spa_python defaults
+DEFAULT_DELTA_T = 67.0
+DEFAULT_ATMOS_REFRACT = 0.5667
+
+
+class GeocentricTerms(NamedTuple):
+    """Location-independent SPA terms, one value per timestamp (degrees)."""
+    v: np.ndarray       # apparent sidereal time at Greenwich
+    alpha: np.ndarray   # geocentric sun right ascension
+    delta: np.ndarray   # geocentric sun declination
+    xi: np.ndarray      # equatorial horizontal parallax of the sun
+    eot: np.ndarray     # equation of time (minutes)
+
+
+def times_to_unixtime(times: pd.DatetimeIndex) -> np.ndarray:
+    """Seconds since epoch (UTC) as float64; naive times are treated as UTC."""
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_convert('UTC')
+    return times.asi8.astype(np.float64) / 1e9
+
+
+def geocentric_terms(
+    unixtime: np.ndarray,
+    delta_t: float = DEFAULT_DELTA_T,
+) -> GeocentricTerms:
+    """
+    Evaluate the location-independent part of SPA
+
+    Args:
+        unixtime: Seconds since epoch (UTC)
+        delta_t: TT - UT1 in seconds (pvlib default 67.0)
+
+    Returns:
+        GeocentricTerms arrays aligned with unixtime
+    """
+    unixtime = np.atleast_1d(np.asarray(unixtime, dtype=np.float64))
+    jd = spa.julian_day(unixtime)
+    jde = spa.julian_ephemeris_day(jd, delta_t)
+    jc = spa.julian_century(jd)
+    jce = spa.julian_ephemeris_century(jde)
+    jme = spa.julian_ephemeris_millennium(jce)
+    R = spa.heliocentric_radius_vector(jme)
+    L = spa.heliocentric_longitude(jme)
+    B = spa.heliocentric_latitude(jme)
+    Theta = spa.geocentric_longitude(L)
+    beta = spa.geocentric_latitude(B)
+    x0 = spa.mean_elongation(jce)
+    x1 = spa.mean_anomaly_sun(jce)
+    x2 = spa.mean_anomaly_moon(jce)
+    x3 = spa.moon_argument_latitude(jce)
+    x4 = spa.moon_ascending_longitude(jce)
+    l_o_nutation = np.empty((2, len(x0)))
+    spa.longitude_obliquity_nutation(jce, x0, x1, x2, x3, x4, l_o_nutation)
+    delta_psi = l_o_nutation[0]
+    delta_epsilon = l_o_nutation[1]
+    epsilon0 = spa.mean_ecliptic_obliquity(jme)
+    epsilon = spa.true_ecliptic_obliquity(epsilon0, delta_epsilon)
+    delta_tau = spa.aberration_correction(R)
+    lamd = spa.apparent_sun_longitude(Theta, delta_psi, delta_tau)
+    v0 = spa.mean_sidereal_time(jd, jc)
+    v = spa.apparent_sidereal_time(v0, delta_psi, epsilon)
+    alpha = spa.geocentric_sun_right_ascension(lamd, epsilon, beta)
+    delta = spa.geocentric_sun_declination(lamd, epsilon, beta)
+    m = spa.sun_mean_longitude(jme)
+    eot = spa.equation_of_time(m, alpha, delta_psi, epsilon)
+    xi = spa.equatorial_horizontal_parallax(R)
+    return GeocentricTerms(v=v, alpha=alpha, delta=delta, xi=xi, eot=eot)
+
+
+def topocentric_positions(
+    terms: GeocentricTerms,
+    latitude,
+    longitude,
+    altitude=0.0,
+    pressure=101325.0,
+    temperature=12.0,
+    atmos_refract: float = DEFAULT_ATMOS_REFRACT,
+) -> Dict[str, np.ndarray]:
+    """
+    Per-site part of SPA, broadcast against the geocentric terms
+
+    Site arguments may be scalars or arrays shaped to broadcast with the
+    time axis (e.g. ``lat[:, None]`` for a sites × times result).
+
+    Args:
+        terms: Output of geocentric_terms
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        altitude: Elevation in meters
+        pressure: Pressure in the same unit get_solarposition expects (Pa)
+        temperature: Temperature in Celsius
+        atmos_refract: Refraction at sunrise/sunset (degrees)
+
+    Returns:
+        Dict with apparent_zenith, zenith, apparent_elevation, elevation, azimuth
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    elev = np.asarray(altitude, dtype=np.float64)
+    # spa_python converts Pa → mbar before calling SPA
+    pressure_mbar = np.asarray(pressure, dtype=np.float64) / 100
+    temp = np.asarray(temperature, dtype=np.float64)
+
+    H = spa.local_hour_angle(terms.v, lon, terms.alpha)
+    u = spa.uterm(lat)
+    x = spa.xterm(u, lat, elev)
+    y = spa.yterm(u, lat, elev)
+    delta_alpha = spa.parallax_sun_right_ascension(x, terms.xi, H, terms.delta)
+    delta_prime = spa.topocentric_sun_declination(
+        terms.delta, x, y, terms.xi, delta_alpha, H
+    )
+    H_prime = spa.topocentric_local_hour_angle(H, delta_alpha)
+    e0 = spa.topocentric_elevation_angle_without_atmosphere(lat, delta_prime, H_prime)
+    delta_e = spa.atmospheric_refraction_correction(
+        pressure_mbar, temp, e0, atmos_refract
+    )
+    e = spa.topocentric_elevation_angle(e0, delta_e)
+    gamma = spa.topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
+    phi = spa.topocentric_azimuth_angle(gamma)
+    return {
+        'apparent_zenith': spa.topocentric_zenith_angle(e),
+        'zenith': spa.topocentric_zenith_angle(e0),
+        'apparent_elevation': e,
+        'elevation': e0,
+        'azimuth': phi,
+    }
+
+
+def apparent_elevation(
+    elevation,
+    pressure=101325.0,
+    temperature=12.0,
+    atmos_refract: float = DEFAULT_ATMOS_REFRACT,
+) -> np.ndarray:
+    """
+    SPA refraction applied to a geometric elevation (degrees)
+
+    Same formula and pressure unit (Pa) as the full SPA path, so interpolated
+    geometric positions get an identical horizon treatment.
+    """
+    e0 = np.asarray(elevation, dtype=np.float64)
+    delta_e = spa.atmospheric_refraction_correction(
+        np.asarray(pressure, dtype=np.float64) / 100,
+        np.asarray(temperature, dtype=np.float64),
+        e0,
+        atmos_refract,
+    )
+    return spa.topocentric_elevation_angle(e0, delta_e)
+
+
+def solar_position_frame(
+    times: pd.DatetimeIndex,
+    latitude: float,
+    longitude: float,
+    altitude: float = 0.0,
+    pressure: float = 101325.0,
+    temperature: float = 12.0,
+    delta_t: float = DEFAULT_DELTA_T,
+    terms: Optional[GeocentricTerms] = None,
+) -> pd.DataFrame:
+    """
+    Single-site DataFrame in the get_solarposition(method='nrel_numpy') layout
+
+    Pass precomputed ``terms`` to skip the geocentric stage.
+    """
+    if terms is None:
+        terms = geocentric_terms(times_to_unixtime(times), delta_t)
+    position = topocentric_positions(
+        terms, latitude, longitude, altitude, pressure, temperature
+    )
+    return pd.DataFrame(
+        {
+            'apparent_zenith': position['apparent_zenith'],
+            'zenith': position['zenith'],
+            'apparent_elevation': position['apparent_elevation'],
+            'elevation': position['elevation'],
+            'azimuth': position['azimuth'],
+            'equation_of_time': terms.eot,
+        },
+        index=times,
+    )
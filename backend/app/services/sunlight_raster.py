@@ -0,0 +1,240 @@
+"""
+Direct-sun hours on a regular grid around a site (day, season or year).
+
+Cell centres are traced against a BuildingScene for every daytime step of
+the requested period; each cell keeps a count of sunlit steps in a compact
+unsigned integer array, converted to hours only for the summary. The grid is
+split into tiles that run on a process pool (the scene and sun track are
+sent to each worker once). Pools start workers through forkserver/spawn
+rather than forking the threaded server, and only one pool runs per
+process at a time so concurrent requests do not multiply the worker count.
+
+The raster is north-up: row 0 is the northern edge, and ``transform`` is a
+GDAL-style affine (west, lon_step, 0, north, 0, -lat_step) in degrees, so
+the result can be written as a GeoTIFF without reprojection.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.building_scene import MIN_SUN_ALTITUDE, RAYS_PER_CHUNK, BuildingScene, get_scene
+from app.services.shadow_calculator import EARTH_RADIUS
+from app.services.solar_calculator import SolarCalculator
+
+# Cells per tile (one unit of work for a worker process)
+TILE_CELLS = 4096
+# Largest grid accepted (rows × cols)
+MAX_RASTER_CELLS = 250_000
+# Largest (daytime step × cell) workload accepted
+MAX_RASTER_RAYS = 50_000_000
+# Below this many (step, cell) rays the pool start-up costs more than it saves
+MIN_PARALLEL_RAYS = 2_000_000
+# Workers start from a clean interpreter; forking a threaded uvicorn process is unsafe
+_POOL_START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+# One process pool at a time per server process
+_pool_slot = threading.Lock()
+
+_solar = SolarCalculator()
+
+# Worker-process state set by _init_worker
+_worker_scene: Optional[BuildingScene] = None
+_worker_altitude: Optional[np.ndarray] = None
+_worker_azimuth: Optional[np.ndarray] = None
+
+
+def _count_dtype(steps: int) -> np.dtype:
+    """Smallest unsigned dtype that can hold a count of `steps`."""
+    return np.dtype(np.uint16) if steps <= np.iinfo(np.uint16).max else np.dtype(np.uint32)
+
+
+def _sunlit_counts(
+    scene: Optional[BuildingScene],
+    lons: np.ndarray,
+    lats: np.ndarray,
+    altitude: np.ndarray,
+    azimuth: np.ndarray,
+) -> np.ndarray:
+    """Number of daytime steps in which each point is not shaded by a building."""
+    dtype = _count_dtype(len(altitude))
+    if scene is None:
+        return np.full(len(lons), len(altitude), dtype=dtype)
+    shaded = np.zeros(len(lons), dtype=np.int64)
+    # Blocks of steps keep the (steps, points) result arrays small
+    block = max(1, RAYS_PER_CHUNK // max(len(lons), 1))
+    for start in range(0, len(altitude), block):
+        result = scene.first_occluders(
+            lons, lats, altitude[start:start + block], azimuth[start:start + block]
+        )
+        shaded += result['shaded'].sum(axis=0)
+    return (len(altitude) - shaded).astype(dtype)
+
+
+def _init_worker(scene, altitude, azimuth) -> None:
+    global _worker_scene, _worker_altitude, _worker_azimuth
+    _worker_scene = scene
+    _worker_altitude = altitude
+    _worker_azimuth = azimuth
+
+
+def _tile_counts(lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    return _sunlit_counts(_worker_scene, lons, lats, _worker_altitude, _worker_azimuth)
+
+
+def raster_grid(
+    center_lat: float,
+    center_lon: float,
+    width_m: float,
+    height_m: float,
+    resolution_m: float,
+) -> Dict[str, Any]:
+    """
+    North-up grid of cell centres around a site
+
+    Returns:
+        Dictionary with rows, cols, lons (cols,), lats (rows,) and the
+        GDAL-style transform (west, lon_step, 0, north, 0, -lat_step)
+    """
+    if resolution_m <= 0 or width_m <= 0 or height_m <= 0:
+        raise ValueError("width, height and resolution must be positive")
+    cols = max(1, int(round(width_m / resolution_m)))
+    rows = max(1, int(round(height_m / resolution_m)))
+    if rows * cols > MAX_RASTER_CELLS:
+        raise ValueError(f"Raster too large: {rows}x{cols} cells (max {MAX_RASTER_CELLS})")
+
+    meters_per_deg_lat = np.radians(1.0) * EARTH_RADIUS
+    lat_step = resolution_m / meters_per_deg_lat
+    lon_step = lat_step / max(np.cos(np.radians(center_lat)), 1e-6)
+    west = center_lon - cols * lon_step / 2
+    north = center_lat + rows * lat_step / 2
+    return {
+        'rows': rows,
+        'cols': cols,
+        'lons': west + (np.arange(cols) + 0.5) * lon_step,
+        'lats': north - (np.arange(rows) + 0.5) * lat_step,
+        'transform': (west, lon_step, 0.0, north, 0.0, -lat_step),
+    }
+
+
+def calculate_sunlight_hours(
+    center_lat: float,
+    center_lon: float,
+    buildings: Sequence[Dict[str, Any]],
+    start_date: str,
+    end_date: Optional[str] = None,
+    width_m: float = 200.0,
+    height_m: float = 200.0,
+    resolution_m: float = 2.0,
+    interval_minutes: int = 10,
+    timezone_name: Optional[str] = None,
+    altitude: float = 0,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Hours of direct sun per grid cell over [start_date, end_date]
+
+    Args:
+        center_lat: Grid centre latitude
+        center_lon: Grid centre longitude
+        buildings: Footprints for BuildingScene ({'ring', 'height', 'id'}); may be empty
+        start_date: First local date (YYYY-MM-DD)
+        end_date: Last local date, inclusive (default: start_date)
+        width_m: Grid extent east-west in meters
+        height_m: Grid extent north-south in meters
+        resolution_m: Cell size in meters
+        interval_minutes: Sun sampling step; each sunlit step counts this long
+        timezone_name: Optional IANA timezone
+        altitude: Site elevation in meters
+        workers: Worker processes (default settings.RASTER_WORKERS, 0 = all cores)
+
+    Raises:
+        ValueError: Grid larger than MAX_RASTER_CELLS or cells × daytime
+                    steps above MAX_RASTER_RAYS
+
+    Returns:
+        Dictionary with:
+        - counts: (rows, cols) uint16/uint32 sunlit step counts
+        - hours: (rows, cols) float32 sun hours (counts × interval)
+        - transform, rows, cols, resolution_m
+        - stats: min/max/mean/median hours, possible_hours (no buildings)
+          and shaded_fraction (share of possible sun lost to buildings)
+    """
+    grid = raster_grid(center_lat, center_lon, width_m, height_m, resolution_m)
+    solar_positions = _solar.calculate_solar_positions(
+        latitude=center_lat,
+        longitude=center_lon,
+        date=start_date,
+        end_date=end_date,
+        interval_minutes=interval_minutes,
+        altitude=altitude,
+        timezone_name=timezone_name,
+    )
+    sun_altitude = solar_positions['apparent_elevation'].to_numpy(dtype=float)
+    up = sun_altitude > MIN_SUN_ALTITUDE
+    sun_altitude = np.ascontiguousarray(sun_altitude[up])
+    sun_azimuth = np.ascontiguousarray(solar_positions['azimuth'].to_numpy(dtype=float)[up])
+    n_rays = grid['rows'] * grid['cols'] * len(sun_altitude)
+    if buildings and n_rays > MAX_RASTER_RAYS:
+        raise ValueError(
+            f"Too many daytime steps × cells: {n_rays} > {MAX_RASTER_RAYS}; "
+            "shorten the period, raise the interval or coarsen the grid"
+        )
+
+    scene = get_scene(list(buildings)) if buildings else None
+    lon_grid, lat_grid = np.meshgrid(grid['lons'], grid['lats'])
+    lons = lon_grid.ravel()
+    lats = lat_grid.ravel()
+    tiles = [
+        (lons[start:start + TILE_CELLS], lats[start:start + TILE_CELLS])
+        for start in range(0, len(lons), TILE_CELLS)
+    ]
+
+    if workers is None:
+        workers = settings.RASTER_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tiles))
+    if scene is None or workers == 1 or len(lons) * len(sun_altitude) < MIN_PARALLEL_RAYS:
+        parts = [
+            _sunlit_counts(scene, tile_lons, tile_lats, sun_altitude, sun_azimuth)
+            for tile_lons, tile_lats in tiles
+        ]
+    else:
+        with _pool_slot, ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(_POOL_START_METHOD),
+            initializer=_init_worker,
+            initargs=(scene, sun_altitude, sun_azimuth),
+        ) as pool:
+            parts = list(pool.map(_tile_counts, *zip(*tiles)))
+
+    counts = np.concatenate(parts).reshape(grid['rows'], grid['cols'])
+    step_hours = interval_minutes / 60.0
+    hours = (counts * step_hours).astype(np.float32)
+    possible_hours = len(sun_altitude) * step_hours
+    # Statistics from the integer counts (exact, no float32 rounding)
+    mean_hours = float(counts.mean()) * step_hours
+    return {
+        'counts': counts,
+        'hours': hours,
+        'transform': grid['transform'],
+        'rows': grid['rows'],
+        'cols': grid['cols'],
+        'resolution_m': resolution_m,
+        'timezone': solar_positions.attrs.get('used_timezone'),
+        'stats': {
+            'min_hours': int(counts.min()) * step_hours,
+            'max_hours': int(counts.max()) * step_hours,
+            'mean_hours': mean_hours,
+            'median_hours': float(np.median(counts)) * step_hours,
+            'possible_hours': possible_hours,
+            'shaded_fraction': 1 - mean_hours / possible_hours if possible_hours else 0.0,
+            'daytime_steps': int(len(sun_altitude)),
+        },
+    }
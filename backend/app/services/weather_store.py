@@ -0,0 +1,359 @@
+"""
+Local weather files (TMY3, EPW, plain CSV) indexed into memory-mapped tables.
+
+A file is parsed once (pvlib.iotools for TMY3/EPW) and written as a compact
+float64 .npy table plus a JSON sidecar under ``<WEATHER_DIR>/.cache``. The
+cache name carries a digest of the source path, size and mtime, so an edited
+file is re-indexed automatically (the previous table is removed); readers open
+the table with
+``mmap_mode='r'`` and only slice the rows of the requested period.
+
+Timestamps are stored as UTC seconds at the interval midpoint (TMY3 labels
+the end of each hour, EPW the start after pvlib's parsing). Typical-year files
+(TMY3, EPW) are coerced to TYPICAL_YEAR and replayed on the calendar of
+whatever year is requested; plain CSV files are measured series and are used
+as-is.
+
+Plain CSV layout: a ``timestamp`` column (ISO 8601; naive values are UTC)
+and ``ghi`` plus optionally ``dni``, ``dhi``, ``temp_air`` (°C) and
+``pressure`` (mbar).
+
+Posted hourly series (e.g. Open-Meteo) are not stored; resample_weather_series
+interpolates them onto a request's timestamps.
+
+Index all files ahead of time:
+    python -m app.services.weather_store index
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pvlib import iotools
+
+from app.core.config import settings
+
+COLUMNS = ('unix', 'ghi', 'dni', 'dhi', 'temp_air', 'pressure')
+FORMAT_VERSION = 1
+# Non-leap year typical-year files are coerced to before replaying
+TYPICAL_YEAR = 1990
+WEATHER_SUFFIXES = ('.epw', '.csv')
+# Indexed files kept open by get_weather_store
+WEATHER_CACHE_SIZE = 16
+
+
+def _sidecar_path(path: str) -> str:
+    return f"{path}.json"
+
+
+def resolve_weather_path(name: str) -> str:
+    """
+    Absolute path of a weather file inside settings.WEATHER_DIR
+
+    Raises:
+        ValueError: No weather directory configured, unknown suffix, path
+                    outside the directory or missing file
+    """
+    if not settings.WEATHER_DIR:
+        raise ValueError("Weather files are not configured (set WEATHER_DIR)")
+    root = os.path.realpath(settings.WEATHER_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Weather file must be inside the weather directory: {name}")
+    if os.path.splitext(path)[1].lower() not in WEATHER_SUFFIXES:
+        raise ValueError(f"Unsupported weather file type (expected {', '.join(WEATHER_SUFFIXES)}): {name}")
+    if not os.path.isfile(path):
+        raise ValueError(f"Weather file not found: {name}")
+    return path
+
+
+def _is_tmy3(path: str) -> bool:
+    """TMY3 files open with a 7-field station line whose first field is the USAF id."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        fields = f.readline().strip().split(',')
+    return len(fields) == 7 and fields[0].strip().isdigit()
+
+
+def _midpoints(index: pd.DatetimeIndex, shift: float) -> pd.DatetimeIndex:
+    """Move interval labels by shift × the median step (−0.5: end → centre, +0.5: start → centre)."""
+    step = pd.Timedelta(np.median(np.diff(index.asi8)), unit='ns')
+    return index + shift * step
+
+
+def parse_weather_file(path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Read a weather file into COLUMNS (minus unix) on a UTC midpoint index
+
+    Returns:
+        (frame, metadata) — metadata has format, typical, latitude,
+        longitude, altitude, tz_offset (hours) where the file provides them
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.epw':
+        data, meta = iotools.read_epw(path, coerce_year=TYPICAL_YEAR)
+        frame = data[['ghi', 'dni', 'dhi', 'temp_air']].astype(float)
+        frame['pressure'] = data['atmospheric_pressure'].astype(float) / 100.0
+        index = _midpoints(data.index, 0.5)
+        info = {'format': 'epw', 'typical': True, 'tz_offset': float(meta['TZ'])}
+    elif _is_tmy3(path):
+        data, meta = iotools.read_tmy3(path, coerce_year=TYPICAL_YEAR, map_variables=True)
+        frame = data[['ghi', 'dni', 'dhi', 'temp_air', 'pressure']].astype(float)
+        index = _midpoints(data.index, -0.5)
+        info = {'format': 'tmy3', 'typical': True, 'tz_offset': float(meta['TZ'])}
+    else:
+        data = pd.read_csv(path)
+        data.columns = [str(c).strip().lower() for c in data.columns]
+        if 'timestamp' not in data or 'ghi' not in data:
+            raise ValueError("CSV weather files need 'timestamp' and 'ghi' columns")
+        index = pd.DatetimeIndex(pd.to_datetime(data['timestamp'], utc=True))
+        frame = pd.DataFrame(
+            {name: data[name].astype(float) if name in data else np.nan for name in COLUMNS[1:]},
+            index=data.index,
+        )
+        meta = {}
+        info = {'format': 'csv', 'typical': False, 'tz_offset': None}
+
+    frame.index = index.tz_convert('UTC')
+    if info['typical']:
+        # The hour-24 row of TMY3 (and shifted edges) can fall outside the coerced year;
+        # wrap them back by whole years in station standard time
+        offset = pd.Timedelta(hours=info['tz_offset'])
+        wall = frame.index.tz_localize(None) + offset
+        years = wall.year.to_numpy() - TYPICAL_YEAR
+        if np.any(years != 0):
+            wall = pd.DatetimeIndex([
+                ts - pd.DateOffset(years=int(y)) if y else ts for ts, y in zip(wall, years)
+            ])
+            frame.index = (wall - offset).tz_localize('UTC')
+    frame = frame[~frame.index.duplicated()].sort_index()
+    info.update({
+        'latitude': meta.get('latitude'),
+        'longitude': meta.get('longitude'),
+        'altitude': meta.get('altitude'),
+    })
+    return frame, info
+
+
+def _cache_path(path: str) -> str:
+    """Cache table path for this revision of the source file."""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(
+        f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{FORMAT_VERSION}".encode(), digest_size=8
+    ).hexdigest()
+    cache_dir = os.path.join(os.path.dirname(path), '.cache')
+    return os.path.join(cache_dir, f"{os.path.basename(path)}-{digest}.npy")
+
+
+def _write_atomic(target: str, write) -> None:
+    """Write through a unique temp file in target's directory, then rename over target."""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target), prefix=f"{os.path.basename(target)}.", suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove_stale_tables(path: str, table_path: str) -> None:
+    """Delete cache tables (and sidecars) of earlier revisions of the source file."""
+    cache_dir = os.path.dirname(table_path)
+    pattern = re.compile(re.escape(os.path.basename(path)) + r'-[0-9a-f]{16}\.npy(\.json)?')
+    current = {os.path.basename(table_path), os.path.basename(_sidecar_path(table_path))}
+    for name in os.listdir(cache_dir):
+        if name not in current and pattern.fullmatch(name):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+
+def index_weather_file(path: str) -> str:
+    """
+    Parse a weather file and write its cache table (no-op when current)
+
+    Returns:
+        Path of the .npy table
+    """
+    table_path = _cache_path(path)
+    if os.path.exists(table_path) and os.path.exists(_sidecar_path(table_path)):
+        return table_path
+    frame, info = parse_weather_file(path)
+    os.makedirs(os.path.dirname(table_path), exist_ok=True)
+
+    table = np.empty((len(frame), len(COLUMNS)))
+    table[:, 0] = frame.index.asi8 / 1e9
+    for i, name in enumerate(COLUMNS[1:], start=1):
+        table[:, i] = frame[name].to_numpy(dtype=float)
+    meta = dict(info, version=FORMAT_VERSION, columns=list(COLUMNS), rows=len(frame),
+                source=os.path.basename(path))
+    # Unique temp names, so concurrent indexers (threads or workers) never share a
+    # partial file; the sidecar lands first and the table completes the pair
+    _write_atomic(_sidecar_path(table_path), lambda f: f.write(json.dumps(meta, indent=2).encode()))
+    _write_atomic(table_path, lambda f: np.save(f, table))
+    _remove_stale_tables(path, table_path)
+    return table_path
+
+
+class WeatherStore:
+    """Read-only, memory-mapped view of one indexed weather file."""
+
+    def __init__(self, table_path: str):
+        with open(_sidecar_path(table_path), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION or tuple(meta.get('columns', ())) != COLUMNS:
+            raise ValueError(f"Unsupported weather table format: {table_path}")
+        self.path = table_path
+        self.meta = meta
+        self.typical = bool(meta['typical'])
+        self.table = np.load(table_path, mmap_mode='r')
+        self.key = os.path.basename(table_path)
+
+    def _rows(self, start_ns: int, end_ns: int, shift_years: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """(UTC ns, row indices) of rows inside [start_ns, end_ns) after shifting by whole years."""
+        unix_ns = (np.asarray(self.table[:, 0]) * 1e9).astype(np.int64)
+        if shift_years:
+            # Replay on the target calendar in station standard time (wall clock stays put)
+            offset = pd.Timedelta(hours=self.meta.get('tz_offset') or 0)
+            wall = pd.DatetimeIndex(unix_ns) + offset
+            unix_ns = ((wall + pd.DateOffset(years=shift_years)) - offset).asi8
+        rows = np.nonzero((unix_ns >= start_ns) & (unix_ns < end_ns))[0]
+        return unix_ns[rows], rows
+
+    def select(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Weather rows with start <= t < end (tz-aware bounds)
+
+        Typical-year files are replayed on every calendar year the window touches.
+
+        Returns:
+            DataFrame of COLUMNS[1:] on a UTC DatetimeIndex
+        """
+        start_ns, end_ns = start.value, end.value
+        if self.typical:
+            parts = [
+                self._rows(start_ns, end_ns, year - TYPICAL_YEAR)
+                for year in range(start.tz_convert('UTC').year - 1, end.tz_convert('UTC').year + 1)
+            ]
+            times = np.concatenate([p[0] for p in parts])
+            rows = np.concatenate([p[1] for p in parts])
+            # Leap days are absent from the typical year; replayed years never overlap
+            order = np.argsort(times, kind='stable')
+            times, rows = times[order], rows[order]
+        else:
+            times, rows = self._rows(start_ns, end_ns)
+        values = np.asarray(self.table[rows, 1:])
+        return pd.DataFrame(values, index=pd.DatetimeIndex(times, tz='UTC'), columns=list(COLUMNS[1:]))
+
+
+def resample_weather_series(
+    time: Sequence[str],
+    columns: Dict[str, Optional[Sequence[Optional[float]]]],
+    target: pd.DatetimeIndex,
+) -> Dict[str, np.ndarray]:
+    """
+    Linear interpolation of hourly weather columns onto target timestamps
+
+    Naive times are local wall clock in target's timezone (ambiguous and
+    skipped DST hours are dropped). Targets up to one source step outside
+    the series hold the edge value; further out, and for missing columns,
+    the result is NaN.
+
+    Args:
+        time: Source timestamps (ISO 8601)
+        columns: name → values aligned with time (None entries allowed)
+        target: tz-aware DatetimeIndex to resample onto
+
+    Returns:
+        name → float array of len(target) for every non-None column
+    """
+    try:
+        index = pd.DatetimeIndex(pd.to_datetime(list(time)))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid weather time values: {e}")
+    if index.tz is None:
+        index = index.tz_localize(target.tz, ambiguous='NaT', nonexistent='NaT')
+    source_ns = index.asi8
+    valid_time = ~index.isna()
+    order = np.argsort(source_ns, kind='stable')
+    target_ns = target.asi8
+
+    result = {}
+    for name, values in columns.items():
+        if values is None:
+            continue
+        values = np.array([np.nan if v is None else v for v in values], dtype=float)[order]
+        ok = np.isfinite(values) & valid_time[order]
+        x, y = source_ns[order][ok], values[ok]
+        if len(x) == 0:
+            result[name] = np.full(len(target_ns), np.nan)
+            continue
+        step = np.median(np.diff(x)) if len(x) > 1 else 3_600_000_000_000
+        resampled = np.interp(target_ns, x, y)
+        resampled[(target_ns < x[0] - step) | (target_ns > x[-1] + step)] = np.nan
+        result[name] = resampled
+    return result
+
+
+_stores: 'OrderedDict[str, WeatherStore]' = OrderedDict()
+_stores_lock = threading.Lock()
+# One indexing lock per source file: concurrent requests parse it once
+_index_locks: Dict[str, threading.Lock] = {}
+
+
+def get_weather_store(name: str) -> WeatherStore:
+    """
+    Indexed, memory-mapped store for a file in settings.WEATHER_DIR
+
+    The file is (re)indexed when its cache table is missing or stale.
+    """
+    path = resolve_weather_path(name)
+    table_path = _cache_path(path)
+    with _stores_lock:
+        store = _stores.get(table_path)
+        if store is not None:
+            _stores.move_to_end(table_path)
+            return store
+        index_lock = _index_locks.setdefault(path, threading.Lock())
+    with index_lock:
+        with _stores_lock:
+            store = _stores.get(table_path)
+        if store is None:
+            index_weather_file(path)
+            store = WeatherStore(table_path)
+    with _stores_lock:
+        _stores[table_path] = store
+        _stores.move_to_end(table_path)
+        while len(_stores) > WEATHER_CACHE_SIZE:
+            _stores.popitem(last=False)
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Index weather files into memory-mapped tables")
+    sub = parser.add_subparsers(dest='command', required=True)
+    index = sub.add_parser('index', help='Index every weather file in WEATHER_DIR')
+    index.add_argument('--dir', default=None, help='Weather directory (default: settings.WEATHER_DIR)')
+    args = parser.parse_args()
+
+    if args.dir:
+        settings.WEATHER_DIR = args.dir
+    for name in sorted(os.listdir(settings.WEATHER_DIR)):
+        if os.path.splitext(name)[1].lower() in WEATHER_SUFFIXES:
+            table_path = index_weather_file(resolve_weather_path(name))
+            print(f"✅ {name} → {table_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Tests for the streaming monthly clear-sky energy engine."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.annual_energy import calculate_energy_totals
+from app.services.irradiance_calculator import IrradianceCalculator
+
+
+def _trapezoid(values, index):
+    hours = (index.asi8 - index.asi8[0]) / 3.6e12
+    return float(np.sum((values[1:] + values[:-1]) / 2 * np.diff(hours)))
+
+
+def test_monthly_chunks_match_one_pass_trapezoid():
+    result = calculate_energy_totals(37.5665, 126.978, "2025-01-15", "2025-04-10", interval_minutes=10,
+                                     timezone_name="Asia/Seoul", surface_tilt=30)
+    assert [m["month"] for m in result["months"]] == ["2025-01", "2025-02", "2025-03", "2025-04"]
+    assert [m["days"] for m in result["months"]] == [17, 28, 31, 10]
+
+    data = IrradianceCalculator().calculate_clear_sky_irradiance(
+        37.5665, 126.978, "2025-01-15", end_date="2025-04-10", interval_minutes=10, timezone_name="Asia/Seoul"
+    )
+    total = result["total"]
+    for column in ("ghi", "dni", "dhi"):
+        expected = _trapezoid(data[column].to_numpy(), data.index) / 1000
+        assert total[f"{column}_kwh_m2"] == pytest.approx(expected, rel=1e-12)
+        assert sum(m[f"{column}_kwh_m2"] for m in result["months"]) == pytest.approx(expected, rel=1e-12)
+    sunny = (data["dni"] > 120).to_numpy(dtype=float)
+    assert total["sunshine_hours"] == pytest.approx(_trapezoid(sunny, data.index), rel=1e-12)
+    assert total["peak_ghi"] == pytest.approx(data["ghi"].max())
+    assert total["poa_kwh_m2"] > total["ghi_kwh_m2"]  # winter sun on a 30° south plane
+
+
+def test_daily_total_uses_real_timestamps():
+    calc = IrradianceCalculator()
+    # New York 2025-03-09 has 23 hours; samples around noon are missing as well
+    data = calc.calculate_clear_sky_irradiance(40.71, -74.0, "2025-03-09", interval_minutes=60,
+                                               timezone_name="America/New_York")
+    assert len(data) == 23
+    gappy = data.drop(data.index[11:14])
+    totals = calc.calculate_daily_total_irradiance(gappy, interval_minutes=60)
+    assert totals["ghi"] == pytest.approx(_trapezoid(gappy["ghi"].to_numpy(), gappy.index) / 1000, rel=1e-12)
+    full = calc.calculate_daily_total_irradiance(data)["ghi"]
+    assert totals["ghi"] == pytest.approx(full, rel=0.1)
+    # Evenly spaced sample counting would lose the three missing hours
+    assert _trapezoid(gappy["ghi"].to_numpy(), pd.date_range("2025-03-09", periods=20, freq="h")) / 1000 < 0.8 * full
+
+    years = calculate_energy_totals(40.71, -74.0, "2024-12-01", "2025-01-31", interval_minutes=60,
+                                    timezone_name="America/New_York")
+    assert [y["year"] for y in years["years"]] == ["2024", "2025"]
+    assert years["years"][0]["days"] == 31 and years["years"][1]["days"] == 31
+    assert years["total"]["ghi_kwh_m2"] == pytest.approx(sum(y["ghi_kwh_m2"] for y in years["years"]))
+
+
+def test_energy_endpoint(client):
+    response = client.get("/api/v1/irradiance/energy", params={
+        "lat": 37.5665, "lon": 126.978, "start_date": "2025-06-01", "end_date": "2025-07-31",
+        "interval": 30, "timezone": "Asia/Seoul", "surface_tilt": 30, "sky_model": "perez",
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["months"]) == 2
+    assert 150 < body["months"][0]["ghi_kwh_m2"] < 300
+    assert body["months"][0]["peak_poa_time"].startswith("2025-06")
+
+    bad = client.get("/api/v1/irradiance/energy", params={
+        "lat": 37.5665, "lon": 126.978, "start_date": "2025-06-01", "end_date": "2025-05-01",
+    })
+    assert bad.status_code == 400
@@ -0,0 +1,135 @@
+"""Tests for the multi-building occlusion scene."""
+import numpy as np
+import pytest
+
+from app.services.building_scene import BuildingScene, get_scene
+
+
+def _random_scene(seed=1, count=120):
+    rng = np.random.default_rng(seed)
+    buildings = []
+    for i in range(count):
+        cx, cy = rng.uniform(-0.004, 0.004, 2)
+        w, h = rng.uniform(0.00005, 0.0002, 2)
+        angle = rng.uniform(0, np.pi)
+        corners = np.array([[-w, -h], [w, -h], [w, h], [-w, h]])
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        ring = corners @ rotation.T + [127.0 + cx, 37.5 + cy]
+        buildings.append({"id": f"b{i}", "ring": ring.tolist(), "height": float(rng.uniform(5, 80))})
+    return buildings, rng
+
+
+def _brute_force_occluder(scene, x, y, inside, altitude, azimuth, z=0.0):
+    """Nearest blocking edge over every edge in the scene (no index)."""
+    ux, uy = np.sin(np.radians(azimuth)), np.cos(np.radians(azimuth))
+    tan_alt = np.tan(np.radians(altitude))
+    best_t, best_b = np.inf, -1
+    for (x1, y1, x2, y2), b in zip(scene.edges, scene.edge_building):
+        if b == inside:
+            continue
+        ex, ey = x2 - x1, y2 - y1
+        wx, wy = x1 - x, y1 - y
+        den = ux * ey - uy * ex
+        if abs(den) < 1e-12:
+            continue
+        t = (wx * ey - wy * ex) / den
+        s = (wx * uy - wy * ux) / den
+        if 0 <= s <= 1 and 1e-3 < t < best_t and z + t * tan_alt < scene.heights[b]:
+            best_t, best_b = t, b
+    return best_b
+
+
+def test_grid_index_matches_brute_force():
+    buildings, rng = _random_scene()
+    scene = BuildingScene(buildings)
+    lons = 127.0 + rng.uniform(-0.005, 0.005, 60)
+    lats = 37.5 + rng.uniform(-0.005, 0.005, 60)
+    altitude = np.array([-3.0, 5.0, 15.0, 35.0, 60.0])
+    azimuth = np.array([90.0, 100.0, 180.0, 250.0, 0.0])
+
+    result = scene.first_occluders(lons, lats, altitude, azimuth, rays_per_chunk=97)
+    assert result["occluder"].shape == (5, 60)
+    assert not result["shaded"][0].any()
+    assert result["shaded"][1:].any()
+
+    x, y = scene.to_local(lons, lats)
+    for ti in range(1, len(altitude)):
+        for p in range(len(lons)):
+            expected = _brute_force_occluder(scene, x[p], y[p], result["inside"][p], altitude[ti], azimuth[ti])
+            assert result["occluder"][ti, p] == expected
+
+
+def test_elevated_points_and_ray_mask_match_brute_force():
+    buildings, rng = _random_scene(seed=2)
+    scene = BuildingScene(buildings)
+    lons = 127.0 + rng.uniform(-0.005, 0.005, 40)
+    lats = 37.5 + rng.uniform(-0.005, 0.005, 40)
+    z = rng.uniform(0, 90, 40)
+    altitude = np.array([5.0, 20.0, 45.0])
+    azimuth = np.array([120.0, 200.0, 300.0])
+    mask = rng.random((3, 40)) < 0.7
+
+    result = scene.first_occluders(lons, lats, altitude, azimuth, rays_per_chunk=31, elevations=z, mask=mask)
+    assert not result["shaded"][~mask].any()
+    x, y = scene.to_local(lons, lats)
+    for ti, p in zip(*np.nonzero(mask)):
+        expected = _brute_force_occluder(scene, x[p], y[p], result["inside"][p], altitude[ti], azimuth[ti], z[p])
+        assert result["occluder"][ti, p] == expected
+    # Points above every roof are never shaded
+    high = scene.first_occluders(lons, lats, altitude, azimuth, elevations=scene.max_height + 1)
+    assert not high["shaded"].any()
+
+
+def test_single_tower_shades_only_along_the_sun_ray():
+    # 20 m square, 50 m tall, centred at the origin
+    d_lat = 10 / 111195.0
+    d_lon = d_lat / np.cos(np.radians(37.5))
+    ring = [[127 - d_lon, 37.5 - d_lat], [127 + d_lon, 37.5 - d_lat],
+            [127 + d_lon, 37.5 + d_lat], [127 - d_lon, 37.5 + d_lat]]
+    scene = BuildingScene([{"id": "tower", "ring": ring, "height": 50.0}])
+    # Sun due south at 45°: the shadow reaches 50 m beyond the north wall
+    north = [37.5 + 30 / 111195.0, 37.5 + 80 / 111195.0, 37.5 - 30 / 111195.0, 37.5]
+    result = scene.first_occluders([127.0] * 4, north, [45.0], [180.0])
+    assert result["shaded"][0].tolist() == [True, False, False, False]
+    assert result["distance"][0, 0] == pytest.approx(20.0, abs=0.1)
+    # The roof point lies inside the tower, which is ignored
+    assert result["inside"].tolist() == [-1, -1, -1, 0]
+
+
+def test_from_geojson_and_scene_reuse():
+    buildings, _ = _random_scene(count=3)
+    collection = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": b["id"], "properties": {"building:levels": 4},
+             "geometry": {"type": "Polygon", "coordinates": [b["ring"] + [b["ring"][0]]]}}
+            for b in buildings
+        ],
+    }
+    scene = BuildingScene.from_geojson(collection)
+    assert scene.ids == ["b0", "b1", "b2"]
+    assert scene.heights.tolist() == [12.0, 12.0, 12.0]
+    assert get_scene(buildings) is get_scene(buildings)
+    with pytest.raises(ValueError):
+        BuildingScene([{"ring": [[0, 0], [1, 1]], "height": 10}])
+
+
+def test_occlusion_endpoint(client):
+    buildings, rng = _random_scene(count=40)
+    points = np.column_stack((127.0 + rng.uniform(-0.004, 0.004, 25), 37.5 + rng.uniform(-0.004, 0.004, 25)))
+    response = client.post(
+        "/api/v1/shadow/occlusion",
+        json={
+            "location": {"lat": 37.5, "lon": 127.0, "timezone": "Asia/Seoul"},
+            "datetime": {"date": "2025-12-21", "start_time": "08:00", "end_time": "16:00", "interval": 60},
+            "buildings": buildings,
+            "points": points.tolist(),
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["frames"]) == 9
+    assert len(body["points"]) == 25
+    assert body["building_ids"][0] == "b0"
+    assert all(len(frame["occluder"]) == 25 for frame in body["frames"])
+    assert any(o >= 0 for frame in body["frames"] for o in frame["occluder"])
@@ -0,0 +1,34 @@
+"""Precomputed ephemeris table accuracy vs nrel_numpy."""
+import numpy as np
+
+from app.core.config import settings
+from app.services.ephemeris_store import EphemerisStore, build_ephemeris_table
+from app.services.solar_calculator import SolarCalculator
+
+
+def test_ephemeris_table_matches_nrel_numpy(tmp_path, monkeypatch):
+    path = str(tmp_path / "ephemeris.npy")
+    meta = build_ephemeris_table(path, 2025, 1, days=2)
+    assert meta["rows"] == 2 * 1440 + 1
+
+    store = EphemerisStore(path)
+    report = store.verify(samples=200)
+    assert report["max_elevation_error"] < 1e-5
+    assert report["max_azimuth_error"] < 1e-4
+
+    calc = SolarCalculator()
+    reference = calc.calculate_solar_positions(
+        37.5665, 126.9780, "2025-01-01", start_time="09:00", end_time="18:00",
+        interval_minutes=7, timezone_name="UTC",
+    )
+    monkeypatch.setattr(settings, "EPHEMERIS_PATH", path)
+    mapped = calc.calculate_solar_positions(
+        37.5665, 126.9780, "2025-01-01", start_time="09:00", end_time="18:00",
+        interval_minutes=7, timezone_name="UTC",
+    )
+    for col in ("apparent_elevation", "azimuth", "apparent_zenith"):
+        np.testing.assert_allclose(mapped[col], reference[col], atol=1e-5)
+
+    # outside the table span → transparent nrel_numpy fallback
+    outside = calc.calculate_solar_positions(37.5665, 126.9780, "2026-06-21", timezone_name="UTC")
+    assert len(outside) == 24
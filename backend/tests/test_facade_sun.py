@@ -0,0 +1,69 @@
+"""Tests for direct-sun hours on facade points."""
+import numpy as np
+import pytest
+
+from app.services.facade_sun import evaluate_facade_sun
+
+LAT, LON = 37.5, 127.0
+D_LAT = 1 / 111195.0
+D_LON = D_LAT / np.cos(np.radians(LAT))
+
+
+def _box(cx, cy, half_x, half_y, height, name):
+    """Axis-aligned footprint centred (cx, cy) meters from the site."""
+    x0, x1 = LON + (cx - half_x) * D_LON, LON + (cx + half_x) * D_LON
+    y0, y1 = LAT + (cy - half_y) * D_LAT, LAT + (cy + half_y) * D_LAT
+    return {"id": name, "ring": [[x0, y0], [x1, y0], [x1, y1], [x0, y1]], "height": height}
+
+
+def test_unobstructed_facades_follow_the_incidence_angle():
+    points = [
+        {"lon": LON, "lat": LAT, "height": 3, "azimuth": 180},
+        {"lon": LON, "lat": LAT, "height": 3, "azimuth": 0},
+        {"lon": LON, "lat": LAT, "height": 3, "azimuth": 90},
+        {"lon": LON, "lat": LAT, "height": 3, "azimuth": 0, "tilt": 0},
+    ]
+    result = evaluate_facade_sun(LAT, LON, [], points, "2025-03-20", interval_minutes=5, timezone_name="Asia/Seoul")
+    south, north, east, roof = result["possible_hours"]
+    # Equinox: the sun sits south of the east-west line all day
+    assert south == pytest.approx(12, abs=0.3)
+    assert north < 0.3
+    assert east == pytest.approx(6, abs=0.3)
+    assert roof == pytest.approx(12, abs=0.3)
+    np.testing.assert_array_equal(result["sun_hours"], result["possible_hours"])
+    # A single clear day is one continuous stretch
+    np.testing.assert_allclose(result["longest_hours"][[0, 2, 3]], result["sun_hours"][[0, 2, 3]])
+    assert result["longest_start"][2].startswith("2025-03-20T0")
+
+
+def test_tower_in_front_shades_lower_floors_only():
+    # South facade of a building at y=0; 30 m tower 20 m to the south
+    buildings = [_box(0, 10, 10, 10, 20.0, "home"), _box(0, -20, 10, 5, 30.0, "tower")]
+    points = [{"lon": LON, "lat": LAT, "height": h, "azimuth": 180} for h in (1.5, 15.0, 29.0, 31.0)]
+    result = evaluate_facade_sun(LAT, LON, buildings, points, "2025-12-21", interval_minutes=10,
+                                 timezone_name="Asia/Seoul")
+    sun = result["sun_hours"]
+    assert sun[0] <= sun[1] < sun[2] <= sun[3]
+    assert sun[3] == result["possible_hours"][3]
+    # Winter noon sun (~29°) stays below the tower top from the ground floor
+    assert sun[0] < 0.6 * result["possible_hours"][0]
+    # The tower's shadow splits the day: the longest stretch is shorter than the total
+    assert result["longest_hours"][1] < sun[1]
+
+
+def test_facade_endpoint(client):
+    body = {
+        "location": {"lat": LAT, "lon": LON, "timezone": "Asia/Seoul"},
+        "start_date": "2025-12-21",
+        "interval": 15,
+        "buildings": [_box(0, -20, 10, 5, 30.0, "tower")],
+        "points": [{"id": "w1", "lon": LON, "lat": LAT, "height": 2, "azimuth": 180},
+                   {"lon": LON, "lat": LAT, "height": 2, "azimuth": 0}],
+    }
+    response = client.post("/api/v1/shadow/facade-sun", json=body)
+    assert response.status_code == 200
+    points = response.json()["points"]
+    assert [p["id"] for p in points] == ["w1", "1"]
+    assert 0 < points[0]["sun_hours"] < points[0]["possible_hours"]
+    # No winter sun on the north facade
+    assert points[1]["sun_hours"] == 0 and points[1]["longest_start"] is None
@@ -0,0 +1,86 @@
+"""Tests for DEM horizon profiles and horizon-aware positions/irradiance."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services.horizon import DemRaster, compute_horizon_profile, effective_sun_times, get_horizon_profile
+from app.services.irradiance_calculator import IrradianceCalculator
+from app.services.solar_calculator import SolarCalculator
+
+LAT, LON = 46.0, 7.0
+STEP = 0.001  # degrees (~111 m north-south)
+
+
+@pytest.fixture
+def ridge_dem(tmp_path, monkeypatch):
+    """Flat 500 m plain with a 1000 m-high north-south ridge 2 km east of the site."""
+    size = 401
+    west, north = LON - size * STEP / 2, LAT + size * STEP / 2
+    dem = np.full((size, size), 500.0, dtype=np.float32)
+    lons = west + (np.arange(size) + 0.5) * STEP
+    east_m = (lons - LON) * np.radians(1) * 6371000 * np.cos(np.radians(LAT))
+    dem[:, (east_m > 1950) & (east_m < 2500)] = 1500.0
+    path = tmp_path / "dem.npy"
+    np.save(path, dem)
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump({"transform": [west, STEP, 0, north, 0, -STEP], "nodata": -9999}, f)
+    monkeypatch.setattr(settings, "DEM_PATH", str(path))
+    return str(path)
+
+
+def test_profile_sees_ridge_to_the_east(ridge_dem):
+    profile = get_horizon_profile(LAT, LON)
+    assert profile.shape == (360,)
+    # 998 m above the eye at ~2 km → ~26.5°
+    assert profile[90] == pytest.approx(np.degrees(np.arctan2(998, 1950)), abs=1.5)
+    assert abs(profile[270]) < 0.5
+    assert get_horizon_profile(LAT, LON) is profile
+    with pytest.raises(ValueError):
+        compute_horizon_profile(DemRaster(ridge_dem), 10.0, 10.0)
+
+
+def test_horizon_masks_positions_and_dni(ridge_dem):
+    solar = SolarCalculator()
+    positions = solar.calculate_solar_positions(LAT, LON, "2025-06-21", interval_minutes=5,
+                                                timezone_name="Europe/Zurich", horizon=True)
+    assert {"horizon_elevation", "sun_visible"} <= set(positions.columns)
+    day = effective_sun_times(positions)[0]
+    astronomical = solar.calculate_sunrise_sunset(LAT, LON, "2025-06-21", timezone_name="Europe/Zurich")
+    # The ridge delays sunrise by well over an hour; sunset (west) is unchanged
+    sunrise_delay = pd.Timestamp(day["effective_sunrise"]) - pd.Timestamp(astronomical["sunrise"])
+    sunset_shift = pd.Timestamp(day["effective_sunset"]) - pd.Timestamp(astronomical["sunset"])
+    assert sunrise_delay > pd.Timedelta(hours=1)
+    assert abs(sunset_shift) < pd.Timedelta(minutes=5)
+
+    irradiance = IrradianceCalculator().calculate_clear_sky_irradiance(
+        LAT, LON, "2025-06-21", interval_minutes=5, timezone_name="Europe/Zurich", horizon=True
+    )
+    blocked = ~irradiance["sun_visible"] & (irradiance["apparent_elevation"] > 0)
+    assert blocked.sum() > 12
+    assert (irradiance.loc[blocked, "dni"] == 0).all()
+    np.testing.assert_allclose(irradiance.loc[blocked, "ghi"], irradiance.loc[blocked, "dhi"])
+    assert (irradiance.loc[irradiance["sun_visible"], "dni"] > 0).any()
+
+
+def test_horizon_requires_dem(monkeypatch, client):
+    monkeypatch.setattr(settings, "DEM_PATH", "")
+    with pytest.raises(ValueError):
+        get_horizon_profile(LAT, LON)
+    response = client.get("/api/v1/solar/horizon", params={"lat": LAT, "lon": LON, "date": "2025-06-21"})
+    assert response.status_code == 400
+
+
+def test_horizon_endpoint(ridge_dem, client):
+    response = client.get(
+        "/api/v1/solar/horizon",
+        params={"lat": LAT, "lon": LON, "date": "2025-06-21", "end_date": "2025-06-22",
+                "timezone": "Europe/Zurich", "interval": 5},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["profile"]) == 360
+    assert [d["date"] for d in body["days"]] == ["2025-06-21", "2025-06-22"]
+    assert 10 < body["days"][0]["visible_hours"] < 16
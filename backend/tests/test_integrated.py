@@ -1,4 +1,5 @@
 """통합 API 스모크 테스트 (실제 계산 수행)."""
+import pytest
 
 MINIMAL_BODY = {
     "location": {"lat": 37.5665, "lon": 126.9780, "altitude": 0},
@@ -32,3 +33,79 @@ def test_rate_limit_headers_on_success(client):
     r = client.post("/api/v1/integrated/calculate", json=MINIMAL_BODY)
     assert r.status_code == 200
     assert "x-request-id" in {k.lower() for k in r.headers.keys()}
+
+
+def test_columnar_pipeline_matches_scalar_services():
+    """열 단위 파이프라인이 기존 포인트별 스칼라 계산과 같은 값을 내는지 확인."""
+    import pytest
+
+    from app.models.schemas import SolarCalculationRequest
+    from app.services.integrated_calculation_service import run_integrated_calculation
+    from app.services.irradiance_calculator import IrradianceCalculator
+    from app.services.shadow_calculator import ShadowCalculator
+
+    body = {
+        "location": {"lat": 37.5665, "lon": 126.9780, "timezone": "Asia/Seoul"},
+        "datetime": {"date": "2025-06-21", "interval": 30},
+        "object": {"height": 10, "tilt": 30, "azimuth": 180},
+        "options": {"atmosphere": True, "precision": "high", "sky_model": "isotropic"},
+    }
+    response = run_integrated_calculation(SolarCalculationRequest(**body))
+    shadow = ShadowCalculator()
+    irradiance = IrradianceCalculator()
+
+    for point in response.series:
+        scalar = shadow.calculate_shadow(10, point.sun.altitude, point.sun.azimuth)
+        if scalar["status"] == "normal":
+            assert point.shadow.length == pytest.approx(scalar["length"], rel=1e-12)
+            assert point.shadow.direction == pytest.approx(scalar["direction"], rel=1e-12)
+            polygon = shadow.calculate_shadow_polygon(
+                37.5665, 126.9780, 10, 4.0, scalar["length"], scalar["direction"]
+            )
+            for vertex, expected in zip(point.shadow.polygon, polygon):
+                assert vertex == pytest.approx(expected, rel=1e-12)
+        else:
+            assert point.shadow.length is None
+            assert point.shadow.polygon is None
+
+        poa = irradiance.calculate_poa_irradiance(
+            ghi=point.irradiance.ghi,
+            dni=point.irradiance.dni,
+            dhi=point.irradiance.dhi,
+            solar_zenith=point.sun.zenith,
+            solar_azimuth=point.sun.azimuth,
+            surface_tilt=30,
+            surface_azimuth=180,
+        )
+        assert point.irradiance.poa == pytest.approx(poa["poa_global"], rel=1e-12, abs=1e-9)
+        assert point.irradiance.par == pytest.approx(point.irradiance.ghi * 0.45)
+
+
+def test_integrated_terrain_changes_shadow_length(client):
+    flat = client.post("/api/v1/integrated/calculate", json=MINIMAL_BODY).json()
+    sloped_body = dict(MINIMAL_BODY, terrain={"slope": 15, "aspect": 180})
+    sloped = client.post("/api/v1/integrated/calculate", json=sloped_body).json()
+    # Noon shadow points north, i.e. uphill on a south-facing slope
+    assert sloped["series"][0]["shadow"]["length"] < flat["series"][0]["shadow"]["length"]
+
+
+def test_integrated_footprint_shadow(client):
+    ring = [[126.9779, 37.5664], [126.9781, 37.5664], [126.9781, 37.5666], [126.9779, 37.5666]]
+    body = dict(MINIMAL_BODY, object={"height": 10, "footprint": ring})
+    response = client.post("/api/v1/integrated/calculate", json=body)
+    assert response.status_code == 200
+    polygon = response.json()["series"][0]["shadow"]["polygon"]
+    assert len(polygon) == 6
+    # Noon shadow points north: the projected roof lies beyond the footprint's north edge
+    assert max(lat for _, lat in polygon) > 37.5666
+
+    body["object"]["footprint"] = [[126.9779, 37.5664], [126.9780, 37.5665], [126.9781, 37.5666]]
+    assert client.post("/api/v1/integrated/calculate", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("sky_model", ["perez", "haydavies", "reindl"])
+def test_integrated_circumsolar_sky_models_give_poa(client, sky_model):
+    body = dict(MINIMAL_BODY, object={"height": 10, "tilt": 30, "azimuth": 180},
+                options={"atmosphere": True, "precision": "high", "sky_model": sky_model})
+    point = client.post("/api/v1/integrated/calculate", json=body).json()["series"][0]
+    assert point["irradiance"]["poa"] > point["irradiance"]["dhi"]
@@ -0,0 +1,131 @@
+"""IrradianceCalculator 청천 일사 단계 테스트."""
+import numpy as np
+import pytest
+from pvlib import location, solarposition
+
+from app.core.memory_cache import solar_position_cache
+from app.services.irradiance_calculator import IrradianceCalculator
+
+
+@pytest.mark.parametrize("model", ["ineichen", "haurwitz", "simplified_solis"])
+def test_clear_sky_runs_spa_once_and_matches_get_clearsky(monkeypatch, model):
+    solar_position_cache.clear()
+    calls = []
+    original = solarposition.get_solarposition
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs.get("method"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(solarposition, "get_solarposition", counting)
+    result = IrradianceCalculator().calculate_clear_sky_irradiance(
+        37.5665, 126.978, "2025-06-21", interval_minutes=10, altitude=300,
+        model=model, timezone_name="Asia/Seoul",
+    )
+    assert calls == ["nrel_numpy"]
+    monkeypatch.setattr(solarposition, "get_solarposition", original)
+
+    reference = location.Location(37.5665, 126.978, altitude=300).get_clearsky(result.index, model=model)
+    for column in reference.columns:
+        # Only refraction inputs differ (request pressure/temperature vs site defaults)
+        np.testing.assert_allclose(result[column], reference[column], atol=1.0)
+    assert {"dni_extra", "airmass_absolute"} <= set(result.columns)
+
+
+def test_unknown_clear_sky_model_rejected():
+    with pytest.raises(ValueError):
+        IrradianceCalculator().calculate_clear_sky_irradiance(37.5, 127.0, "2025-06-21", model="bird")
+
+
+def test_linke_turbidity_grid_matches_pvlib_without_file_io(monkeypatch):
+    import h5py
+    import pandas as pd
+    from pvlib import clearsky
+
+    from app.services.linke_turbidity import get_linke_turbidity_grid
+
+    grid = get_linke_turbidity_grid()
+    times = pd.date_range("2024-01-01", "2025-12-31 23:00", freq="7h", tz="Asia/Seoul")
+    sites = [(37.5665, 126.978), (-33.86, 151.21), (89.99, -179.99), (-90.0, 180.0), (0.0, 0.0)]
+    expected = {site: clearsky.lookup_linke_turbidity(times, *site) for site in sites}
+    expected_monthly = {
+        site: clearsky.lookup_linke_turbidity(times, *site, interp_turbidity=False) for site in sites
+    }
+
+    def no_h5(*args, **kwargs):
+        raise AssertionError("HDF5 opened during a lookup")
+
+    monkeypatch.setattr(h5py, "File", no_h5)
+    for site in sites:
+        np.testing.assert_allclose(grid.lookup(times, *site), expected[site], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(
+            grid.lookup(times, *site, interp_turbidity=False), expected_monthly[site], rtol=0, atol=1e-12
+        )
+    assert grid.cache_info().hits > 0
+    result = IrradianceCalculator().calculate_clear_sky_irradiance(
+        -33.86, 151.21, "2025-01-10", interval_minutes=30, timezone_name="Australia/Sydney"
+    )
+    assert result["ghi"].max() > 900
+
+
+def test_linke_turbidity_table_is_built_only_by_the_cli(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.services import linke_turbidity
+
+    target = tmp_path / "linke_turbidity.npy"
+    monkeypatch.setattr(settings, "LINKE_TURBIDITY_PATH", str(target))
+    grid = linke_turbidity.get_linke_turbidity_grid()
+    # Missing table: in-memory fallback, nothing written by the server
+    assert grid.source == linke_turbidity.PVLIB_H5_PATH
+    assert list(tmp_path.iterdir()) == []
+
+    linke_turbidity.build_turbidity_table(str(target))
+    assert list(tmp_path.iterdir()) == [target]
+    # A configured table is mapped read-only at startup
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    monkeypatch.setattr(linke_turbidity, "_grid", None)
+    with TestClient(app):
+        mapped = linke_turbidity._grid
+    assert mapped is not None and mapped.source == str(target)
+    assert isinstance(mapped.table, np.memmap) and not mapped.table.flags.writeable
+    np.testing.assert_array_equal(mapped.table[::97, ::89], grid.table[::97, ::89])
+
+
+@pytest.mark.parametrize("sky_model", ["isotropic", "klucher", "haydavies", "reindl", "perez"])
+def test_poa_series_matches_pvlib_per_row(sky_model):
+    from pvlib import atmosphere, irradiance
+
+    calc = IrradianceCalculator()
+    data = calc.calculate_clear_sky_irradiance(37.5665, 126.978, "2025-06-21", interval_minutes=1,
+                                               timezone_name="Asia/Seoul")
+    day = data[data["ghi"] > 0]
+    series = calc.format_irradiance_series(day, surface_tilt=30, surface_azimuth=180, sky_model=sky_model)
+    assert len(series) == len(day)
+
+    dni_extra = irradiance.get_extra_radiation(day.index)
+    airmass = atmosphere.get_relative_airmass(day["apparent_zenith"])
+    for i in range(0, len(day), 37):
+        row = day.iloc[i]
+        expected = irradiance.get_total_irradiance(
+            30, 180, row["apparent_zenith"], row["azimuth"], row["dni"], row["ghi"], row["dhi"],
+            dni_extra=dni_extra.iloc[i], airmass=airmass.iloc[i], albedo=0.2, model=sky_model,
+        )
+        assert series[i]["poa"]["poa_global"] == pytest.approx(float(expected["poa_global"]), rel=1e-9)
+        assert series[i]["poa"]["sky_model"] == sky_model
+
+
+def test_poa_series_needs_extraterrestrial_dni_for_circumsolar_models():
+    calc = IrradianceCalculator()
+    args = dict(ghi=[800.0], dni=[700.0], dhi=[100.0], solar_zenith=[30.0], solar_azimuth=[180.0],
+                surface_tilt=30, surface_azimuth=180)
+    with pytest.raises(ValueError):
+        calc.calculate_poa_series(sky_model="perez", **args)
+    with pytest.raises(ValueError):
+        calc.calculate_poa_series(sky_model="king", dni_extra=[1360.0], **args)
+    scalar = calc.calculate_poa_irradiance(
+        800.0, 700.0, 100.0, 30.0, 180.0, 30, 180, sky_model="perez", dni_extra=1360.0
+    )
+    assert scalar["poa_global"] > 800 and scalar["aoi"] == pytest.approx(0.0, abs=1e-6)
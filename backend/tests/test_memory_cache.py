@@ -0,0 +1,50 @@
+"""프로세스 내 바이트 한도 LRU 캐시 테스트."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.memory_cache import ArrayLRUCache, ENTRY_OVERHEAD_BYTES, solar_position_cache
+from app.services.solar_calculator import SolarCalculator
+
+
+def test_lru_evicts_by_bytes_not_entries():
+    entry = np.zeros(1000)  # 8000 bytes
+    cache = ArrayLRUCache(max_bytes=3 * (entry.nbytes + ENTRY_OVERHEAD_BYTES))
+    for key in "abc":
+        assert cache.set(key, (entry.copy(), ("col",), {}))
+    assert cache.get("a") is not None  # a becomes most recent
+    cache.set("d", (entry.copy(), ("col",), {}))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    # A single value over budget is refused rather than flushing everything
+    assert not cache.set("huge", np.zeros(10000))
+    assert cache.get_stats()["entries"] == 3
+
+
+def test_solar_positions_shared_across_instances_and_threads():
+    solar_position_cache.clear()
+    kwargs = dict(latitude=35.1, longitude=129.0, date="2025-03-01", interval_minutes=5,
+                  timezone_name="Asia/Seoul")
+    before = solar_position_cache.get_stats()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(
+            lambda _: SolarCalculator().calculate_solar_positions(**kwargs), range(16)
+        ))
+
+    stats = solar_position_cache.get_stats()
+    assert stats["hits"] + stats["misses"] - before["hits"] - before["misses"] == 16
+    assert stats["hits"] > before["hits"]
+    for frame in frames[1:]:
+        assert frame.equals(frames[0])
+        assert frame.attrs["used_timezone"] == "Asia/Seoul"
+
+    # Callers get their own copy; mutating it must not leak into the cache
+    frames[0]["azimuth"] = 0.0
+    again = SolarCalculator().calculate_solar_positions(**kwargs)
+    assert again["azimuth"].equals(frames[1]["azimuth"])
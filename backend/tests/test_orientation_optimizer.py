@@ -0,0 +1,63 @@
+"""Tests for the tilt × azimuth orientation sweep."""
+import numpy as np
+import pytest
+
+from app.services.irradiance_calculator import IrradianceCalculator
+from app.services.optimizer import OptimizationService
+
+
+@pytest.fixture(scope="module")
+def spring_data():
+    return IrradianceCalculator().calculate_clear_sky_irradiance(
+        37.5665, 126.978, "2025-03-01", end_date="2025-04-30", interval_minutes=60, timezone_name="Asia/Seoul"
+    )
+
+
+def _energy(data, tilt, azimuth, sky_model):
+    poa = IrradianceCalculator().calculate_poa_series(
+        data["ghi"], data["dni"], data["dhi"], data["apparent_zenith"], data["azimuth"], tilt, azimuth,
+        sky_model=sky_model, dni_extra=data["dni_extra"], airmass=data["airmass_relative"],
+    )["poa_global"]
+    poa = np.where(data["apparent_zenith"] < 90, np.nan_to_num(poa), 0.0)
+    hours = (data.index.asi8 - data.index.asi8[0]) / 3.6e12
+    return float(np.sum((poa[1:] + poa[:-1]) / 2 * np.diff(hours))) / 1000
+
+
+@pytest.mark.parametrize("sky_model", ["isotropic", "perez"])
+def test_optimum_matches_per_orientation_energy(spring_data, sky_model):
+    result = OptimizationService().optimize_orientation(spring_data, sky_model=sky_model)
+    best = result["optimum"]
+    assert 15 < best["tilt"] < 45 and 170 <= best["azimuth"] <= 190
+    assert best["energy_kwh_m2"] == pytest.approx(_energy(spring_data, best["tilt"], best["azimuth"], sky_model),
+                                                  rel=1e-9)
+    # No 1° neighbour does better
+    for d_tilt, d_azimuth in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        neighbour = _energy(spring_data, best["tilt"] + d_tilt, best["azimuth"] + d_azimuth, sky_model)
+        assert neighbour <= best["energy_kwh_m2"] + 1e-9
+
+    surface = np.array(result["surface"]["energy_kwh_m2"])
+    assert surface.shape == (19, 72)
+    assert result["surface"]["azimuths"][-1] == 355
+    assert surface.max() <= best["energy_kwh_m2"]
+    assert result["horizontal_kwh_m2"] == pytest.approx(surface[0].mean(), rel=1e-9)
+    assert result["gain_percent"] > 0
+
+
+def test_bounded_ranges_and_bad_steps(spring_data):
+    service = OptimizationService()
+    result = service.optimize_orientation(spring_data, azimuth_range=(90, 150), tilt_range=(10, 20))
+    assert result["optimum"]["azimuth"] == 150 and result["optimum"]["tilt"] <= 20
+    with pytest.raises(ValueError):
+        service.optimize_orientation(spring_data, coarse_step=1, fine_step=5)
+
+
+def test_orientation_endpoint(client):
+    body = {"location": {"lat": -33.87, "lon": 151.21, "timezone": "Australia/Sydney"},
+            "start_date": "2025-01-01", "end_date": "2025-03-31", "interval": 60, "coarse_step": 10}
+    response = client.post("/api/v1/integrated/optimize-orientation", json=body)
+    assert response.status_code == 200
+    best = response.json()["optimum"]
+    # Southern hemisphere: panels face north
+    assert best["azimuth"] <= 20 or best["azimuth"] >= 340
+    body["sky_model"] = "bird"
+    assert client.post("/api/v1/integrated/optimize-orientation", json=body).status_code == 400
@@ -0,0 +1,60 @@
+"""Tests for fixed-tilt inter-row shading."""
+import numpy as np
+import pytest
+from pvlib import irradiance, shading
+
+from app.services.row_shading import evaluate_row_shading, inter_row_shaded_fraction
+
+
+@pytest.mark.parametrize("tilt, surface_azimuth, slope", [(30, 180, 0), (20, 200, 5), (35, 160, -8)])
+def test_shaded_fraction_matches_pvlib(tilt, surface_azimuth, slope):
+    rng = np.random.default_rng(8)
+    zenith = rng.uniform(0, 89.5, 5000)
+    azimuth = rng.uniform(0, 360, 5000)
+    pitches = np.array([[2.5], [4.0], [6.0]])
+    fraction = inter_row_shaded_fraction(zenith, azimuth, tilt, surface_azimuth, pitches, 2.2, slope)
+    assert fraction.shape == (3, 5000)
+
+    front = irradiance.aoi(tilt, surface_azimuth, zenith, azimuth) < 90
+    for k, pitch in enumerate(pitches[:, 0]):
+        expected = shading.shaded_fraction1d(
+            zenith, azimuth, (surface_azimuth - 90) % 360, tilt,
+            collector_width=2.2, pitch=pitch, cross_axis_slope=slope,
+        )
+        np.testing.assert_allclose(fraction[k, front], expected[front], atol=1e-12)
+        assert not fraction[k, ~front].any()
+    # Wider spacing never shades more
+    assert np.all(np.diff(fraction, axis=0) <= 0)
+
+
+def test_annual_pitch_sweep_loses_less_with_wider_rows():
+    result = evaluate_row_shading(
+        37.5665, 126.978, "2025-01-01", surface_tilt=25, surface_azimuth=180, module_length=2.2,
+        pitches=[3.0, 4.5, 8.0], end_date="2025-12-31", interval_minutes=30, timezone_name="Asia/Seoul",
+    )
+    assert result["shaded_fraction"].shape == (3, 365 * 48)
+    losses = [p["beam_loss_kwh_m2"] for p in result["pitches"]]
+    assert losses[0] > losses[1] > losses[2] > 0
+    first = result["pitches"][0]
+    assert first["gcr"] == pytest.approx(2.2 / 3.0)
+    assert first["shaded_poa_kwh_m2"] == pytest.approx(first["poa_kwh_m2"] - first["beam_loss_kwh_m2"])
+    # Winter mornings and evenings are where rows shade each other
+    winter = result["times"].month == 12
+    assert result["shaded_fraction"][0, winter].mean() > result["shaded_fraction"][0, ~winter].mean()
+
+
+def test_row_shading_endpoint(client):
+    params = {"lat": 37.5665, "lon": 126.978, "date": "2025-12-21", "surface_tilt": 30,
+              "module_length": 2.0, "pitch": 4.0, "interval": 15, "timezone": "Asia/Seoul",
+              "include_series": True}
+    response = client.get("/api/v1/irradiance/row-shading", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["series"]) == 96
+    assert any(0 < point["shaded_fraction"] < 1 for point in body["series"])
+    assert body["pitches"][0]["loss_percent"] > 0
+
+    params["pitch"] = [4.0, 5.0]
+    assert client.get("/api/v1/irradiance/row-shading", params=params).status_code == 400
+    params["include_series"] = False
+    assert len(client.get("/api/v1/irradiance/row-shading", params=params).json()["pitches"]) == 2
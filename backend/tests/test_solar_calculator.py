@@ -0,0 +1,190 @@
+"""SolarCalculator 확장 모드 단위 테스트."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.solar_calculator import SolarCalculator
+
+
+def test_date_range_matches_single_day_calls():
+    calc = SolarCalculator()
+    ranged = calc.calculate_solar_positions(
+        37.5665, 126.9780, "2025-06-20", end_date="2025-06-22",
+        interval_minutes=30, timezone_name="Asia/Seoul",
+    )
+    days = dict(calc.iter_days(ranged))
+    assert list(days) == ["2025-06-20", "2025-06-21", "2025-06-22"]
+
+    single = calc.calculate_solar_positions(
+        37.5665, 126.9780, "2025-06-21", interval_minutes=30, timezone_name="Asia/Seoul",
+    )
+    assert days["2025-06-21"].index.equals(single.index)
+    np.testing.assert_allclose(days["2025-06-21"].to_numpy(), single.to_numpy())
+    # day slices are views over the range result
+    assert np.shares_memory(days["2025-06-21"]["azimuth"].to_numpy(), ranged["azimuth"].to_numpy())
+
+
+def test_date_range_handles_dst_gap_and_overlap():
+    calc = SolarCalculator()
+    spring = calc.calculate_solar_positions(
+        52.52, 13.405, "2025-03-30", interval_minutes=30, timezone_name="Europe/Berlin",
+    )
+    assert spring.attrs["used_timezone"] == "Europe/Berlin"
+    assert spring.index.is_unique and spring.index.is_monotonic_increasing
+    assert len(spring) == 46  # 02:00–02:59 does not exist
+
+    autumn = calc.calculate_solar_positions(
+        52.52, 13.405, "2025-10-26", interval_minutes=30, timezone_name="Europe/Berlin",
+    )
+    assert len(autumn) == 48
+    assert autumn.index.is_monotonic_increasing
+
+
+def test_multi_location_matches_per_site_spa():
+    calc = SolarCalculator()
+    times = pd.date_range("2025-06-21", periods=48, freq="30min", tz="UTC")
+    lats = np.array([37.5665, -33.87, 69.65, 0.0])
+    lons = np.array([126.978, 151.21, 18.96, -78.5])
+    alts = np.array([38.0, 10.0, 0.0, 2850.0])
+
+    result = calc.calculate_solar_positions_multi(lats, lons, times, alts, chunk_size=3)
+    assert result["elevation"].shape == (4, 48)
+
+    for i in range(len(lats)):
+        single = calc.calculate_solar_positions(
+            lats[i], lons[i], times=times, altitude=alts[i]
+        )
+        np.testing.assert_allclose(result["elevation"][i], single["apparent_elevation"], atol=1e-9)
+        np.testing.assert_allclose(result["zenith"][i], single["apparent_zenith"], atol=1e-9)
+        np.testing.assert_allclose(result["azimuth"][i], single["azimuth"], atol=1e-9)
+
+
+def test_precision_tiers_stay_within_documented_error():
+    from app.core.constants import PRECISION_TIERS
+
+    calc = SolarCalculator()
+    kwargs = dict(date="2025-06-21", interval_minutes=1, timezone_name="UTC")
+    for lat, lon in [(37.5665, 126.978), (-45.0, 170.0), (69.65, 18.96)]:
+        reference = calc.calculate_solar_positions(lat, lon, precision="high", **kwargs)
+        visible = reference["elevation"].to_numpy() > -1
+        for precision in ("medium", "low"):
+            tier = calc.calculate_solar_positions(lat, lon, precision=precision, **kwargs)
+            assert tier.attrs["precision"] == precision
+            assert tier.index.equals(reference.index)
+            bound = PRECISION_TIERS[precision]["max_error_deg"]
+            el_err = np.abs(tier["apparent_elevation"] - reference["apparent_elevation"]).to_numpy()
+            assert el_err[visible].max() <= bound
+
+
+def test_pressure_is_mbar_and_refraction_matches_pvlib():
+    from pvlib import solarposition
+
+    from app.core.config import settings
+
+    times = pd.date_range("2025-06-21 04:00", "2025-06-21 20:00", freq="10min", tz="Asia/Seoul")
+    positions = SolarCalculator().calculate_solar_positions(37.5665, 126.978, times=times)
+    # settings.DEFAULT_PRESSURE is mbar; pvlib takes Pa
+    expected = solarposition.get_solarposition(
+        times, 37.5665, 126.978, pressure=settings.DEFAULT_PRESSURE * 100,
+        temperature=settings.DEFAULT_TEMPERATURE, method="nrel_numpy",
+    )
+    np.testing.assert_allclose(positions["apparent_elevation"], expected["apparent_elevation"], atol=1e-9)
+    # Full standard-atmosphere refraction at the horizon (~0.5°), not ~1% of it
+    refraction = (positions["apparent_elevation"] - positions["elevation"]).to_numpy()
+    near_horizon = np.abs(positions["elevation"].to_numpy()) < 1
+    assert near_horizon.any() and (refraction[near_horizon] > 0.3).all()
+
+
+def test_spline_nodes_report_deviation_and_handle_azimuth_wrap():
+    calc = SolarCalculator()
+    # Tromsø midsummer: sun stays up and azimuth wraps through north at midnight
+    kwargs = dict(date="2025-06-21", interval_minutes=1, timezone_name="UTC")
+    reference = calc.calculate_solar_positions(69.65, 18.96, **kwargs)
+    spline = calc.calculate_solar_positions(69.65, 18.96, node_minutes=15, **kwargs)
+
+    assert spline.index.equals(reference.index)
+    assert spline.attrs["node_minutes"] == 15
+    assert 0 < spline.attrs["max_deviation_deg"] < 1e-4
+    el_err = np.abs(spline["apparent_elevation"] - reference["apparent_elevation"]).to_numpy()
+    az_err = np.abs(spline["azimuth"] - reference["azimuth"]).to_numpy() % 360
+    assert el_err.max() < 1e-4
+    assert np.minimum(az_err, 360 - az_err).max() < 1e-3
+
+
+def test_api_and_service_share_default_precision():
+    from app.models.schemas import CalculationOptions
+    from app.core.constants import DEFAULT_PRECISION
+
+    assert CalculationOptions().precision == DEFAULT_PRECISION
+    positions = SolarCalculator().calculate_solar_positions(37.5665, 126.978, "2025-06-21", timezone_name="UTC")
+    assert positions.attrs["precision"] == DEFAULT_PRECISION
+
+
+def test_schemas_do_not_import_services():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app.models.schemas; "
+        "print(sorted(m for m in ('pvlib', 'scipy', 'app.services.solar_calculator') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_unknown_precision_rejected(client):
+    body = {
+        "location": {"lat": 37.5665, "lon": 126.9780},
+        "datetime": {"date": "2025-06-21"},
+        "options": {"precision": "ultra"},
+    }
+    r = client.post("/api/v1/integrated/calculate", json=body)
+    assert r.status_code == 422
+
+
+def test_sun_times_range_matches_single_days_and_memoizes():
+    calc = SolarCalculator()
+    table = calc.calculate_sun_times_range(
+        69.65, 18.96, "2024-12-30", "2025-07-01", timezone_name="Europe/Oslo"
+    )
+    assert len(table) == 184
+    # Spans two memoized years; the second query is a cache hit
+    info = SolarCalculator._sun_times_year.cache_info()
+    calc.calculate_sun_times_range(69.65, 18.96, "2025-01-01", "2025-01-31", timezone_name="Europe/Oslo")
+    assert SolarCalculator._sun_times_year.cache_info().hits == info.hits + 1
+
+    assert table.loc["2025-01-01", "polar"] == "polar_night"
+    assert table.loc["2025-01-01", "day_length"] == 0.0
+    assert table.loc["2025-06-21", "polar"] == "polar_day"
+    assert table.loc["2025-06-21", "day_length"] == 24.0
+    assert table.loc["2025-03-20", "polar"] is None
+
+    single = calc.calculate_sunrise_sunset(69.65, 18.96, "2025-03-20", timezone_name="Europe/Oslo")
+    assert single["sunrise"] == table.loc["2025-03-20", "sunrise"].isoformat()
+    assert single["day_length"] == pytest.approx(table.loc["2025-03-20", "day_length"])
+
+
+def test_sunrise_falls_on_requested_local_date_east_of_utc():
+    calc = SolarCalculator()
+    result = calc.calculate_sunrise_sunset(37.5665, 126.978, "2025-06-21", timezone_name="Asia/Seoul")
+    assert result["sunrise"].startswith("2025-06-21T05:")
+    assert result["solar_noon"].startswith("2025-06-21T12:")
+
+
+def test_sunrise_sunset_range_endpoint(client):
+    response = client.get(
+        "/api/solar/sunrise-sunset/range",
+        params={"lat": 37.5665, "lon": 126.978, "start_date": "2025-06-20",
+                "end_date": "2025-06-22", "timezone": "Asia/Seoul"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["timezone"] == "Asia/Seoul"
+    assert [day["date"] for day in body["days"]] == ["2025-06-20", "2025-06-21", "2025-06-22"]
+    assert all(day["polar"] is None and day["sunrise"] for day in body["days"])
+
+    too_long = client.get(
+        "/api/solar/sunrise-sunset/range",
+        params={"lat": 0, "lon": 0, "start_date": "2000-01-01", "end_date": "2030-01-01"},
+    )
+    assert too_long.status_code == 400
@@ -0,0 +1,79 @@
+"""Tests for the sunlight-hours raster."""
+import numpy as np
+import pytest
+
+from app.services import sunlight_raster
+from app.services.sunlight_raster import calculate_sunlight_hours, raster_grid
+
+
+def _tower(lat=37.5, lon=127.0, half_m=10.0, height=40.0):
+    d_lat = half_m / 111195.0
+    d_lon = d_lat / np.cos(np.radians(lat))
+    ring = [[lon - d_lon, lat - d_lat], [lon + d_lon, lat - d_lat],
+            [lon + d_lon, lat + d_lat], [lon - d_lon, lat + d_lat]]
+    return {"id": "tower", "ring": ring, "height": height}
+
+
+def test_grid_is_north_up_and_centred():
+    grid = raster_grid(37.5, 127.0, width_m=100, height_m=60, resolution_m=10)
+    assert (grid["rows"], grid["cols"]) == (6, 10)
+    assert grid["lats"][0] > grid["lats"][-1]
+    assert np.mean(grid["lons"]) == pytest.approx(127.0)
+    assert np.mean(grid["lats"]) == pytest.approx(37.5)
+    with pytest.raises(ValueError):
+        raster_grid(37.5, 127.0, width_m=10000, height_m=10000, resolution_m=1)
+
+
+def test_open_site_gets_every_daytime_step():
+    raster = calculate_sunlight_hours(37.5, 127.0, [], "2025-06-21", width_m=40, height_m=40,
+                                      resolution_m=10, timezone_name="Asia/Seoul")
+    assert raster["counts"].dtype == np.uint16
+    assert np.all(raster["counts"] == raster["stats"]["daytime_steps"])
+    # ~14.5 h of daylight at the June solstice in Seoul
+    assert 14 < raster["stats"]["possible_hours"] < 15
+    assert raster["stats"]["shaded_fraction"] == 0
+
+
+def test_tower_shades_north_side_and_pool_matches_serial(monkeypatch):
+    kwargs = dict(width_m=120, height_m=120, resolution_m=10, interval_minutes=20,
+                  timezone_name="Asia/Seoul")
+    serial = calculate_sunlight_hours(37.5, 127.0, [_tower()], "2025-12-21", workers=1, **kwargs)
+    hours = serial["hours"]
+    rows, cols = hours.shape
+    # North of the tower loses winter sun, south of it keeps all of it
+    assert hours[rows // 2 - 2, cols // 2] < hours[rows // 2 + 2, cols // 2]
+    assert serial["counts"][-1, cols // 2] == serial["stats"]["daytime_steps"]
+    assert 0 < serial["stats"]["shaded_fraction"] < 1
+
+    monkeypatch.setattr(sunlight_raster, "MIN_PARALLEL_RAYS", 0)
+    monkeypatch.setattr(sunlight_raster, "TILE_CELLS", 50)
+    pooled = calculate_sunlight_hours(37.5, 127.0, [_tower()], "2025-12-21", workers=2, **kwargs)
+    np.testing.assert_array_equal(pooled["counts"], serial["counts"])
+
+
+def test_sunlight_hours_endpoint(client):
+    response = client.post(
+        "/api/v1/shadow/sunlight-hours",
+        json={
+            "location": {"lat": 37.5, "lon": 127.0, "timezone": "Asia/Seoul"},
+            "start_date": "2025-12-21",
+            "interval": 30,
+            "width_m": 60,
+            "height_m": 60,
+            "resolution_m": 20,
+            "buildings": [_tower()],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["rows"], body["cols"]) == (3, 3)
+    assert len(body["hours"]) == 3 and len(body["hours"][0]) == 3
+    assert len(body["transform"]) == 6
+    assert body["stats"]["max_hours"] == body["stats"]["possible_hours"]
+
+
+def test_rejects_workload_above_ray_budget(monkeypatch):
+    monkeypatch.setattr(sunlight_raster, "MAX_RASTER_RAYS", 1000)
+    with pytest.raises(ValueError, match="daytime steps"):
+        calculate_sunlight_hours(37.5, 127.0, [_tower()], "2025-06-21", end_date="2025-06-30",
+                                 width_m=100, height_m=100, resolution_m=10, timezone_name="Asia/Seoul")
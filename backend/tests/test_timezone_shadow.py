@@ -2,9 +2,12 @@
 from datetime import timezone, timedelta
 from zoneinfo import ZoneInfo
 
+import numpy as np
+import pytest
+
 from app.services.timezone_utils import resolve_timezone
 from app.services.solar_calculator import SolarCalculator
-from app.services.shadow_calculator import ShadowCalculator
+from app.services.shadow_calculator import ShadowCalculator, _convex_hull
 
 
 def test_seoul_timezone_is_asia_seoul_or_utc9():
@@ -44,3 +47,190 @@ def test_polar_day_length_near_north_pole_summer():
     assert result["day_length"] in (0.0, 24.0)
     # With correct noon check should be 24
     assert result["day_length"] == 24.0
+
+
+def test_shadow_series_matches_scalar_calculation():
+    sc = ShadowCalculator()
+    rng = np.random.default_rng(3)
+    altitude = np.concatenate([[-5.0, 0.0, 0.05, 0.1, 0.1001, np.nan, 45.0], rng.uniform(-10, 90, 200)])
+    azimuth = rng.uniform(0, 360, len(altitude))
+    for slope, aspect in [(0, 0), (15, 200)]:
+        series = sc.calculate_shadow_series(12.0, altitude, azimuth, slope, aspect)
+        statuses = sc.shadow_status_names(series["status"])
+        messages = sc.shadow_messages(series["status"], altitude)
+        for i, (alt, azi) in enumerate(zip(altitude, azimuth)):
+            scalar = sc.calculate_shadow(12.0, alt, azi, slope, aspect)
+            assert statuses[i] == scalar["status"]
+            assert messages[i] == scalar["message"]
+            for key in ("length", "direction"):
+                if scalar[key] is None or np.isnan(scalar[key]):
+                    assert np.isnan(series[key][i])
+                else:
+                    assert series[key][i] == pytest.approx(scalar[key], rel=1e-12)
+
+
+def test_batched_endpoints_and_polygons_match_scalar():
+    sc = ShadowCalculator()
+    rng = np.random.default_rng(4)
+    lengths = np.concatenate([[np.nan], rng.uniform(0.5, 500, 50)])
+    directions = rng.uniform(0, 360, len(lengths))
+    polygons = sc.calculate_shadow_polygons(37.5665, 126.978, 4.0, lengths, directions)
+    assert polygons.shape == (len(lengths), 4, 2)
+    assert np.isnan(polygons[0]).all()
+    for i in range(1, len(lengths)):
+        scalar = sc.calculate_shadow_polygon(37.5665, 126.978, 10.0, 4.0, lengths[i], directions[i])
+        np.testing.assert_allclose(polygons[i], np.array(scalar), rtol=0, atol=1e-12)
+
+
+def test_tangent_plane_fast_path_stays_within_error_bound():
+    sc = ShadowCalculator()
+    rng = np.random.default_rng(5)
+    lat = rng.uniform(-85, 85, 5000)
+    lon = rng.uniform(-180, 180, 5000)
+    length = rng.uniform(1, 5000, 5000)
+    direction = rng.uniform(0, 360, 5000)
+
+    exact = sc.calculate_shadow_endpoints(lat, lon, length, direction)
+    fast = sc.calculate_shadow_endpoints(lat, lon, length, direction, tangent_tolerance=np.inf)
+    north = np.radians(fast[0] - exact[0]) * 6371000
+    east = np.radians((fast[1] - exact[1] + 180) % 360 - 180) * 6371000 * np.cos(np.radians(exact[0]))
+    assert np.all(np.hypot(north, east) <= sc.tangent_plane_error_bound(lat, length))
+
+    # A tolerance keeps rows that exceed it on the spherical path
+    mixed = sc.calculate_shadow_endpoints(lat, lon, length, direction, tangent_tolerance=0.01)
+    spherical = sc.tangent_plane_error_bound(lat, length) > 0.01
+    np.testing.assert_array_equal(mixed[0][spherical], exact[0][spherical])
+
+
+def test_shadow_series_endpoint_returns_every_frame(client):
+    response = client.get(
+        "/api/v1/shadow/series",
+        params={"lat": 37.5665, "lon": 126.978, "date": "2025-06-21", "object_height": 10,
+                "interval": 30, "timezone": "Asia/Seoul"},
+    )
+    assert response.status_code == 200
+    frames = response.json()["frames"]
+    assert len(frames) == 48
+    assert frames[0]["status"] == "no_sun" and frames[0]["polygon"] is None
+    noon = frames[24]
+    assert noon["status"] == "normal"
+    assert len(noon["polygon"]) == 4
+    # 12:00 KST is before solar noon (12:34): sun south-east, shadow north-west
+    assert 300 < noon["direction"] < 360
+
+
+def test_shadow_envelope_covers_every_footprint():
+    sc = ShadowCalculator()
+    solar = SolarCalculator()
+    pos = solar.calculate_solar_positions(37.5665, 126.978, "2025-06-21", start_time="07:00",
+                                          end_time="17:00", interval_minutes=15, timezone_name="Asia/Seoul")
+    series = sc.calculate_shadow_series(10.0, pos["apparent_elevation"].to_numpy(), pos["azimuth"].to_numpy())
+    polygons = sc.calculate_shadow_polygons(37.5665, 126.978, 3.0, series["length"], series["direction"])
+    times = np.arange(len(pos), dtype=float)
+    env = sc.calculate_shadow_envelope(37.5665, 126.978, polygons, times, simplify_tolerance=0.01)
+
+    # Envelope area at least the largest single footprint, at most the sum of all
+    east = np.radians(1) * 6371000 * np.cos(np.radians(37.5665))
+    north = np.radians(1) * 6371000
+    local = np.stack(((polygons[..., 0] - 126.978) * east, (polygons[..., 1] - 37.5665) * north), axis=-1)
+    areas = 0.5 * np.abs(np.sum(local[..., 0] * np.roll(local[..., 1], -1, axis=1)
+                                - np.roll(local[..., 0], -1, axis=1) * local[..., 1], axis=1))
+    assert areas.max() < env["area_m2"] < areas.sum()
+
+    # Every footprint tip (pulled 5 cm toward the object) lies inside the outline
+    outline = np.stack(((env["polygon"][:, 0] - 126.978) * east, (env["polygon"][:, 1] - 37.5665) * north), axis=-1)
+    a, b = outline, np.roll(outline, -1, axis=0)
+    for tip in local[:, 2]:
+        x, y = tip * (1 - 0.05 / np.hypot(*tip))
+        straddles = (a[:, 1] > y) != (b[:, 1] > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = straddles & (x < (b[:, 0] - a[:, 0]) * (y - a[:, 1]) / (b[:, 1] - a[:, 1]) + a[:, 0])
+        assert crossing.sum() % 2 == 1
+
+    # Morning shadows point west: their far vertices are shaded early, east ones late
+    west = env["polygon"][:, 0] < 126.978 - 10 / east
+    east_side = env["polygon"][:, 0] > 126.978 + 10 / east
+    assert env["earliest"][west].max() < env["latest"][east_side].min()
+    assert np.all(env["earliest"] <= env["latest"])
+
+
+def test_shadow_envelope_endpoint(client):
+    response = client.get(
+        "/api/v1/shadow/envelope",
+        params={"lat": 37.5665, "lon": 126.978, "date": "2025-12-21", "object_height": 10,
+                "object_width": 4, "start_time": "09:00", "end_time": "15:00", "interval": 10,
+                "timezone": "Asia/Seoul"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["area_m2"] > 0
+    assert len(body["polygon"]) == len(body["vertices"]) >= 4
+    first = body["vertices"][0]
+    assert first["earliest"] <= first["latest"]
+    assert first["earliest"].endswith("+09:00")
+
+
+def test_slope_shadow_is_ray_plane_intersection():
+    sc = ShadowCalculator()
+    rng = np.random.default_rng(6)
+    altitude = rng.uniform(5, 80, 100)
+    azimuth = rng.uniform(0, 360, 100)
+    slope, aspect, height = 20.0, 135.0, 10.0
+    series = sc.calculate_shadow_series(height, altitude, azimuth, slope, aspect)
+
+    # Brute force: march the ray from the top of the pole until it drops below the plane
+    alt, az = np.radians(altitude), np.radians(azimuth)
+    ray = np.column_stack((-np.sin(az) * np.cos(alt), -np.cos(az) * np.cos(alt), -np.sin(alt)))
+    downhill = np.array([np.sin(np.radians(aspect)), np.cos(np.radians(aspect))])
+    t = np.linspace(0, 2000, 400001)
+    for i in range(len(altitude)):
+        x, y, z = ray[i, 0] * t, ray[i, 1] * t, height + ray[i, 2] * t
+        ground = -np.tan(np.radians(slope)) * (x * downhill[0] + y * downhill[1])
+        below = np.nonzero(z <= ground)[0]
+        if series["status"][i] == 0:
+            assert np.hypot(x[below[0]], y[below[0]]) == pytest.approx(series["length"][i], abs=0.01)
+        else:
+            # Sun at or below the slope plane: the ray never meets the ground ahead
+            assert series["status"][i] == 3 and len(below) == 0
+
+    # Uphill shadows are shorter than on flat ground, downhill ones longer
+    flat = height / np.tan(np.radians(30))
+    uphill = sc.calculate_shadow(height, 30, aspect, slope, aspect)["length"]
+    downhill_len = sc.calculate_shadow(height, 30, (aspect + 180) % 360, slope, aspect)["length"]
+    assert uphill < flat < downhill_len
+    low = sc.calculate_shadow(height, 10, (aspect + 180) % 360, 30, aspect)
+    assert low["status"] == "terrain_shaded" and low["length"] is None
+
+
+def test_footprint_shadow_is_hull_of_base_and_roof():
+    sc = ShadowCalculator()
+    rng = np.random.default_rng(7)
+    east = np.radians(1) * 6371000 * np.cos(np.radians(37.5665))
+    north = np.radians(1) * 6371000
+    # L-shaped (concave) footprint, ~20 m across
+    ring_m = np.array([[0, 0], [20, 0], [20, 8], [8, 8], [8, 20], [0, 20]], dtype=float) - 8
+    footprint = np.column_stack((126.978 + ring_m[:, 0] / east, 37.5665 + ring_m[:, 1] / north))
+    lengths = np.concatenate([[np.nan], rng.uniform(0.5, 200, 300)])
+    directions = np.concatenate([[0.0], [0.0, 90.0, 45.0], rng.uniform(0, 360, 297)])
+    polygons = sc.calculate_footprint_shadows(footprint.tolist(), lengths, directions)
+    assert polygons.shape == (len(lengths), 7, 2)  # hull of 5 vertices + 2
+    assert np.isnan(polygons[0]).all()
+
+    def area(points):
+        x, y = points[:, 0], points[:, 1]
+        return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+    for i in range(1, len(lengths)):
+        local = np.column_stack(((polygons[i, :, 0] - 126.978) * east, (polygons[i, :, 1] - 37.5665) * north))
+        roof_lat, roof_lon = sc.calculate_shadow_endpoints(footprint[:, 1], footprint[:, 0], lengths[i], directions[i])
+        roof = np.column_stack(((roof_lon - 126.978) * east, (roof_lat - 37.5665) * north))
+        expected = _convex_hull(np.vstack((ring_m, roof)))
+        # Great-circle drift over the shadow bends "parallel" edges by millimetres
+        assert area(local) == pytest.approx(area(expected), rel=1e-4)
+        # Every outline vertex is a footprint or projected roof corner
+        corners = np.vstack((ring_m, roof))
+        gaps = np.hypot(*(local[:, None, :] - corners[None, :, :]).transpose(2, 0, 1)).min(axis=1)
+        assert gaps.max() < 1e-6
+
+    with pytest.raises(ValueError):
+        sc.calculate_footprint_shadows([[126.978, 37.5], [126.979, 37.5], [126.980, 37.5]], [10.0], [0.0])
@@ -0,0 +1,247 @@
+"""Tests for weather-driven all-sky irradiance (weather files and posted hourly series)."""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pvlib
+import pytest
+from pvlib import irradiance
+
+from app.core.config import settings
+from app.services import weather_store
+from app.services.irradiance_calculator import IrradianceCalculator
+
+PVLIB_DATA = os.path.join(os.path.dirname(pvlib.__file__), "data")
+TMY3 = "703165TY.csv"
+EPW = "NLD_Amsterdam062400_IWEC.epw"
+
+
+@pytest.fixture
+def weather_dir(tmp_path, monkeypatch):
+    for name in (TMY3, EPW):
+        shutil.copy(os.path.join(PVLIB_DATA, name), tmp_path / name)
+    monkeypatch.setattr(settings, "WEATHER_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_epw_and_tmy3_index_to_midpoints(weather_dir):
+    epw = weather_store.get_weather_store(EPW)
+    assert epw.meta["format"] == "epw" and epw.meta["rows"] == 8760
+    assert isinstance(epw.table, np.memmap)
+    # EPW hour 1 (00:00-01:00 station time, UTC+1) → 00:30 local
+    first = pd.Timestamp(epw.table[0, 0], unit="s", tz="UTC").tz_convert("Etc/GMT-1")
+    assert (first.month, first.day, first.hour, first.minute) == (1, 1, 0, 30)
+
+    tmy3 = weather_store.get_weather_store(TMY3)
+    assert tmy3.meta["format"] == "tmy3" and tmy3.meta["tz_offset"] == -9.0
+    raw, _ = pvlib.iotools.read_tmy3(str(weather_dir / TMY3), map_variables=True)
+    # The hour-ending 24:00 row of Dec 31 wraps back inside the typical year
+    times = pd.to_datetime(tmy3.table[:, 0], unit="s")
+    assert times.is_monotonic_increasing and times.is_unique
+    assert np.sort(tmy3.table[:, 1]) == pytest.approx(np.sort(raw["ghi"].to_numpy(dtype=float)))
+
+
+def test_index_is_reused_and_refreshed(weather_dir):
+    store = weather_store.get_weather_store(EPW)
+    assert weather_store.get_weather_store(EPW) is store
+    cache_files = os.listdir(weather_dir / ".cache")
+    assert sorted(cache_files) == [store.key, store.key + ".json"]
+
+    path = weather_dir / EPW
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    refreshed = weather_store.get_weather_store(EPW)
+    assert refreshed.key != store.key
+    # The previous revision's table and sidecar are replaced, not accumulated
+    assert sorted(os.listdir(weather_dir / ".cache")) == [refreshed.key, refreshed.key + ".json"]
+    # Mapped pages of the old table stay readable for in-flight requests
+    assert store.table.shape == refreshed.table.shape
+
+
+def test_concurrent_requests_index_once(weather_dir, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    original = weather_store.parse_weather_file
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(weather_store, "parse_weather_file", counting)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        stores = list(pool.map(lambda _: weather_store.get_weather_store(TMY3), range(4)))
+    assert len(calls) == 1
+    assert all(s is stores[0] for s in stores)
+    assert not [n for n in os.listdir(weather_dir / ".cache") if n.endswith(".tmp")]
+
+
+def test_rejects_paths_outside_weather_dir(weather_dir):
+    with pytest.raises(ValueError):
+        weather_store.get_weather_store("../" + EPW)
+    with pytest.raises(ValueError):
+        weather_store.get_weather_store("missing.epw")
+
+
+def test_weather_year_replayed_on_requested_calendar(weather_dir):
+    data = IrradianceCalculator().calculate_weather_irradiance(
+        52.3, 4.77, EPW, "2024-01-01", end_date="2024-12-31", timezone_name="Europe/Amsterdam"
+    )
+    # Leap day is missing from the typical year
+    assert len(data) == 8760
+    assert data.index[0] == pd.Timestamp("2024-01-01 00:30", tz="Europe/Amsterdam")
+    raw, _ = pvlib.iotools.read_epw(str(weather_dir / EPW))
+    assert data["ghi"].sum() == pytest.approx(raw["ghi"].sum())
+    assert {"dni_extra", "airmass_relative", "temp_air", "pressure"} <= set(data.columns)
+    assert data.attrs["weather_file"] == EPW
+
+
+def test_rejects_sites_far_from_the_station(weather_dir):
+    calc = IrradianceCalculator()
+    # Amsterdam IWEC station for a Sydney site
+    with pytest.raises(ValueError, match="from the site"):
+        calc.calculate_weather_irradiance(-33.87, 151.21, EPW, "2025-01-10", timezone_name="Australia/Sydney")
+    # Within a degree of the station is accepted
+    data = calc.calculate_weather_irradiance(52.9, 5.2, EPW, "2025-06-21", timezone_name="Europe/Amsterdam")
+    assert len(data) == 24
+
+
+def test_ghi_only_csv_is_split_with_erbs(weather_dir):
+    times = pd.date_range("2025-06-21 00:30", periods=24, freq="h", tz="Europe/Amsterdam")
+    solar = pvlib.solarposition.get_solarposition(times, 52.3, 4.77)
+    ghi = 900 * np.clip(np.cos(np.radians(solar["zenith"].to_numpy())), 0, None)
+    pd.DataFrame({"timestamp": times.tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%SZ"), "ghi": ghi}).to_csv(
+        weather_dir / "measured.csv", index=False
+    )
+
+    calc = IrradianceCalculator()
+    data = calc.calculate_weather_irradiance(52.3, 4.77, "measured.csv", "2025-06-21",
+                                             timezone_name="Europe/Amsterdam")
+    assert len(data) == 24
+    expected = irradiance.erbs(data["ghi"], data["zenith"], data.index)
+    assert data["dni"].to_numpy() == pytest.approx(expected["dni"].to_numpy())
+    assert data["dhi"].to_numpy() == pytest.approx(expected["dhi"].to_numpy())
+
+    dirint = calc.calculate_weather_irradiance(52.3, 4.77, "measured.csv", "2025-06-21",
+                                               timezone_name="Europe/Amsterdam", decomposition="dirint")
+    noon = dirint.loc["2025-06-21 13:30"]
+    assert noon["dni"] > 0
+    assert noon["dhi"] + noon["dni"] * np.cos(np.radians(noon["zenith"])) == pytest.approx(noon["ghi"])
+    with pytest.raises(ValueError):
+        calc.calculate_weather_irradiance(52.3, 4.77, "measured.csv", "2025-06-21", decomposition="disc")
+
+
+def test_integrated_include_weather(client, weather_dir):
+    body = {
+        "location": {"lat": 52.3, "lon": 4.77, "altitude": 0, "timezone": "Europe/Amsterdam"},
+        "datetime": {"date": "2025-06-21", "interval": 60},
+        "object": {"height": 10, "tilt": 30, "azimuth": 180},
+        "options": {"include_weather": True, "weather_file": EPW},
+    }
+    r = client.post("/api/v1/integrated/calculate", json=body)
+    assert r.status_code == 200, r.text
+    series = r.json()["series"]
+    assert len(series) == 24 and series[0]["timestamp"].startswith("2025-06-21T00:30")
+
+    clear = client.post("/api/v1/integrated/calculate",
+                        json={**body, "options": {"include_weather": False}}).json()
+    # The typical Amsterdam day is cloudier than clear sky
+    assert r.json()["summary"]["total_irradiance"] < clear["summary"]["total_irradiance"]
+
+    missing = client.post("/api/v1/integrated/calculate",
+                          json={**body, "options": {"include_weather": True}})
+    assert missing.status_code == 400
+    # Rejected by the schema even when the weather branch is not taken
+    bad_split = client.post("/api/v1/integrated/calculate",
+                            json={**body, "options": {"include_weather": False, "decomposition": "foo"}})
+    assert bad_split.status_code == 422
+
+
+def test_orientation_sweep_uses_weather_file(client, weather_dir):
+    body = {
+        "location": {"lat": 52.3, "lon": 4.77, "timezone": "Europe/Amsterdam"},
+        "start_date": "2025-01-01",
+        "coarse_step": 10,
+        "fine_step": 5,
+    }
+    clear = client.post("/api/v1/integrated/optimize-orientation", json=body)
+    weather = client.post("/api/v1/integrated/optimize-orientation", json={**body, "weather_file": EPW})
+    assert clear.status_code == 200 and weather.status_code == 200, weather.text
+    assert weather.json()["weather_file"] == EPW and clear.json()["weather_file"] is None
+    # Cloudy typical year: less energy on the best plane than under clear sky
+    assert weather.json()["optimum"]["energy_kwh_m2"] < clear.json()["optimum"]["energy_kwh_m2"]
+
+    bad = client.post("/api/v1/integrated/optimize-orientation",
+                      json={**body, "weather_file": EPW, "decomposition": "foo"})
+    assert bad.status_code == 422
+
+
+def test_resample_weather_series_to_request_interval():
+    target = pd.date_range("2025-06-21 00:00", "2025-06-21 23:45", freq="15min", tz="Asia/Seoul")
+    hours = [f"2025-06-21T{h:02d}:00" for h in range(24)]
+    temperature = [float(h) for h in range(24)]
+    temperature[5] = None
+    out = weather_store.resample_weather_series(
+        hours, {"temperature": temperature, "cloud_cover": None}, target
+    )
+    assert set(out) == {"temperature"}
+    assert out["temperature"][target.get_loc(pd.Timestamp("2025-06-21 10:15", tz="Asia/Seoul"))] == pytest.approx(10.25)
+    # Missing hour is bridged; the last hour is held up to one step past the series
+    assert out["temperature"][target.get_loc(pd.Timestamp("2025-06-21 05:00", tz="Asia/Seoul"))] == pytest.approx(5.0)
+    assert out["temperature"][-1] == pytest.approx(23.0)
+
+
+def test_per_step_atmosphere_matches_spa():
+    calc = IrradianceCalculator()
+    data = calc.calculate_clear_sky_irradiance(37.5665, 126.978, "2025-06-21", interval_minutes=10,
+                                               timezone_name="Asia/Seoul", precision="high")
+    pressure = np.linspace(950, 1040, len(data))
+    temperature = np.linspace(-10, 35, len(data))
+    adjusted = calc.apply_weather_series(data, temperature=temperature, pressure=pressure)
+    spa = pvlib.solarposition.get_solarposition(data.index, 37.5665, 126.978, pressure=pressure * 100,
+                                                temperature=temperature, method="nrel_numpy")
+    assert adjusted["apparent_elevation"].to_numpy() == pytest.approx(spa["apparent_elevation"].to_numpy(), abs=1e-6)
+    # No cloud values: clear-sky irradiance is kept
+    assert adjusted["ghi"].to_numpy() == pytest.approx(data["ghi"].to_numpy())
+
+
+def test_cloud_cover_scales_ghi_and_decomposes():
+    calc = IrradianceCalculator()
+    data = calc.calculate_clear_sky_irradiance(37.5665, 126.978, "2025-06-21", interval_minutes=60,
+                                               timezone_name="Asia/Seoul")
+    cloud = np.where(np.arange(len(data)) < 12, 100.0, np.nan)
+    adjusted = calc.apply_weather_series(data, cloud_cover=cloud)
+    morning = np.arange(len(data)) < 12
+    assert adjusted["ghi"].to_numpy()[morning] == pytest.approx(0.35 * data["ghi"].to_numpy()[morning])
+    expected = irradiance.erbs(adjusted["ghi"], adjusted["zenith"], adjusted.index)
+    assert adjusted["dni"].to_numpy()[morning] == pytest.approx(expected["dni"].to_numpy()[morning])
+    assert adjusted["dni"].to_numpy()[~morning] == pytest.approx(data["dni"].to_numpy()[~morning])
+
+
+def test_integrated_posted_weather(client, weather_dir):
+    hours = [f"2025-06-21T{h:02d}:00" for h in range(24)]
+    body = {
+        "location": {"lat": 37.5665, "lon": 126.978, "altitude": 0, "timezone": "Asia/Seoul"},
+        "datetime": {"date": "2025-06-21", "interval": 30},
+        "object": {"height": 10, "tilt": 30, "azimuth": 180},
+        "options": {"include_weather": True},
+        "weather": {"time": hours, "cloud_cover": [80.0] * 24, "temperature": [25.0] * 24,
+                    "pressure": [1000.0] * 24},
+    }
+    r = client.post("/api/v1/integrated/calculate", json=body)
+    assert r.status_code == 200, r.text
+    series = r.json()["series"]
+    assert len(series) == 48
+    assert {p["irradiance"]["cloud_cover"] for p in series} == {80.0}
+
+    clear = client.post("/api/v1/integrated/calculate", json={**body, "options": {}}).json()
+    assert clear["series"][24]["irradiance"]["cloud_cover"] is None
+    ratio = r.json()["summary"]["total_irradiance"] / clear["summary"]["total_irradiance"]
+    assert ratio == pytest.approx(0.35 + 0.65 * 0.2, rel=1e-6)
+
+    both = client.post("/api/v1/integrated/calculate",
+                       json={**body, "options": {"include_weather": True, "weather_file": EPW}})
+    assert both.status_code == 400
+    short = client.post("/api/v1/integrated/calculate",
+                        json={**body, "weather": {"time": hours, "cloud_cover": [0.0]}})
+    assert short.status_code == 422
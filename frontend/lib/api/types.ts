@@ -17,13 +17,34 @@ export interface SolarCalculationRequest {
     height: number;
     tilt?: number;
     azimuth?: number;
+    /** 프리즘 바닥 링 [[lon, lat], ...] (기본: 높이 × 0.4 폭 사각형) */
+    footprint?: number[][];
+  };
+  /** 그림자 투영 지면 (경사 °, 하향 방위 ° 0=북) */
+  terrain?: {
+    slope?: number;
+    aspect?: number;
   };
   options?: {
     atmosphere?: boolean;
     precision?: 'low' | 'medium' | 'high';
     include_weather?: boolean;
-    sky_model?: 'isotropic' | 'perez' | 'klucher';
+    weather_file?: string;
+    decomposition?: 'erbs' | 'dirint';
+    /** DEM 지형 지평선으로 태양 가림 (백엔드 DEM_PATH 필요) */
+    horizon?: boolean;
+    sky_model?: 'isotropic' | 'klucher' | 'haydavies' | 'reindl' | 'perez';
   };
+  /** 시간별 기상 (include_weather 시 백엔드에서 요청 간격으로 보간·적용) */
+  weather?: WeatherSeries;
+}
+
+export interface WeatherSeries {
+  time: string[];
+  cloud_cover?: (number | null)[];
+  temperature?: (number | null)[];
+  /** hPa */
+  pressure?: (number | null)[];
 }
 
 export interface BatchCalculationRequest {
@@ -59,6 +80,7 @@ export interface Irradiance {
   dhi: number;
   par?: number;
   poa?: number | null;
+  cloud_cover?: number | null;
 }
 
 export interface Shadow {
@@ -82,6 +104,9 @@ export interface SolarSummary {
   day_length: number;
   max_altitude: number;
   total_irradiance: number | null;
+  /** 지형 지평선 기준 일출·일몰 (horizon 옵션) */
+  effective_sunrise?: string | null;
+  effective_sunset?: string | null;
 }
 
 export interface SolarCalculationResponse {
@@ -0,0 +1,97 @@
+"""
+Benchmark the solar position precision tiers (CalculationOptions.precision).
+
+For each tier: wall time for a 1-minute day and a 1-minute year, and the worst
+angular separation from nrel_numpy over random sites/dates. The numbers in
+app.core.constants.PRECISION_TIERS['*']['max_error_deg'] come from this script.
+Explicit spline node spacings (calculate_solar_positions(node_minutes=...))
+are listed too, with the largest self-reported max_deviation_deg.
+
+Usage (from repo root):
+    python scripts/benchmark_precision.py [--sites 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.memory_cache import solar_position_cache  # noqa: E402
+from app.core.constants import PRECISION_TIERS  # noqa: E402
+from app.services.solar_calculator import SolarCalculator  # noqa: E402
+
+
+def angular_separation(el1, az1, el2, az2):
+    """Great-circle distance between two sky positions (degrees)."""
+    e1, a1, e2, a2 = map(np.radians, (el1, az1, el2, az2))
+    cos_sep = np.sin(e1) * np.sin(e2) + np.cos(e1) * np.cos(e2) * np.cos(a1 - a2)
+    return np.degrees(np.arccos(np.clip(cos_sep, -1.0, 1.0)))
+
+
+def measure_error(calc, options, sites, seed=0):
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    reported = 0.0
+    for _ in range(sites):
+        lat = rng.uniform(-80, 80)
+        lon = rng.uniform(-180, 180)
+        day = pd.Timestamp('2020-01-01') + pd.Timedelta(days=int(rng.integers(0, 3650)))
+        kwargs = dict(
+            latitude=lat, longitude=lon, date=day.strftime('%Y-%m-%d'),
+            interval_minutes=1, timezone_name='UTC',
+        )
+        reference = calc.calculate_solar_positions(precision='high', **kwargs)
+        tier = calc.calculate_solar_positions(**options, **kwargs)
+        reported = max(reported, tier.attrs.get('max_deviation_deg', 0.0))
+        # Ignore deep night: only positions that matter for sun/shadow output
+        visible = reference['elevation'].to_numpy() > -1
+        if not visible.any():
+            continue
+        # Geometric positions: every tier applies the same SPA refraction, whose
+        # cutoff just below the horizon would turn tiny errors into ~0.6° jumps
+        separation = angular_separation(
+            reference['elevation'].to_numpy(), reference['azimuth'].to_numpy(),
+            tier['elevation'].to_numpy(), tier['azimuth'].to_numpy(),
+        )
+        worst = max(worst, float(separation[visible].max()))
+    return worst, reported
+
+
+def measure_time(calc, options, **kwargs):
+    # Time the computation, not the in-process cache
+    solar_position_cache.clear()
+    start = time.perf_counter()
+    calc.calculate_solar_positions(**options, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sites', type=int, default=200)
+    args = parser.parse_args()
+
+    calc = SolarCalculator()
+    print(f"{'mode':<10}{'day 1-min (ms)':>16}{'year 1-min (s)':>16}{'max error (°)':>16}{'reported':>12}")
+    print("(reported = documented bound for tiers, max_deviation_deg for node modes)")
+    modes = [(precision, {'precision': precision}) for precision in ('high', 'medium', 'low')]
+    modes += [(f"nodes={n}", {'node_minutes': n}) for n in (15, 30)]
+    for label, options in modes:
+        day = min(
+            measure_time(calc, options, latitude=37.5665, longitude=126.978,
+                         date='2025-06-21', interval_minutes=1)
+            for _ in range(5)
+        )
+        year = measure_time(calc, options, latitude=37.5665, longitude=126.978,
+                            date='2025-01-01', end_date='2025-12-31', interval_minutes=1)
+        error, reported = measure_error(calc, options, args.sites)
+        if 'precision' in options:
+            reported = PRECISION_TIERS[options['precision']]['max_error_deg']
+        print(f"{label:<10}{day * 1000:>16.1f}{year:>16.2f}{error:>16.5f}{reported:>12.5f}")
+
+
+if __name__ == '__main__':
+    main()